@@ -3,8 +3,9 @@ RGB LED の明るさを個別に調整するプログラム
 
 機能:
 1. 各ポテンショメータの値 (0.0〜1.0) を読み取り、対応するRGB LEDの明るさを調整します。
-2. 非線形スケーリング (対数的な感覚に近い明るさ制御) を適用。
+2. 非線形スケーリング (対数的な感覚に近い明るさ制御) を適用 (PWMLED の curve="exponential")。
 3. 各RGB LEDは独立したポテンショメータで制御されます。
+4. 3 つの LED は PWMGroup でまとめて (同時に) 更新されます。
 
 設定:
 - GPIO26: 赤色LED用ポテンショメータ
@@ -16,45 +17,27 @@ RGB LED の明るさを個別に調整するプログラム
 
 使用ライブラリ:
 - picozero: 簡単なハードウェア制御のためのMicroPythonライブラリ
-- math: 非線形スケーリングに使用
 """
 
-from picozero import Pot, PWMLED
+from picozero import Pot, PWMLED, PWMGroup
 import utime
-import math
-
-# 定数
-MAX_BRIGHTNESS = math.pow(2, 16)  # 最大明るさ
-SCALING_STEPS = 100               # 明るさ調整のステップ数
-SCALING_FACTOR = math.pow(MAX_BRIGHTNESS, 1 / SCALING_STEPS)  # スケーリング係数
-
-# RGB LED の設定
-led_config = [
-    {"pot": Pot(26), "led": PWMLED(13)},  # 赤色
-    {"pot": Pot(27), "led": PWMLED(12)},  # 緑色
-    {"pot": Pot(28), "led": PWMLED(11)},  # 青色
-]
-
-def scale_value(value, scaling_factor, max_brightness):
-    """
-    ポテンショメータの値 (0.0〜1.0) を非線形スケーリングし、LEDの明るさに変換。
-    """
-    return math.pow(scaling_factor, value * SCALING_STEPS) / max_brightness
 
-while True:
-    for config in led_config:
-        pot = config["pot"]
-        led = config["led"]
+# RGB LED の設定 (赤色, 緑色, 青色)
+pots = (Pot(26), Pot(27), Pot(28))
+# curve="exponential" で、値 (0 〜 1) を 2^16 の (値) 乗に比例する明るさに変換する
+# (変換表は最初に 1 回だけ作られるので、毎回 math.pow を計算しなくてよい)
+leds = PWMGroup(*(PWMLED(pin, curve="exponential") for pin in (13, 12, 11)))
 
-        # ポテンショメータの値を取得し、スケーリング
-        val = pot.value
-        scaled_val = scale_value(val, SCALING_FACTOR, MAX_BRIGHTNESS)
+while True:
+    # ポテンショメータの値 (0.0 〜 1.0) を取得
+    vals = [pot.value for pot in pots]
 
-        # LED の明るさを設定
-        led.value = scaled_val
+    # 3 つの LED の明るさを同時に設定
+    leds.value = vals
 
-        # デバッグ用出力
-        print(f"Pot Value: {val:.2f}, Scaled Value: {scaled_val:.4f}, LED: {led.value:.4f}")
+    # デバッグ用出力
+    for val, led_val in zip(vals, leds.value):
+        print(f"Pot Value: {val:.2f}, LED: {led_val:.4f}")
 
     # 0.1秒待機
     utime.sleep(0.1)
@@ -1,20 +1,16 @@
 from picozero import Servo
-import utime
 
 # サーボピンを指定
 servoPin = 15
 
-# サーボモーターの初期化
-servo = Servo(servoPin)
+# サーボモーターの初期化 (0.5ms: 0 度 〜 2.5ms: 180 度)
+servo = Servo(servoPin, min_pulse_width=0.5/1000, max_pulse_width=2.5/1000)
 
-# -0.5: 0 度, 0: 45 度, 0.5: 90 度, 1.5: 180 度
-servo.value = -0.5
-utime.sleep(2)
+servo.angle = 0
 
 while True:
     angle = int(input('What angle do you desire? '))
     if 0 <= angle <= 180:
-        servo.value = (angle - 45) / 90.0  # 指定した角度にサーボを動かす
-        utime.sleep(0.5)
+        servo.move_to(angle, duration=0.5, wait=True)  # 指定した角度にサーボを動かす
     else:
         print("Please enter a value between 0 and 180.")
@@ -27,9 +27,11 @@ LED の ON/OFF を切り替えます。
   - LED には適切な抵抗 (例: 330Ω) を直列に接続して、過電流を防ぐこと。
   - `KeyboardInterrupt` によりプログラムを安全に終了可能。
   - タイポ修正: `KEyboardInterrupt` → `KeyboardInterrupt`
+  - 4 つの LED は picozero の LEDBoard で、1 回のレジスタ書き込みでまとめて設定する。
 """
 
 from machine import Pin
+from picozero import LEDBoard
 import utime
 
 # ピン設定
@@ -52,21 +54,11 @@ t2Down = utime.ticks_ms()
 buttonState2Old = 0
 
 def allOffLED():
-    led1.off()
-    led2.off()
-    led4.off()
-    led8.off()
+    leds.off()
     
 def setLED(count):
-    allOffLED()
-    if count & 0x01 == 0x01:
-        led1.value(1)
-    if count & 0x02 == 0x02:
-        led2.value(1)
-    if count & 0x04 == 0x04:
-        led4.value(1)
-    if count % 0x08 == 0x08:
-        led8.value(1)
+    # count の下位 4 ビットを LED に表示
+    leds.value = count & 0x0f
 
 def IntSwitchUp(pin):
     global press, t1Up, t1Down, buttonState1Old
@@ -97,10 +89,7 @@ def IntSwitchDown(pin):
     buttonState2Old = buttonState2
 
 # ピンの設定
-led1 = Pin(ledPin1, Pin.OUT)  # LED 出力
-led2 = Pin(ledPin2, Pin.OUT)  # LED 出力
-led4 = Pin(ledPin4, Pin.OUT)  # LED 出力
-led8 = Pin(ledPin8, Pin.OUT)  # LED 出力
+leds = LEDBoard(ledPin1, ledPin2, ledPin4, ledPin8)  # LED 出力 (ledPin1 が最下位ビット)
 
 watchButtonUp = Pin(buttonPinUp, Pin.IN, Pin.PULL_DOWN)  # ボタン入力 (プルダウン)
 watchButtonDown = Pin(buttonPinDown, Pin.IN, Pin.PULL_DOWN)  # ボタン入力 (プルダウン)
@@ -27,37 +27,24 @@ Raspberry Pi Pico - サーボモータ制御プログラム
 - サーボモータのSignal → PicoのGPIO20
 
 【動作】
-- 角度 0° の PWM 信号 (500µs) を生成。
-- 20ms の周期で PWM を出力し続ける。
-- 角度変更時には `pw` を調整し、新しいパルス幅を適用可能。
+- picozero の Servo で 20ms 周期 (50Hz) の PWM 信号を出力する。
+- 角度 0° (500µs) と 90° の間を 2 秒ごとに往復する。
+- move_to() は角度からパルス幅への変換表を使い、移動をバックグラウンドで行う。
 
 【注意】
 - サーボモータの電源が不足すると動作が不安定になるため、外部電源を使用することを推奨。
-- PWM 周期を 20ms (50Hz) に設定し、サーボの動作仕様に適合させる。
 """
 
 import utime
-from machine import Pin
+from picozero import Servo
 
-servoPin = Pin(20, Pin.OUT)
-
-angle = 0
-pw0 = int(angle * 2000 / 180 + 500)
-off_us0 = 20000 - pw0
-
-angle = 90
-pw90 = int(angle * 2000 / 180 + 500)
-off_us90 = 20000 - pw90
+# 0.5ms: 0 度 〜 2.5ms: 180 度
+servo = Servo(20, min_pulse_width=0.5/1000, max_pulse_width=2.5/1000)
+servo.angle = 0
 
 while True:
-    servoPin.on()
-    utime.sleep_us(pw0)
-    servoPin.off()
-    utime.sleep_us(off_us0)
     utime.sleep(2)
-    
-    servoPin.on()
-    utime.sleep_us(pw90)
-    servoPin.off()
-    utime.sleep_us(off_us90)
+    servo.move_to(90, duration=0.5)
+
     utime.sleep(2)
+    servo.move_to(0, duration=0.5)
@@ -0,0 +1,28 @@
+#!/bin/bash
+#
+# picozero パッケージを .mpy にコンパイルするスクリプト
+#
+# 【使い方】
+#   ./build_picozero.sh
+#   mpremote cp -r build/picozero :
+#
+# 【注意点】
+# - mpy-cross (pip install mpy-cross) が必要です。Pico の MicroPython と同じバージョンを使ってください
+# - sim.py は PC 用なのでコンパイルしません
+#
+
+set -e
+cd "$(dirname "$0")"
+
+OUT=build/picozero
+rm -rf "$OUT"
+mkdir -p "$OUT"
+
+for src in picozero/*.py; do
+    name=$(basename "$src" .py)
+    if [ "$name" = "sim" ]; then
+        continue
+    fi
+    mpy-cross -o "$OUT/$name.mpy" "$src"
+    echo "$src -> $OUT/$name.mpy"
+done
@@ -0,0 +1,21 @@
+# picozero を MicroPython のファームウェアに frozen module として組み込むための manifest
+#
+# 使い方 (micropython のソースツリーで):
+#   make -C ports/rp2 BOARD=RPI_PICO_W FROZEN_MANIFEST=/path/to/raspberry/pico/manifest.py
+
+include("$(PORT_DIR)/boards/manifest.py")
+
+# sim.py は PC 用なので含めない
+package(
+    "picozero",
+    files=(
+        "__init__.py",
+        "core.py",
+        "outputs.py",
+        "audio.py",
+        "motion.py",
+        "inputs.py",
+        "sensors.py",
+    ),
+    opt=3,
+)
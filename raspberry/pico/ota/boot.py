@@ -1,11 +1,29 @@
 
-# main.py を例外ハンドリング付きで起動し、失敗時はエラー出力＋自動リセット（3回までリトライ）
+# main.py を例外ハンドリング付きで起動し、失敗時はエラー出力＋リトライ（3回まで）
+# OTA アップデート直後の確認待ちのバージョンが起動できない時は、リセットを繰り返して
+# MAX_BOOTS 回を超えたら元のバージョンに戻す
 import machine
 import time
 import sys
 
-def safe_run_main():
-    for _ in range(3):
+MAX_RETRY = 3
+MAX_BOOTS = 3
+
+def recover_ota():
+    """OTA の入れ替えの途中なら続きを行い、確認されないまま MAX_BOOTS 回を超えたら元に戻す"""
+    try:
+        from lib.ota.swap_journal import SwapJournal
+        journal = SwapJournal(max_boots=MAX_BOOTS)
+        rolled_back = journal.boot()
+        if rolled_back:
+            print("OTA rolled back to", rolled_back)
+        return journal
+    except Exception as e:
+        print("OTA recovery failed:", e)
+        return None
+
+def safe_run_main(journal):
+    for i in range(MAX_RETRY):
         try:
             import main
             break
@@ -17,26 +35,13 @@ def safe_run_main():
                     f.write(str(e))
             except Exception:
                 pass
-            time.sleep(2)  # 少し待ってから自動リセット
-            machine.reset()
-        max_retry = 3
-        for i in range(max_retry):
-            try:
-                import main
-                break
-            except Exception as e:
-                print("main.py failed:", e)
-                # エラー内容をファイル保存（失敗しても無視）
-                try:
-                    with open('boot_error.log', 'w') as f:
-                        f.write(str(e))
-                except Exception:
-                    pass
-                if i < max_retry - 1:
-                    time.sleep(2)  # 少し待ってから自動リセット
-                    machine.reset()
-                else:
-                    print("main.py failed too many times. Stopping auto-reboot loop.")
-                    # 必要ならここでLED点滅や他の通知処理も可
+            sys.modules.pop('main', None)
+            time.sleep(2)  # 少し待ってからリトライ
+            if journal and journal.pending():
+                # 確認待ちのバージョン: リセットして起動回数を数える
+                machine.reset()
+    else:
+        print("main.py failed too many times. Stopping auto-reboot loop.")
+        # 必要ならここでLED点滅や他の通知処理も可
 
-safe_run_main()
+safe_run_main(recover_ota())
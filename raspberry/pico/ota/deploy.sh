@@ -107,6 +107,11 @@ if [ -f "versions.json" ]; then
     echo "   ✍️  version.txt を作成中..."
     mpremote connect "$DEVICE" exec "with open('version.txt', 'w') as f: f.write('$VERSION')"
     echo "   ✅ version.txt 作成完了"
+    # OTA の差分更新用のハッシュ索引は、転送したファイルと合わなくなるので消す (次回の更新時に作り直される)
+    mpremote connect "$DEVICE" fs rm :ota_hashes.json >/dev/null 2>&1 || true
+    # OTA の入れ替え途中の状態も消す (直接転送したファイルが元に戻されないように)
+    mpremote connect "$DEVICE" fs rm :ota_journal.json >/dev/null 2>&1 || true
+    mpremote connect "$DEVICE" fs rm -r :ota_stage :ota_backup >/dev/null 2>&1 || true
     echo "デバイスをリセット中..."
     mpremote connect "$DEVICE" reset || {
         echo "⚠️  デバイスリセットに失敗しました"; exit 1; }
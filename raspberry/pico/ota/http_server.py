@@ -6,16 +6,161 @@ OTA更新用の安定版HTTPサーバー
 
 import http.server
 import socketserver
+import hashlib
 import json
 import os
+import re
+import subprocess
 import sys
+import threading
+import zlib
 import logging
 from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
 
 # ログ設定（エラーを抑制）
 logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# ファイルパス -> ((更新時刻, サイズ), (サイズ, sha256))
+_digest_cache = {}
+
+# 圧縮したファイルを置くディレクトリ (配信ディレクトリからの相対パス)
+CACHE_DIR = '.ota_cache'
+# .mpy にコンパイルする mpy-cross (環境変数 MPY_CROSS で変えられる)
+MPY_CROSS = os.environ.get('MPY_CROSS', 'mpy-cross')
+# MicroPython がソースとして実行するので、.mpy にしないファイル
+MPY_EXCLUDE = ('main.py', 'boot.py')
+# 圧縮のウィンドウサイズ (2^12 = 4KB)。Pico は展開にこの大きさのメモリを使う
+# (OTA の .py ファイルでは 1KB で 2.7 倍、4KB で 3.1 倍、32KB でも 3.3 倍に圧縮される)
+ZLIB_WBITS = 12
+
+def file_digest(path):
+    """ファイルのサイズと sha256 を返す (更新時刻とサイズが変わっていなければキャッシュを使う)"""
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _digest_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            h.update(chunk)
+    digest = (st.st_size, h.hexdigest())
+    _digest_cache[path] = (key, digest)
+    return digest
+
+def add_file_digests(manifest, root='.'):
+    """versions.json の各ファイルに、配信するファイル (root からのパス) の size と sha256 を追加する"""
+    for file_info in manifest.get('files', []):
+        path = os.path.join(root, urlsplit(file_info['url']).path.lstrip('/'))
+        try:
+            file_info['size'], file_info['sha256'] = file_digest(path)
+        except OSError:
+            # 配信するファイルが無い (ダウンロード時に 404 になる)
+            pass
+    return manifest
+
+_mpy_cross_abi = []
+
+def mpy_cross_abi():
+    """mpy-cross が作る .mpy のバージョン ("6.3" など) を返す。mpy-cross が無ければ None"""
+    if not _mpy_cross_abi:
+        try:
+            out = subprocess.run([MPY_CROSS, '--version'], capture_output=True, text=True).stdout
+            m = re.search(r'mpy v(\d+)\.(\d+)', out)
+            _mpy_cross_abi.append(f'{m.group(1)}.{m.group(2)}' if m else None)
+        except OSError:
+            _mpy_cross_abi.append(None)
+    return _mpy_cross_abi[0]
+
+def mpy_variant(path, name, cache_dir):
+    """
+    path を mpy-cross でコンパイルした .mpy のパスを返す。
+    ソースの sha256 と .mpy のバージョンをファイル名にして cache_dir に置いておき、ソースが変わった時だけ作り直す。
+    """
+    size, sha256 = file_digest(path)
+    cached = os.path.join(cache_dir, f'{sha256}-{mpy_cross_abi()}.mpy')
+    if not os.path.exists(cached):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f'{cached}.{threading.get_ident()}.tmp'
+        # -s: エラー表示に出るファイル名
+        subprocess.run([MPY_CROSS, '-s', name, '-o', tmp, path], check=True, capture_output=True)
+        os.replace(tmp, cached)
+    return cached
+
+def add_mpy_variants(manifest, root, abi):
+    """
+    Pico の .mpy のバージョン (abi) が mpy-cross と同じなら、versions.json の .py ファイルを
+    コンパイル済みの .mpy に置き換える (main.py, boot.py はそのまま)。
+    """
+    if not abi or abi != mpy_cross_abi():
+        return manifest
+    cache_dir = os.path.join(root, CACHE_DIR)
+    for file_info in manifest.get('files', []):
+        name = file_info['name']
+        if not name.endswith('.py') or name.rsplit('/', 1)[-1] in MPY_EXCLUDE or 'sha256' not in file_info:
+            continue
+        url = urlsplit(file_info['url'])
+        try:
+            cached = mpy_variant(os.path.join(root, url.path.lstrip('/')), name, cache_dir)
+        except (OSError, subprocess.CalledProcessError) as e:
+            # コンパイルできないファイルは .py のまま
+            logger.warning(f"mpy-cross failed for {name}: {e}")
+            continue
+        file_info['name'] = name[:-3] + '.mpy'
+        file_info['url'] = urlunsplit((url.scheme, url.netloc, '/' + os.path.relpath(cached, root), '', ''))
+        file_info['size'], file_info['sha256'] = file_digest(cached)
+    return manifest
+
+def parse_range(header, size):
+    """Range ヘッダー (bytes=N- / bytes=N-M) から (開始, 終了) を返す。指定が無ければ None、範囲外なら ValueError"""
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, _, last = header[6:].strip().partition('-')
+    if not first:
+        # bytes=-N (末尾の N バイト)
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+def accepts_encoding(header, encoding):
+    """Accept-Encoding ヘッダーで encoding が受け入れられているか (q=0 は拒否)"""
+    for item in (header or '').split(','):
+        name, _, params = item.partition(';')
+        if name.strip().lower() != encoding:
+            continue
+        params = params.replace(' ', '')
+        try:
+            return not params.startswith('q=') or float(params[2:]) > 0
+        except ValueError:
+            return True
+    return False
+
+def compressed_variant(path, cache_dir):
+    """
+    path を zlib 形式で圧縮したファイルのパスを返す。
+    内容の sha256 をファイル名にして cache_dir に置いておき、内容が変わった時だけ作り直す。
+    """
+    size, sha256 = file_digest(path)
+    cached = os.path.join(cache_dir, sha256 + '.zlib')
+    if not os.path.exists(cached):
+        with open(path, 'rb') as f:
+            data = f.read()
+        c = zlib.compressobj(9, zlib.DEFLATED, ZLIB_WBITS)
+        body = c.compress(data) + c.flush()
+        os.makedirs(cache_dir, exist_ok=True)
+        # 同時に作っている他のスレッドと混ざらないように、一時ファイルから rename する
+        tmp = f'{cached}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(body)
+        os.replace(tmp, cached)
+    return cached
+
 class QuietOTAHandler(http.server.SimpleHTTPRequestHandler):
     def do_POST(self):
         from datetime import datetime
@@ -45,7 +190,7 @@ class QuietOTAHandler(http.server.SimpleHTTPRequestHandler):
 
     def log_message(self, format, *args):
         """成功したリクエストのみログ出力"""
-        if "200" in (format % args):  # 成功したリクエストのみ表示
+        if "200" in (format % args) or "206" in (format % args):  # 成功したリクエストのみ表示
             timestamp = datetime.now().strftime("%H:%M:%S")
             print(f"[{timestamp}] ✅ {self.address_string()} - {format % args}")
 
@@ -63,49 +208,91 @@ class QuietOTAHandler(http.server.SimpleHTTPRequestHandler):
 
         if self.path == '/versions.json':
             print(f"[{timestamp}] 🔎 [UPDATE CHECK] Pico ({client_ip}) is checking for updates.")
-        elif self.path.endswith('.py'):
+        elif self.path.endswith(('.py', '.mpy')):
             print(f"[{timestamp}] ⬇️ [DOWNLOAD] Pico ({client_ip}) is downloading {self.path}.")
 
         try:
             if self.path == '/versions.json':
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Connection', 'close')  # 接続を即座に閉じる
-                self.end_headers()
-
-                # versions.jsonファイルを読み込んで返す
+                # versions.jsonファイルを読み込み、各ファイルの size と sha256 を付けて返す
+                # (X-MPY-ABI で Pico の .mpy のバージョンが送られてくれば、.py を .mpy に置き換える)
                 try:
-                    with open('versions.json', 'r') as f:
-                        content = f.read()
-                    self.wfile.write(content.encode('utf-8'))
+                    with open(os.path.join(self.directory, 'versions.json'), 'r') as f:
+                        manifest = json.load(f)
+                    add_file_digests(manifest, self.directory)
+                    add_mpy_variants(manifest, self.directory, self.headers.get('X-MPY-ABI'))
+                    content = json.dumps(manifest)
                 except FileNotFoundError:
                     error_response = {
                         "error": "versions.json not found",
                         "version": "0.0.0",
                         "files": []
                     }
-                    self.wfile.write(json.dumps(error_response).encode('utf-8'))
+                    content = json.dumps(error_response)
+
+                self.send_response(200)
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Connection', 'close')  # 接続を即座に閉じる
+                self.end_headers()
+                self.wfile.write(content.encode('utf-8'))
             else:
                 # 通常のファイル配信
                 path = self.translate_path(self.path)
+                if not os.path.isfile(path):
+                    self.send_error(404, "File not found")
+                    return
+                ctype = self.guess_type(path)
+                # 圧縮を受け入れる Pico には圧縮したものを返す (続きからのダウンロードは圧縮しない)
+                encoding = None
+                if not self.headers.get('Range') and accepts_encoding(self.headers.get('Accept-Encoding'), 'deflate'):
+                    cached = compressed_variant(path, os.path.join(self.directory, CACHE_DIR))
+                    if os.path.getsize(cached) < os.path.getsize(path):
+                        path, encoding = cached, 'deflate'
                 try:
                     f = open(path, 'rb')
                 except OSError:
                     self.send_error(404, "File not found")
                     return
 
-                self.send_response(200)
-                self.send_header('Content-type', self.guess_type(path))
                 fs = os.fstat(f.fileno())
-                self.send_header("Content-Length", str(fs.st_size))
+                # Range が指定されていれば (中断したダウンロードの再開) その部分だけ返す
+                try:
+                    byte_range = parse_range(self.headers.get('Range'), fs.st_size)
+                except ValueError:
+                    f.close()
+                    self.send_response(416)
+                    self.send_header('Content-Range', f'bytes */{fs.st_size}')
+                    self.send_header('Content-Length', '0')
+                    self.send_header('Connection', 'close')
+                    self.end_headers()
+                    return
+                if byte_range:
+                    start, end = byte_range
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{fs.st_size}')
+                else:
+                    start, end = 0, fs.st_size - 1
+                    self.send_response(200)
+                self.send_header('Content-type', ctype)
+                if encoding:
+                    self.send_header('Content-Encoding', encoding)
+                self.send_header("Content-Length", str(end - start + 1))
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Vary', 'Accept-Encoding')
                 self.send_header("Last-Modified", self.date_time_string(fs.st_mtime))
                 self.send_header('Access-Control-Allow-Origin', '*')
                 self.send_header('Connection', 'close')
                 self.end_headers()
 
                 try:
-                    self.copyfile(f, self.wfile)
+                    f.seek(start)
+                    remaining = end - start + 1
+                    while remaining > 0:
+                        chunk = f.read(min(65536, remaining))
+                        if not chunk:
+                            break
+                        self.wfile.write(chunk)
+                        remaining -= len(chunk)
                 finally:
                     f.close()
         except (ConnectionResetError, BrokenPipeError, OSError) as e:
@@ -143,6 +330,7 @@ def main():
     print(f"📁 配信ディレクトリ: {server_directory}")
     print(f"🌐 ポート: {PORT}")
     print("🔗 アクセスURL: http://localhost:8080/versions.json")
+    print(f"🧩 mpy-cross: {mpy_cross_abi() or 'なし (.py のまま配信)'}")
     print("📊 接続ログ（成功したリクエストのみ表示）:")
     print("⏹️  停止: Ctrl+C")
     print("-" * 50)
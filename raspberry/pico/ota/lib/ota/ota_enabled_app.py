@@ -54,6 +54,7 @@ class OTAEnabledApp:
         self.setup()
         while self.running:
             self.loop()
+            # アップデート直後のバージョンは、ここでサーバーと通信できた時に確認済みになる
             self.ota.periodic_check()
 
     def loop(self):
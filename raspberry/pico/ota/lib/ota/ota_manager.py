@@ -1,17 +1,25 @@
 from .log_helper import LogHelper
+from .swap_journal import SwapJournal
 
 
 class OTAManager:
     def __init__(self, wifi_ssid, wifi_password, server_url,
                  check_interval=60, version_file="version.txt", auto_reboot=True,
                  network_mod=None, urequests_mod=None, ujson_mod=None, machine_mod=None,
-                 time_mod=None, gc_mod=None, os_mod=None):
+                 time_mod=None, gc_mod=None, os_mod=None,
+                 hash_index_file="ota_hashes.json", hashlib_mod=None, chunk_size=1024,
+                 swap=None, compress=True, deflate_mod=None, mpy=True, confirm_after=60):
         self.wifi_ssid = wifi_ssid
         self.wifi_password = wifi_password
         self.server_url = server_url
         self.check_interval = check_interval
         self.version_file = version_file
         self.auto_reboot = auto_reboot
+        # ダウンロード済みファイルの sha256 の索引 (ファイル名 -> sha256)
+        self.hash_index_file = hash_index_file
+        # ダウンロード時のバッファサイズ。WiFi の 1 パケット (最大 1460 バイト) 程度が目安で、
+        # 大きくすると速くなるが、その分のメモリを使う
+        self.chunk_size = chunk_size
 
         # allow dependency injection for testing/runtime variations
         self.network = network_mod if network_mod else __import__('network')
@@ -21,6 +29,25 @@ class OTAManager:
         self.time = time_mod if time_mod else __import__('time')
         self.gc = gc_mod if gc_mod else __import__('gc')
         self.os = os_mod if os_mod else __import__('os')
+        self.hashlib = hashlib_mod if hashlib_mod else __import__('hashlib')
+        # 圧縮した転送 (Content-Encoding: deflate) を受け取る。deflate モジュールの無いファームウェアでは使わない
+        self.deflate = None
+        if compress:
+            try:
+                self.deflate = deflate_mod if deflate_mod else __import__('deflate')
+            except ImportError:
+                pass
+        # サーバーに .mpy を要求する時の .mpy のバージョン ("6.3" など)。.mpy を読めなければ None
+        self.mpy_abi = None
+        if mpy:
+            try:
+                v = __import__('sys').implementation._mpy
+                self.mpy_abi = f"{v & 0xff}.{v >> 8 & 3}"
+            except AttributeError:
+                pass
+        # 新しいファイルは一旦 ota_stage/ にダウンロードし、全部そろってから入れ替える
+        self.swap = swap if swap else SwapJournal(version_file=version_file, hash_index_file=hash_index_file,
+                                                  ujson_mod=self.ujson, os_mod=self.os)
 
         # --- WiFiインターフェース強制リセット ---
         try:
@@ -32,6 +59,9 @@ class OTAManager:
             pass
         self.wlan = self.network.WLAN(self.network.STA_IF)
         self.last_check_time = 0
+        # アップデート直後のバージョンは、起動から confirm_after 秒以上たってサーバーと通信できた時に確認済みにする
+        self.confirm_after = confirm_after
+        self.start_ms = self.time.ticks_ms()
         self.wifi_connected = False
         self.log = LogHelper(server_url)
 
@@ -120,38 +150,199 @@ class OTAManager:
         with open(self.version_file, 'w') as f:
             f.write(version)
 
+    def load_hash_index(self):
+        """ローカルのハッシュ索引 (ファイル名 -> sha256) を読み込む。無ければ空"""
+        try:
+            with open(self.hash_index_file, 'r') as f:
+                return self.ujson.load(f)
+        except Exception:
+            return {}
+
+    def save_hash_index(self, index):
+        """ローカルのハッシュ索引を書き込む"""
+        with open(self.hash_index_file, 'w') as f:
+            self.ujson.dump(index, f)
+
+    @staticmethod
+    def _hexdigest(h):
+        return ''.join('{:02x}'.format(b) for b in h.digest())
+
+    def _file_size(self, path):
+        try:
+            return self.os.stat(path)[6]
+        except OSError:
+            return None
+
+    def _hash_file(self, h, path):
+        """ローカルファイルの内容で h を更新し、ファイルのサイズを返す"""
+        buf = bytearray(self.chunk_size)
+        mv = memoryview(buf)
+        size = 0
+        with open(path, 'rb') as f:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                h.update(mv[:n])
+                size += n
+        return size
+
+    def file_sha256(self, path):
+        """ローカルファイルの sha256 (16進文字列) を計算する。ファイルが無ければ None"""
+        h = self.hashlib.sha256()
+        try:
+            self._hash_file(h, path)
+        except OSError:
+            return None
+        return self._hexdigest(h)
+
+    def files_to_update(self, files, index):
+        """
+        versions.json のファイルのうち、ローカルと内容が違うものだけを返す。
+        sha256 が索引と一致し、サイズも一致するファイルはダウンロードしない。
+        sha256 の無い (古い形式の) エントリは常にダウンロードする。
+        索引に無いファイルはローカルのファイルから sha256 を計算して索引に加える。
+        """
+        changed = []
+        for file_info in files:
+            name = file_info['name']
+            sha256 = file_info.get('sha256')
+            size = self._file_size(name)
+            if sha256 is None or size is None or size != file_info.get('size', size):
+                changed.append(file_info)
+                continue
+            local = index.get(name)
+            if local is None:
+                # deploy.sh などで直接書き込まれたファイル
+                local = self.file_sha256(name)
+                index[name] = local
+            if local != sha256:
+                changed.append(file_info)
+        return changed
+
     def _ensure_dirs(self, file_path):
-        if '/' in file_path:
-            parts = file_path.split('/')[:-1]
-            path = ''
-            for i, part in enumerate(parts):
-                path = '/'.join(parts[:i+1])
-                try:
-                    self.os.mkdir(path)
-                except OSError as e:
-                    if e.args[0] != 17: # EEXIST
-                        raise
+        self.swap.ensure_dirs(file_path)
+
+    def _remove(self, path):
+        try:
+            self.os.remove(path)
+        except OSError:
+            pass
 
-    def download_file(self, url, dest_path):
-        """ファイルをダウンロードして指定されたパスに保存する"""
+    @staticmethod
+    def _other_variant(name):
+        """x.py なら x.mpy、x.mpy なら x.py を返す"""
+        if name.endswith('.mpy'):
+            return name[:-4] + '.py'
+        if name.endswith('.py'):
+            return name[:-3] + '.mpy'
+        return None
+
+    @staticmethod
+    def _header(resp, name):
+        """レスポンスのヘッダーを (大文字小文字を区別せずに) 返す"""
+        name = name.lower()
+        for key, value in (getattr(resp, 'headers', None) or {}).items():
+            if key.lower() == name:
+                return value
+        return None
+
+    def download_file(self, url, dest_path, sha256=None, size=None):
+        """
+        ファイルをダウンロードして指定されたパスに保存する。
+
+        受信したデータは dest_path + '.part' に書きながら sha256 を計算し、
+        sha256 が指定されていれば一致した時だけ dest_path に置き換える。
+        接続が切れた時は .part を残しておき、次回は HTTP の Range で続きからダウンロードする。
+        最初からダウンロードする時は圧縮した転送を要求し、受信しながら展開する。
+        """
         self.gc.collect()
         self._ensure_dirs(dest_path)
+        part_path = dest_path + '.part'
+        h = self.hashlib.sha256()
+        # 前回の続きがあれば、その分のハッシュを計算しておく
         try:
-            resp = self.urequests.get(url)
-            if resp.status_code == 200:
+            offset = self._hash_file(h, part_path)
+        except OSError:
+            offset = 0
+        if size is not None and offset > size:
+            self._remove(part_path)
+            h = self.hashlib.sha256()
+            offset = 0
+        start = self.time.ticks_ms()
+        received = 0
+        try:
+            if size is not None and offset == size:
+                # 前回、全部受信した後に失敗していた
+                resp = None
+                status = 206
+            else:
+                if offset:
+                    # 続きから: .part は展開後のデータなので、圧縮しないで受け取る
+                    headers = {'Range': f'bytes={offset}-'}
+                elif self.deflate:
+                    headers = {'Accept-Encoding': 'deflate'}
+                else:
+                    headers = {}
+                resp = self.urequests.get(url, headers=headers)
+                status = resp.status_code
+            if status == 200 and offset:
+                # サーバーが Range に対応していない: 最初からやり直す
+                msg = f"[OTA] Range not supported, restarting {dest_path}"
+                print(msg)
+                self.log.send_log(msg)
+                h = self.hashlib.sha256()
+                offset = 0
+            if status not in (200, 206):
+                print(f"[OTA] ERROR: Download failed (status={status}) url={url} dest={dest_path}")
+                self.log.send_log(f"[OTA] ERROR: Download failed (status={status}) url={url} dest={dest_path}")
+                return False
+
+            on_air = None
+            if resp:
+                stream = resp.raw
+                if self.deflate and self._header(resp, 'Content-Encoding') == 'deflate':
+                    # zlib 形式。展開に使うメモリ (ウィンドウ) の大きさはデータのヘッダーで決まる
+                    stream = self.deflate.DeflateIO(stream, self.deflate.ZLIB)
+                    on_air = self._header(resp, 'Content-Length')
                 # メモリ節約のため、チャンクで書き込む
-                buf = bytearray(256)
-                with open(dest_path, 'wb') as f:
+                buf = bytearray(self.chunk_size)
+                mv = memoryview(buf)
+                with open(part_path, 'ab' if offset else 'wb') as f:
                     while True:
-                        size = resp.raw.readinto(buf)
-                        if size == 0:
+                        n = stream.readinto(buf)
+                        if not n:
                             break
-                        f.write(buf, size)
-                return True
-            else:
-                print(f"[OTA] ERROR: Download failed (status={resp.status_code}) url={url} dest={dest_path}")
-                self.log.send_log(f"[OTA] ERROR: Download failed (status={resp.status_code}) url={url} dest={dest_path}")
+                        h.update(mv[:n])
+                        f.write(mv[:n])
+                        received += n
+
+            ms = max(self.time.ticks_diff(self.time.ticks_ms(), start), 1)
+            msg = f"[OTA] {dest_path}: {received} bytes in {ms} ms ({received * 1000 // ms} bytes/s)"
+            if on_air is not None:
+                msg += f", {on_air} bytes compressed"
+            if offset:
+                msg += f", resumed at {offset}"
+            print(msg)
+            self.log.send_log(msg)
+
+            if size is not None and offset + received < size:
+                # 途中で接続が切れた: .part を残して、次は続きから受け取る
+                msg = f"[OTA] ERROR: Connection closed at {offset + received}/{size} bytes dest={dest_path}"
+                print(msg)
+                self.log.send_log(msg)
+                return False
+
+            digest = self._hexdigest(h)
+            if sha256 is not None and digest != sha256:
+                print(f"[OTA] ERROR: sha256 mismatch dest={dest_path} expected={sha256} actual={digest}")
+                self.log.send_log(f"[OTA] ERROR: sha256 mismatch dest={dest_path} expected={sha256} actual={digest}")
+                self._remove(part_path)
                 return False
+
+            self._remove(dest_path)
+            self.os.rename(part_path, dest_path)
+            return True
         except Exception as e:
             print(f"[OTA] EXCEPTION: Download failed url={url} dest={dest_path} error={e}")
             self.log.send_log(f"[OTA] EXCEPTION: Download failed url={url} dest={dest_path} error={e}")
@@ -176,8 +367,16 @@ class OTAManager:
 
         try:
             url = self.server_url.rstrip('/') + '/versions.json'
-            resp = self.urequests.get(url)
+            # .mpy のバージョンを送ると、サーバーはコンパイル済みの .mpy を返す
+            resp = self.urequests.get(url, headers={'X-MPY-ABI': self.mpy_abi} if self.mpy_abi else {})
             if resp.status_code == 200:
+                pending = self.swap.pending()
+                if pending and not self.confirm_update():
+                    # 前回のアップデートが動くか確認できるまでは、元に戻せるように次のアップデートをしない
+                    msg = f"[OTA] Version {pending} is not confirmed yet, skipping update"
+                    print(msg)
+                    self.log.send_log(msg)
+                    return False
                 data = resp.json()
                 remote_version = data.get('version')
                 msg = f"[OTA] Remote version: {remote_version}"
@@ -189,26 +388,49 @@ class OTAManager:
                     print(msg)
                     self.log.send_log(msg)
 
-                    files_to_update = data.get('files', [])
+                    files = data.get('files', [])
+                    index = self.load_hash_index()
+                    files_to_update = self.files_to_update(files, index)
+                    msg = f"[OTA] {len(files_to_update)}/{len(files)} files changed"
+                    print(msg)
+                    self.log.send_log(msg)
+                    prev_index = dict(index)
+                    # .py と .mpy が両方あると .py が import されるので、入れ替える時にもう一方を消す
+                    removed = []
+                    for file_info in files_to_update:
+                        other = self._other_variant(file_info['name'])
+                        if other and self._file_size(other) is not None:
+                            removed.append(other)
+                            index.pop(other, None)
                     for file_info in files_to_update:
                         file_url = file_info['url']
-                        dest_path = file_info['name']
+                        name = file_info['name']
+                        dest_path = self.swap.stage_path(name)
+                        sha256 = file_info.get('sha256')
+                        if (sha256 is not None and self._file_size(dest_path) == file_info.get('size')
+                                and self.file_sha256(dest_path) == sha256):
+                            # 前回の途中までのアップデートでダウンロード済み
+                            index[name] = sha256
+                            continue
                         msg = f"[OTA] Downloading {file_url} to {dest_path}"
                         print(msg)
                         self.log.send_log(msg)
                         self.gc.collect()
-                        if self.download_file(file_url, dest_path):
+                        if self.download_file(file_url, dest_path, sha256, file_info.get('size')):
                             msg = f"[OTA] Downloaded {dest_path}"
                             print(msg)
                             self.log.send_log(msg)
+                            index[name] = sha256
                         else:
                             msg = f"[OTA] Failed to download {dest_path}"
                             print(msg)
                             self.log.send_log(msg)
-                            # エラー処理: アップデートを中止
+                            # エラー処理: アップデートを中止 (今のファイルはそのまま。ダウンロード済みのファイルは次回に使う)
                             return False
 
-                    self.set_current_version(remote_version)
+                    # 全部そろったので入れ替える
+                    self.swap.begin(remote_version, current_version,
+                                    [f['name'] for f in files_to_update], index, prev_index, removed)
                     msg = f"[OTA] Update complete. New version: {remote_version}"
                     print(msg)
                     self.log.send_log(msg)
@@ -235,6 +457,29 @@ class OTAManager:
         self.log.send_log(msg)
         return False
 
+    def uptime(self):
+        """OTAManager を作ってからの秒数"""
+        return self.time.ticks_diff(self.time.ticks_ms(), self.start_ms) // 1000
+
+    def confirm_update(self, force=False):
+        """
+        アップデート直後のバージョンを、動いたものとして記録する。
+
+        check_and_update (periodic_check) がサーバーから versions.json を取得できた時に呼ぶので、
+        アプリは OTAManager.periodic_check を定期的に呼んでいればよい。
+        起動から confirm_after 秒たっていなければ何もしない (force=True なら、すぐに確認済みにする)。
+        確認されないまま何回も起動すると、boot.py が元のバージョンに戻す。
+        確認済みにしたバージョンを返す。
+        """
+        if not force and self.uptime() < self.confirm_after:
+            return None
+        version = self.swap.confirm()
+        if version:
+            msg = f"[OTA] Version {version} confirmed after {self.uptime()} s"
+            print(msg)
+            self.log.send_log(msg)
+        return version
+
     def periodic_check(self):
         """定期チェック。最後のチェック時間から check_interval 秒が経過していれば check_and_update を呼ぶ。"""
         try:
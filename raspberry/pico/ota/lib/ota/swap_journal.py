@@ -0,0 +1,203 @@
+class SwapJournal:
+    """
+    OTA アップデートの A/B 切り替え。
+
+    新しいリリースのファイルは stage_dir にダウンロードしておき、全部そろってから
+    journal_file に切り替えの内容を書いて、1 ファイルずつ rename で入れ替える。
+    元のファイルは backup_dir に移しておき、新しいバージョンが max_boots 回起動しても
+    confirm() されなければ、boot() が元のファイルに戻す。
+
+    journal_file の state:
+      "swap"  ... 入れ替え中 (途中で電源が切れたら、次の起動で続きを行う)
+      "trial" ... 入れ替え済みで、新しいバージョンが動くかの確認待ち
+      "rollback" ... 元に戻し中 (途中で電源が切れたら、次の起動で続きを行う)
+    """
+    def __init__(self, journal_file="ota_journal.json", stage_dir="ota_stage", backup_dir="ota_backup",
+                 max_boots=3, version_file="version.txt", hash_index_file="ota_hashes.json",
+                 ujson_mod=None, os_mod=None):
+        self.journal_file = journal_file
+        self.stage_dir = stage_dir
+        self.backup_dir = backup_dir
+        self.max_boots = max_boots
+        self.version_file = version_file
+        self.hash_index_file = hash_index_file
+        self.ujson = ujson_mod if ujson_mod else __import__('ujson')
+        self.os = os_mod if os_mod else __import__('os')
+
+    def stage_path(self, name):
+        return self.stage_dir + '/' + name
+
+    def backup_path(self, name):
+        return self.backup_dir + '/' + name
+
+    def load(self):
+        """ジャーナルを読み込む。切り替え中でなければ None"""
+        try:
+            with open(self.journal_file, 'r') as f:
+                return self.ujson.load(f)
+        except Exception:
+            return None
+
+    def save(self, journal):
+        """ジャーナルを書き込む (書きかけのジャーナルが残らないように、一時ファイルから rename する)"""
+        tmp = self.journal_file + '.tmp'
+        with open(tmp, 'w') as f:
+            self.ujson.dump(journal, f)
+        self.os.rename(tmp, self.journal_file)
+
+    def pending(self):
+        """確認待ちの新しいバージョンがあれば、そのバージョンを返す"""
+        journal = self.load()
+        return journal['version'] if journal else None
+
+    def begin(self, version, prev_version, files, index, prev_index, removed=()):
+        """
+        stage_dir にそろったファイル (files) を入れ替え、removed のファイルを消す。
+        index / prev_index は切り替え後 / 切り替え前のハッシュ索引。
+        """
+        self.rmtree(self.backup_dir)
+        # 切り替え前に無かったファイルは、元に戻す時に消す
+        new = [name for name in files if not self.exists(name)]
+        journal = {
+            'state': 'swap', 'version': version, 'prev_version': prev_version,
+            'files': files, 'new': new, 'removed': list(removed), 'index': index, 'prev_index': prev_index,
+            'boots': 0,
+        }
+        self.save(journal)
+        self._swap(journal)
+
+    def _swap(self, journal):
+        # 何回やり直しても同じ結果になる: stage_dir に残っているファイルだけを入れ替える
+        for name in journal['files']:
+            stage = self.stage_path(name)
+            if not self.exists(stage):
+                continue
+            backup = self.backup_path(name)
+            if self.exists(name) and not self.exists(backup):
+                self.ensure_dirs(backup)
+                self.os.rename(name, backup)
+            self.ensure_dirs(name)
+            self.os.rename(stage, name)
+        for name in journal.get('removed', ()):
+            # 消すファイルも、元に戻せるように backup_dir に移す
+            backup = self.backup_path(name)
+            if self.exists(name) and not self.exists(backup):
+                self.ensure_dirs(backup)
+                self.os.rename(name, backup)
+        self._write(self.version_file, journal['version'])
+        self._write_json(self.hash_index_file, journal['index'])
+        journal['state'] = 'trial'
+        self.save(journal)
+
+    def confirm(self):
+        """新しいバージョンが動いたので、元のファイルを消す。確認したバージョンを返す"""
+        journal = self.load()
+        if journal is None:
+            return None
+        if journal['state'] == 'rollback':
+            # 元に戻している途中なので、新しいバージョンは確認できない
+            self.rollback(journal)
+            return None
+        if journal['state'] == 'swap':
+            self._swap(journal)
+        self._remove(self.journal_file)
+        self.rmtree(self.backup_dir)
+        self.rmtree(self.stage_dir)
+        return journal['version']
+
+    def rollback(self, journal=None):
+        """元のファイルに戻す。戻したバージョンを返す"""
+        journal = journal or self.load()
+        if journal is None:
+            return None
+        if journal['state'] != 'rollback':
+            journal['state'] = 'rollback'
+            self.save(journal)
+        # 何回やり直しても同じ結果になる: 戻し済みのファイルは backup も stage も無いので触らない
+        new = journal.get('new', ())
+        for name in journal['files']:
+            backup = self.backup_path(name)
+            if self.exists(backup):
+                self._remove(name)
+                self.os.rename(backup, name)
+            elif name in new:
+                # 新しいバージョンで増えたファイル
+                self._remove(name)
+        for name in journal.get('removed', ()):
+            backup = self.backup_path(name)
+            if self.exists(backup):
+                self.os.rename(backup, name)
+        self._write(self.version_file, journal['prev_version'])
+        self._write_json(self.hash_index_file, journal['prev_index'])
+        self._remove(self.journal_file)
+        self.rmtree(self.backup_dir)
+        self.rmtree(self.stage_dir)
+        return journal['prev_version']
+
+    def boot(self):
+        """
+        boot.py から起動のたびに呼ぶ。
+        入れ替えの途中なら続きを行い、確認待ちのまま max_boots 回を超えて起動したら元に戻す。
+        元に戻した時は戻したバージョンを返す。
+        """
+        journal = self.load()
+        if journal is None:
+            return None
+        if journal['state'] == 'rollback':
+            print("[OTA] Resuming rollback to", journal['prev_version'])
+            return self.rollback(journal)
+        if journal['state'] == 'swap':
+            print("[OTA] Resuming swap to", journal['version'])
+            self._swap(journal)
+        journal['boots'] += 1
+        if journal['boots'] > self.max_boots:
+            print("[OTA] Version", journal['version'], "was not confirmed after",
+                  self.max_boots, "boots, rolling back to", journal['prev_version'])
+            return self.rollback(journal)
+        self.save(journal)
+        return None
+
+    def exists(self, path):
+        try:
+            self.os.stat(path)
+            return True
+        except OSError:
+            return False
+
+    def ensure_dirs(self, file_path):
+        """file_path の親ディレクトリを作る"""
+        if '/' in file_path:
+            parts = file_path.split('/')[:-1]
+            for i in range(len(parts)):
+                try:
+                    self.os.mkdir('/'.join(parts[:i+1]))
+                except OSError as e:
+                    if e.args[0] != 17: # EEXIST
+                        raise
+
+    def rmtree(self, path):
+        """ディレクトリを中身ごと消す (無ければ何もしない)"""
+        try:
+            mode = self.os.stat(path)[0]
+        except OSError:
+            return
+        if mode & 0x4000:
+            for name in self.os.listdir(path):
+                self.rmtree(path + '/' + name)
+            self.os.rmdir(path)
+        else:
+            self.os.remove(path)
+
+    def _remove(self, path):
+        try:
+            self.os.remove(path)
+        except OSError:
+            pass
+
+    def _write(self, path, text):
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def _write_json(self, path, data):
+        with open(path, 'w') as f:
+            self.ujson.dump(data, f)
@@ -0,0 +1,75 @@
+"""
+lib/ota のモジュールの import にかかる時間とメモリを測り、1 行の JSON で出力する。
+
+.py のままの時と、OTA で .mpy に置き換わった後の Pico で実行して比べる:
+
+    import ota_import_bench
+    ota_import_bench.main()
+
+それぞれのモジュールは sys.modules から消してから import するので、毎回最初から読み込まれる。
+(.py の時は、コンパイルの時間とメモリも含まれる)
+正確に測るには、実行する前に Pico をソフトリセットする。
+"""
+import gc
+import json
+import os
+import sys
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    # PC ではメモリは測らない
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(ticks1, ticks2):
+        return ticks1 - ticks2
+
+MODULES = (
+    "lib.ota.log_helper",
+    "lib.ota.swap_journal",
+    "lib.ota.ota_manager",
+    "lib.ota.ota_enabled_app",
+    )
+
+def _unload(package):
+    for name in list(sys.modules):
+        if name == package or name.startswith(package + "."):
+            del sys.modules[name]
+
+def _variant(module):
+    """Pico にある module のファイルの種類 ("py" か "mpy")"""
+    path = module.replace(".", "/")
+    for ext in ("py", "mpy"):
+        try:
+            os.stat(path + "." + ext)
+            return ext
+        except OSError:
+            pass
+    return None
+
+def measure(module):
+    """module を最初から import した時のマイクロ秒と、使ったヒープのバイト数 (測れなければ None) を返す"""
+    _unload("lib")
+    gc.collect()
+    free = gc.mem_free() if hasattr(gc, "mem_free") else None
+    start = ticks_us()
+    __import__(module)
+    duration = ticks_diff(ticks_us(), start)
+    gc.collect()
+    used = free - gc.mem_free() if free is not None else None
+    return {"variant": _variant(module), "us": duration, "bytes": used}
+
+def main():
+    result = {
+        "implementation": sys.implementation.name,
+        "platform": sys.platform,
+        "modules": {module: measure(module) for module in MODULES},
+        }
+    print(json.dumps(result))
+    return result
+
+if __name__ == "__main__":
+    main()
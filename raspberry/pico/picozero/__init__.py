@@ -0,0 +1,118 @@
+"""
+picozero, split into submodules which are only imported when one of their
+names is first used, so that e.g. ``from picozero import LED`` doesn't load
+the code for motors or sensors. ``pico_led`` and ``pico_temp_sensor`` are
+also only created, and their pins only claimed, when first used, so they
+are left out of ``from picozero import *`` and must be imported by name.
+Star imports still load every submodule.
+"""
+
+_MODULES = {
+    # core
+    "PWMChannelAlreadyInUse": "core",
+    "EventFailedScheduleQueueFull": "core",
+    "clamp": "core",
+    "ease_linear": "core",
+    "ease_in": "core",
+    "ease_out": "core",
+    "ease_in_out": "core",
+    "EASINGS": "core",
+    "easing_function": "core",
+    "pinout": "core",
+    "PinMixin": "core",
+    "PinsMixin": "core",
+    "Scheduler": "core",
+    "scheduler": "core",
+    "AsyncScheduler": "core",
+    "async_scheduler": "core",
+    "ValueChange": "core",
+    "DutyTable": "core",
+    "TableCache": "core",
+    "TableChange": "core",
+    "Debouncer": "core",
+    "InputEvents": "core",
+    "input_events": "core",
+    "Histogram": "core",
+    "instrument": "core",
+    "stats": "core",
+    "MedianFilter": "core",
+    "EMAFilter": "core",
+    "RunningAverage": "core",
+    "FilterChain": "core",
+
+    # outputs
+    "OutputDevice": "outputs",
+    "DigitalOutputDevice": "outputs",
+    "DigitalLED": "outputs",
+    "Buzzer": "outputs",
+    "PWMOutputDevice": "outputs",
+    "PWMLED": "outputs",
+    "brightness_linear": "outputs",
+    "brightness_gamma": "outputs",
+    "brightness_cie1931": "outputs",
+    "brightness_exponential": "outputs",
+    "BRIGHTNESS_CURVES": "outputs",
+    "brightness_curve": "outputs",
+    "LED": "outputs",
+    "RGBLED": "outputs",
+    "PWMGroup": "outputs",
+    "LEDBoard": "outputs",
+    "LEDBarGraph": "outputs",
+    "pico_led": "outputs",
+
+    # audio
+    "PWMBuzzer": "audio",
+    "Speaker": "audio",
+    "MIDI_FREQS": "audio",
+    "note_to_midi": "audio",
+    "Tune": "audio",
+
+    # motion
+    "MOTION_PROFILES": "motion",
+    "MotionChange": "motion",
+    "MotionMixin": "motion",
+    "Motor": "motion",
+    "Robot": "motion",
+    "Rover": "motion",
+    "Servo": "motion",
+    "ServoGroup": "motion",
+
+    # inputs
+    "InputDevice": "inputs",
+    "DigitalInputDevice": "inputs",
+    "Switch": "inputs",
+    "Button": "inputs",
+    "AnalogInputDevice": "inputs",
+    "Potentiometer": "inputs",
+    "Pot": "inputs",
+
+    # sensors
+    "pico_temp_conversion": "sensors",
+    "TemperatureSensor": "sensors",
+    "TempSensor": "sensors",
+    "Thermistor": "sensors",
+    "pico_temp_sensor": "sensors",
+    "DistanceSensor": "sensors",
+    }
+
+# created on first use rather than when their module is imported
+_SINGLETONS = ("pico_led", "pico_temp_sensor")
+
+# so that ``from picozero import *`` imports every name, each through
+# __getattr__, except the singletons, which would claim their pins
+__all__ = tuple(name for name in _MODULES if name not in _SINGLETONS)
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError("module 'picozero' has no attribute '{}'".format(name))
+
+    module = __import__("picozero." + module, None, None, (name, ))
+    if name in _SINGLETONS:
+        value = getattr(module, "_create_" + name)()
+    else:
+        value = getattr(module, name)
+
+    # cache it, so __getattr__ isn't called for it again
+    globals()[name] = value
+    return value
@@ -0,0 +1,374 @@
+"""
+Buzzers and speakers which play tones and tunes.
+"""
+from array import array
+from .core import PWMChannelAlreadyInUse, PinMixin, DutyTable, TableCache
+from .outputs import OutputDevice, PWMOutputDevice
+
+# the frequency, in hertz, of each MIDI note
+MIDI_FREQS = array('H', [round(440 * 2 ** ((n - 69) / 12)) for n in range(129)])
+
+# the semitones above C of the notes a - g
+_SEMITONES = b"\x09\x0b\x00\x02\x04\x05\x07"
+
+def note_to_midi(note):
+    """
+    Returns the MIDI note number of a note name, e.g. ``"a4"`` is 69. A
+    name is a letter ``a`` - ``g``, an optional ``#`` (sharp) or ``b``
+    (flat) and an octave number.
+
+    :param str note:
+        The name of the note.
+    """
+    name = note.lower()
+    letter = ord(name[0]) - 97 if len(name) > 1 else -1
+    if not 0 <= letter < 7:
+        raise ValueError("{} is not a note".format(note))
+    midi = _SEMITONES[letter]
+    octave = name[1:]
+    if octave[0] == "#":
+        midi += 1
+        octave = octave[1:]
+    elif octave[0] == "b":
+        midi -= 1
+        octave = octave[1:]
+    try:
+        midi += 12 * (int(octave) + 1)
+    except ValueError:
+        raise ValueError("{} is not a note".format(note))
+    if not 0 <= midi < len(MIDI_FREQS):
+        raise ValueError("{} is out of range".format(note))
+    return midi
+
+class _Notes:
+    # Speaker.NOTES, note names to frequencies, worked out when they're
+    # used rather than stored in a dictionary
+    __slots__ = ()
+
+    def __getitem__(self, note):
+        return MIDI_FREQS[note_to_midi(note)]
+
+    def __contains__(self, note):
+        try:
+            note_to_midi(note)
+        except ValueError:
+            return False
+        return True
+
+class PWMBuzzer(PWMOutputDevice):
+    """
+    Represents a passive buzzer driven by a PWM pin; the volume of the buzzer can be changed.
+
+    :param int pin:
+        The pin that the buzzer is connected to.
+
+    :param int freq:
+        The frequency of the PWM signal in hertz. Defaults to 440.
+
+    :param int duty_factor:
+        The duty factor of the PWM signal. This is a value between 0 and 65535.
+        Defaults to 1023.
+
+    :param bool active_high:
+        If :data:`True` (the default), the :meth:`on` method will set the Pin
+        to HIGH. If :data:`False`, the :meth:`on` method will set the Pin to
+        LOW (the :meth:`off` method always does the opposite).
+
+    :param bool initial_value:
+        If :data:`False` (the default), the buzzer will be off initially.  If
+        :data:`True`, the buzzer will be switched on initially.
+    """    
+    __slots__ = ()
+    def __init__(self, pin, freq=440, duty_factor=1023, active_high=True, initial_value=False):
+        super().__init__(pin, freq, duty_factor, active_high, initial_value)
+
+PWMBuzzer.volume = PWMBuzzer.value
+PWMBuzzer.beep = PWMBuzzer.blink
+PWMBuzzer.abeep = PWMBuzzer.ablink
+
+class Speaker(OutputDevice, PinMixin):
+    """
+    Represents a speaker driven by a PWM pin.
+
+    :param int pin:
+        The pin that the speaker is connected to.
+
+    :param int initial_freq:
+        The initial frequency of the PWM signal in hertz. Defaults to 440.
+    
+    :param int initial_volume:
+        The initial volume of the PWM signal. This is a value between 0 and
+        1. Defaults to 0.
+
+    :param int duty_factor:
+        The duty factor of the PWM signal. This is a value between 0 and 65535.
+        Defaults to 1023.
+
+    :param bool active_high:
+        If :data:`True` (the default), the :meth:`on` method will set the Pin
+        to HIGH. If :data:`False`, the :meth:`on` method will set the Pin to
+        LOW (the :meth:`off` method always does the opposite).
+    """    
+    __slots__ = ("_pin_num", "_pwm_buzzer", "_volume")
+    NOTES = _Notes()
+    
+    def __init__(self, pin, initial_freq=440, initial_volume=0, duty_factor=1023, active_high=True):
+        
+        self._pin_num = pin
+        self._pwm_buzzer = PWMBuzzer(
+            pin,
+            freq=initial_freq,
+            duty_factor=duty_factor,
+            active_high=active_high,
+            initial_value=None,
+            )
+        # a tune changes the frequency, so the whole PWM slice is needed
+        try:
+            self._pwm_buzzer._check_slice_freq(
+                PWMOutputDevice.PIN_TO_PWM_CHANNEL[pin],
+                None
+                )
+        except PWMChannelAlreadyInUse:
+            self._pwm_buzzer.close()
+            raise
+        
+        super().__init__(active_high, None)
+        self.volume = initial_volume
+        
+    def on(self, volume=1):
+        self.volume = volume
+        
+    def off(self):
+        self.volume = 0
+
+    @property
+    def value(self):
+        """
+        Sets or returns the value of the speaker. The value is a tuple of (freq, volume).
+        """
+        return tuple(self.freq, self.volume)
+
+    @value.setter
+    def value(self, value):
+        self._stop_change()
+        self._write(value)
+
+    @property
+    def volume(self):
+        """
+        Sets or returns the volume of the speaker: 1 for maximum volume, 0 for off.
+        """
+        return self._volume
+
+    @volume.setter
+    def volume(self, value):
+        self._volume = value
+        self.value = (self.freq, self.volume)
+        
+    @property
+    def freq(self):
+        """
+        Sets or returns the current frequency of the speaker.
+        """
+        return self._pwm_buzzer.freq
+    
+    @freq.setter
+    def freq(self, freq):
+        self.value = (freq, self.volume)
+        
+    def _write(self, value):
+        # set the frequency
+        if value[0] is not None:
+            self._pwm_buzzer._pwm.freq(value[0])
+        
+        # write the volume value
+        if value[1] is not None:
+            self._pwm_buzzer.volume = value[1]
+
+    def _write_frame(self, duties, i):
+        # a frame of a compiled Tune is (freq, volume), a freq of 0 is a rest
+        freq = duties[i]
+        if freq:
+            self._pwm_buzzer._pwm.freq(freq)
+        self._pwm_buzzer._write_frame(duties, i + 1)
+
+    @staticmethod
+    def _to_freq(freq):
+        if freq is not None and freq != '' and freq != 0: 
+            if type(freq) is str:
+                return MIDI_FREQS[note_to_midi(freq)]
+            elif freq <= 128 and freq > 0: # MIDI
+                return MIDI_FREQS[int(freq)]
+            else:
+                return freq
+        else:
+            return None
+
+    def beep(self, on_time=1, off_time=None, n=None, wait=False, fade_in_time=0, fade_out_time=None, fps=25):
+        """
+        Makes the buzzer turn on and off repeatedly.
+        
+        :param float on_time:
+            The length of time in seconds that the device will be on. Defaults to 1.
+
+        :param float off_time:
+            The length of time in seconds that the device will be off. If `None`, 
+            it will be the same as ``on_time``. Defaults to `None`.
+
+        :param int n:
+            The number of times to repeat the beep operation. If `None`, the 
+            device will continue beeping forever. The default is `None`.
+
+        :param bool wait:
+           If True, the method will block until the buzzer stops beeping. If False,
+           the method will return and the buzzer will beep in the background.
+           Defaults to False.
+
+        :param float fade_in_time:
+            The length of time in seconds to spend fading in. Defaults to 0.
+
+        :param float fade_out_time:
+            The length of time in seconds to spend fading out. If `None`,
+            it will be the same as ``fade_in_time``. Defaults to `None`.
+
+        :param int fps:
+           The frames per second that will be used to calculate the number of
+           steps between off/on states when fading. Defaults to 25.
+        """
+        self._pwm_buzzer.blink(on_time, off_time, n, wait, fade_in_time, fade_out_time, fps)
+
+    async def abeep(self, on_time=1, off_time=None, n=1, fade_in_time=0, fade_out_time=None, fps=25):
+        """
+        Makes the buzzer turn on and off repeatedly, returning an awaitable
+        which completes once the buzzer has stopped. See
+        :meth:`PWMOutputDevice.ablink`.
+        """
+        await self._pwm_buzzer.ablink(on_time, off_time, n, fade_in_time, fade_out_time, fps)
+
+    def play(self, tune=440, duration=1, volume=1, n=1, wait=True):
+        """
+        Plays a tune for a given duration. 
+
+        :param int tune:
+
+            The tune to play can be specified as:
+
+                + a single "note", represented as:
+                  + a frequency in Hz e.g. `440`
+                  + a midi note e.g. `60`
+                  + a note name as a string e.g. `"E4"`
+                + a list of notes and duration e.g. `[440, 1]` or `["E4", 2]`
+                + a list of two value tuples of (note, duration) e.g. `[(440,1), (60, 2), ("e4", 3)]`
+                + a :class:`Tune`, which has already been compiled
+
+            Defaults to `440`.
+        
+        :param int volume:
+            The volume of the tune; 1 is maximum volume, 0 is mute. Defaults to 1.
+
+        :param float duration:
+            The duration of each note in seconds. Defaults to 1.
+
+        :param int n:
+           The number of times to play the tune. If None, the tune will play
+           forever. Defaults to 1.
+    
+        :param bool wait:
+           If True, the method will block until the tune has finished. If False,
+           the method will return and the tune will play in the background.
+           Defaults to True.
+        """
+
+        self.off()
+        self._start_table(self._tune(tune, duration, volume), n, wait)
+
+    async def aplay(self, tune=440, duration=1, volume=1, n=1):
+        """
+        Plays a tune, returning an awaitable which completes once the tune
+        has finished. The tune is played from the asyncio event loop,
+        rather than a timer, so it can be used alongside other asyncio
+        tasks. Cancelling the awaiting task stops the tune.
+
+        The parameters are the same as :meth:`play`.
+        """
+        self.off()
+        await self._play_table(self._tune(tune, duration, volume), n)
+
+    @staticmethod
+    def _tune(tune, duration, volume):
+        if isinstance(tune, Tune):
+            return tune
+        return Speaker._tunes.get((Tune._key(tune), duration, volume))
+
+    def close(self):
+        self._stop_change()
+        self._pwm_buzzer.close()
+
+class Tune(DutyTable):
+    """
+    A tune compiled for :meth:`Speaker.play`. Note names and midi numbers
+    are converted to frequencies once, when the tune is compiled, so playing
+    it only steps through the packed ``(freq_hz, volume)`` frames::
+
+        from picozero import Speaker, Tune
+
+        speaker = Speaker(5)
+        tune = Tune([["d5", 0.4], ["e5", 0.4], ["c5", 0.8]])
+        speaker.play(tune, n=3)
+
+    :meth:`Speaker.play` compiles (and caches) tunes it is given in any
+    other form, so compiling a tune yourself is only needed to control when
+    the work happens.
+
+    :param tune:
+        The tune to compile, in any of the forms accepted by
+        :meth:`Speaker.play`. Defaults to `440`.
+
+    :param float duration:
+        The duration of each note given without one, in seconds. Defaults
+        to 1.
+
+    :param float volume:
+        The volume of the tune; 1 is maximum volume, 0 is mute. Defaults
+        to 1.
+    """
+    __slots__ = ()
+    def __init__(self, tune=440, duration=1, volume=1):
+        super().__init__(2)
+
+        # tune isn't a list, so it must be a single frequency or note
+        if not isinstance(tune, (list, tuple)):
+            tune = [(tune, duration)]
+        # if the first element isn't a list, then it must be list of a single note and duration
+        elif not isinstance(tune[0], (list, tuple)):
+            tune = [tune]
+
+        for note in tune:
+            
+            # note isn't a list or tuple, it must be a single frequency or note
+            if not isinstance(note, (list, tuple)):
+                # make it into a tuple
+                note = (note, duration)
+
+            # turn the notes into frequencies
+            freq = Speaker._to_freq(note[0])
+            freq_duration = note[1]
+            freq_volume = int(65535 * volume) if freq is not None else 0
+            freq = 0 if freq is None else freq
+            
+            # if this is a tune of greater than 1 note, add gaps between notes
+            if len(tune) == 1:
+                self.append(freq_duration, freq, freq_volume)
+            else:
+                self.append(freq_duration * 0.9, freq, freq_volume)
+                self.append(freq_duration * 0.1, freq, 0)
+
+    @staticmethod
+    def _key(tune):
+        # a hashable version of a tune, used to cache compiled tunes
+        if isinstance(tune, (list, tuple)):
+            return tuple(Tune._key(note) for note in tune)
+        return tune
+
+Speaker._tunes = TableCache(Tune)
+
@@ -0,0 +1,1185 @@
+"""
+The hardware interface and the classes shared by every picozero device.
+"""
+try:
+    from machine import Pin, PWM, Timer, ADC, disable_irq, enable_irq, mem32
+    from micropython import schedule, const
+    from time import ticks_ms, ticks_us, ticks_diff, ticks_add, sleep, sleep_us
+except ImportError:
+    # not running on a board, use the simulated hardware
+    from .sim import Pin, PWM, Timer, ADC, disable_irq, enable_irq, mem32
+    from .sim import schedule, const
+    from .sim import ticks_ms, ticks_us, ticks_diff, ticks_add, sleep, sleep_us
+from array import array
+
+try:
+    from heapq import heappush, heappop
+except ImportError:
+    # older versions of micropython only provide uheapq
+    from uheapq import heappush, heappop
+
+###############################################################################
+# EXCEPTIONS
+###############################################################################
+
+class PWMChannelAlreadyInUse(Exception):
+    pass
+
+class EventFailedScheduleQueueFull(Exception):
+    pass
+
+###############################################################################
+# SUPPORTING CLASSES
+###############################################################################
+
+def clamp(n, low, high): return max(low, min(n, high))
+
+def ease_linear(t): return t
+
+def ease_in(t): return t * t
+
+def ease_out(t): return t * (2 - t)
+
+def ease_in_out(t): return t * t * (3 - 2 * t)
+
+EASINGS = {
+    "linear": ease_linear,
+    "in": ease_in,
+    "out": ease_out,
+    "in_out": ease_in_out,
+    }
+
+def easing_function(easing):
+    """
+    Returns the easing function for ``easing``, which can be the name of one
+    of the :data:`EASINGS` (``"linear"``, ``"in"``, ``"out"`` or
+    ``"in_out"``) or a function which maps a value between 0 and 1 to a
+    value between 0 and 1.
+    """
+    if easing is None:
+        return ease_linear
+    if callable(easing):
+        return easing
+    return EASINGS[easing]
+
+def pinout(output=True):
+    """
+    Returns a textual representation of the Raspberry Pi pico pins and functions.
+
+    :param bool output:
+        If :data:`True` (the default) the pinout will be "printed".
+        
+    """
+    pins = """        ---usb---
+GP0  1  |o     o| -1  VBUS
+GP1  2  |o     o| -2  VSYS
+GND  3  |o     o| -3  GND
+GP2  4  |o     o| -4  3V3_EN
+GP3  5  |o     o| -5  3V3(OUT)
+GP4  6  |o     o| -6           ADC_VREF
+GP5  7  |o     o| -7  GP28     ADC2
+GND  8  |o     o| -8  GND      AGND
+GP6  9  |o     o| -9  GP27     ADC1
+GP7  10 |o     o| -10 GP26     ADC0
+GP8  11 |o     o| -11 RUN
+GP9  12 |o     o| -12 GP22
+GND  13 |o     o| -13 GND
+GP10 14 |o     o| -14 GP21
+GP11 15 |o     o| -15 GP20
+GP12 16 |o     o| -16 GP19
+GP13 17 |o     o| -17 GP18
+GND  18 |o     o| -18 GND
+GP14 19 |o     o| -19 GP17
+GP15 20 |o     o| -20 GP16
+        ---------"""
+
+    if output:
+        print(pins)
+    return pins
+
+class PinMixin:
+    """
+    Mixin used by devices that have a single pin number.
+    """
+    __slots__ = ()
+
+    @property
+    def pin(self):
+        """
+        Returns the pin number used by the device.
+        """
+        return self._pin_num
+
+    def __str__(self):
+        return "{} (pin {})".format(self.__class__.__name__, self._pin_num)
+
+class PinsMixin:
+    """
+    Mixin used by devices that use multiple pins.
+    """
+    __slots__ = ()
+
+    @property
+    def pins(self):
+        """
+        Returns a tuple of pins used by the device.
+        """
+        return self._pin_nums
+
+    def __str__(self):
+        return "{} (pins - {})".format(self.__class__.__name__, self._pin_nums)
+        
+class Scheduler:
+    """
+    Internal class that drives every active sequence from a single one-shot
+    timer.
+
+    Sequences are kept in a min-heap keyed by the time of their next step,
+    so each tick only touches the sequences that are due, and the timer is
+    re-armed for the step at the head of the heap. The timer is only
+    running while at least one sequence is active.
+
+    :param int min_delay:
+        The shortest time, in microseconds, the timer is armed for, so that
+        sequences whose steps have no hold can't monopolise the CPU. Steps
+        due within this time of a tick are run in that tick. Defaults to
+        100.
+    """
+    def __init__(self, min_delay=100):
+        self._min_delay = min_delay
+        self._timer = None
+        self._ticking = False
+        self._in_tick = False
+        self._heap = []
+        self._active = {}
+        self._now = 0
+        self._last = ticks_us()
+        self._count = 0
+        self._ticks = 0
+        self._max_overrun = 0
+        self._max_tick = 0
+
+    def _clock(self):
+        # a free running microsecond clock which, unlike ticks_us, does
+        # not wrap around, so it can be used to order the heap
+        t = ticks_us()
+        self._now += ticks_diff(t, self._last)
+        self._last = t
+        return self._now
+
+    def _push(self, device, change, due):
+        self._count += 1
+        change._token = self._count
+        heappush(self._heap, (due, self._count, device, change))
+
+    def _start_timer(self):
+        # (re)arm the timer for the step at the head of the heap, unless
+        # this is called from a tick, which arms it once it has finished
+        if not self._in_tick and self._heap:
+            if self._timer is None:
+                self._timer = Timer()
+            delay = max(self._heap[0][0] - self._clock(), self._min_delay)
+            self._timer.init(mode=Timer.ONE_SHOT, period=delay, tick_hz=1000000, callback=self._tick)
+            self._ticking = True
+
+    def _stop_timer(self):
+        if self._ticking:
+            self._timer.deinit()
+            self._ticking = False
+        del self._heap[:]
+
+    def _tick(self, timer_obj=None):
+        # _start_timer reads the clock again, so time the tick from here
+        start = ticks_us()
+        now = self._clock()
+        self._ticks += 1
+        self._ticking = False
+        heap = self._heap
+        # steps rescheduled during this tick are left for the next one, so
+        # a repeating sequence whose steps have no hold can't stall the tick
+        last = self._count
+        horizon = now + self._min_delay
+        self._in_tick = True
+        while heap and heap[0][0] <= horizon and heap[0][1] <= last:
+            due, token, device, change = heappop(heap)
+            if change._token != token:
+                # the sequence was cancelled or restarted
+                continue
+
+            overrun = max(now - due, 0)
+            if overrun > self._max_overrun:
+                self._max_overrun = overrun
+            if _instrumented:
+                _record_late(device, overrun)
+
+            delay = change._step()
+            if delay is None:
+                self._remove(device, change)
+                change._finish()
+            else:
+                # schedule from the due time rather than now, so that
+                # lateness doesn't accumulate over the sequence (a step
+                # with no hold runs in the next tick)
+                self._push(device, change, due + delay if delay > 0 else now)
+        self._in_tick = False
+
+        if not self._active:
+            self._stop_timer()
+        else:
+            self._start_timer()
+
+        duration = ticks_diff(ticks_us(), start)
+        if duration > self._max_tick:
+            self._max_tick = duration
+
+    def _remove(self, device, change):
+        change._token = 0
+        if self._active.get(device) is change:
+            del self._active[device]
+
+    def start(self, device, change, delay=None):
+        """
+        Starts running a sequence for a device, replacing any sequence that
+        the device is already running.
+
+        A sequence is any object with a ``_step`` method, which performs the
+        next step and returns the number of microseconds until the
+        following one (or :data:`None` once it has finished), and a
+        ``_finish`` method, which is called when it has finished.
+
+        :param device:
+            The device the sequence belongs to.
+
+        :param change:
+            The sequence to run, e.g. a :class:`ValueChange`.
+
+        :param int delay:
+            The number of microseconds to wait before the first step. If
+            :data:`None` (the default), the first step is run immediately.
+        """
+        self.cancel(device)
+        if not self._active:
+            # the clock isn't updated while idle, so restart it from now
+            self._last = ticks_us()
+
+        if delay is None:
+            delay = change._step()
+            if delay is None:
+                change._finish()
+                return
+
+        self._active[device] = change
+        self._push(device, change, self._clock() + delay)
+        self._start_timer()
+
+    def stop(self, device):
+        """
+        Stops the sequence a device is running and turns the device off.
+
+        :param device:
+            The device to stop.
+        """
+        change = self._active.get(device)
+        if change is not None:
+            self._remove(device, change)
+            change._finish()
+        if not self._active:
+            self._stop_timer()
+
+    def cancel(self, device):
+        """
+        Cancels the sequence a device is running, leaving the device in
+        its current state.
+
+        :param device:
+            The device to cancel.
+        """
+        change = self._active.get(device)
+        if change is not None:
+            self._remove(device, change)
+            change._running = False
+        if not self._active:
+            self._stop_timer()
+
+    def is_active(self, device):
+        """
+        Returns :data:`True` if the device is running a sequence.
+        """
+        return device in self._active
+
+    def stats(self, reset=False):
+        """
+        Returns a dictionary describing the scheduler:
+
+            + ``active`` - the number of sequences running
+            + ``ticks`` - the number of timer ticks so far
+            + ``max_overrun_us`` - the worst delay between when a step was
+              due and when it was run, in microseconds
+            + ``max_tick_us`` - the longest time spent in a single tick, in
+              microseconds
+
+        :param bool reset:
+            If :data:`True`, the counters are reset after being read.
+            Defaults to :data:`False`.
+        """
+        stats = {
+            "active": len(self._active),
+            "ticks": self._ticks,
+            "max_overrun_us": self._max_overrun,
+            "max_tick_us": self._max_tick,
+            }
+        if reset:
+            self._ticks = 0
+            self._max_overrun = 0
+            self._max_tick = 0
+        return stats
+
+scheduler = Scheduler()
+
+class AsyncScheduler(Scheduler):
+    """
+    Internal class that drives sequences from a single ``uasyncio`` task
+    rather than a timer, so that animations share the event loop with the
+    rest of an asyncio program (e.g. bluetooth) instead of interrupting it.
+
+    The task is created when the first sequence starts and ends when the
+    last one finishes. Each AsyncScheduler runs its own task, so a group of
+    devices can be given a scheduler of their own.
+    """
+    def __init__(self):
+        super().__init__()
+        self._task = None
+        self._wake = None
+        self._events = {}
+
+    def _start_timer(self):
+        if self._task is None:
+            asyncio = _import_asyncio()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        else:
+            # a new sequence may be due before the task would next wake
+            self._wake.set()
+
+    def _stop_timer(self):
+        # the task ends once it wakes and finds nothing left to run
+        del self._heap[:]
+        if self._task is not None:
+            self._wake.set()
+
+    async def _run(self):
+        asyncio = _import_asyncio()
+        try:
+            while self._active:
+                self._tick()
+                if self._heap:
+                    self._wake.clear()
+                    delay = self._heap[0][0] - self._clock()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), max(0, delay) / 1000000)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self._task = None
+
+    def _remove(self, device, change):
+        super()._remove(device, change)
+        # the event is only kept while the sequence runs, so sequences which
+        # are never awaited don't leave theirs behind
+        event = self._events.pop(change, None)
+        if event is not None:
+            event.set()
+
+    def start(self, device, change, delay=None):
+        self._events[change] = _import_asyncio().Event()
+        super().start(device, change, delay)
+        if self._active.get(device) is not change:
+            # it finished on its first step
+            self._events.pop(change, None)
+
+    async def wait(self, change):
+        """
+        Waits until a sequence started by this scheduler has finished or
+        been cancelled. If the waiting task is cancelled, the sequence is
+        cancelled too.
+
+        :param change:
+            The sequence to wait for, e.g. a :class:`ValueChange`.
+        """
+        event = self._events.get(change)
+        try:
+            if event is not None and change._running:
+                await event.wait()
+        finally:
+            self._events.pop(change, None)
+            if change._running:
+                self.cancel(change._output_device)
+
+async_scheduler = AsyncScheduler()
+
+class ValueChange:
+    """
+    Internal class to control the value of an output device. 
+
+    :param OutputDevice output_device:
+        The OutputDevice object you wish to change the value of.
+
+    :param generator:
+        A generator function that yields a 2d list of
+        ((value, seconds), *).
+        
+        The output_device's value will be set for the number of
+        seconds.
+
+    :param int n:
+        The number of times to repeat the sequence. If None, the
+        sequence will repeat forever. 
+    
+    :param bool wait:
+        If True the ValueChange object will block (wait) until
+        the sequence has completed. Otherwise the sequence is run in the
+        background by the shared :class:`Scheduler`.
+
+    :param Scheduler runner:
+        The scheduler which runs the sequence in the background. If
+        :data:`None` (the default), the shared :class:`Scheduler` is used.
+    """
+    __slots__ = (
+        "_output_device", "_generator", "_gen", "_n", "_wait", "_runner",
+        "_running", "_token",
+        )
+    def __init__(self, output_device, generator, n, wait, runner=None):
+        self._output_device = output_device
+        self._runner = scheduler if runner is None else runner
+        self._generator = generator
+        self._n = n
+
+        self._restart()
+        
+        self._token = 0
+        self._running = True
+        self._wait = wait
+        
+        if self._wait:
+            # wait for the exection to end
+            delay = self._step()
+            while delay is not None:
+                sleep(delay / 1000000)
+                delay = self._step()
+            self._finish()
+        else:
+            self._runner.start(self._output_device, self)
+
+    def _restart(self):
+        self._gen = self._generator()
+
+    def _step(self):
+        # write the next value and return the number of microseconds
+        # until the following step, or None if the sequence has finished
+        next_seq = self._get_value()
+        if next_seq is None:
+            return None
+
+        value, seconds = next_seq
+        self._output_device._write(value)
+        return int(seconds * 1000000)
+
+    def _finish(self):
+        # the sequence has finished, turn the device off
+        self._running = False
+        self._output_device.off()
+                
+    def _get_value(self):
+        try:
+            return next(self._gen)
+            
+        except StopIteration:
+            
+            self._n = self._n - 1 if self._n is not None else None
+            if self._n == 0:
+                # it's the end, return None
+                return None
+            else:
+                # recreate the generator and start again
+                self._restart()
+                return next(self._gen)
+        
+    def stop(self):
+        """
+        Stops the ValueChange object running.
+        """
+        if self._running:
+            self._running = False
+            self._runner.cancel(self._output_device)
+
+class DutyTable:
+    """
+    Internal class holding a precompiled output sequence.
+
+    Each frame is made up of ``channels`` duty values between 0 and 65535,
+    stored one after another in a flat ``array('H')``, and the number of
+    microseconds the frame is held for, stored in an ``array('L')``.
+
+    :param int channels:
+        The number of duty values in each frame. Defaults to 1.
+    """
+    __slots__ = ("channels", "duties", "frames", "holds")
+    def __init__(self, channels=1):
+        self.channels = channels
+        self.frames = 0
+        self.duties = array('H')
+        self.holds = array('L')
+
+    def append(self, seconds, *duties):
+        """
+        Adds a frame to the end of the table.
+
+        :param float seconds:
+            The length of time in seconds the frame is held for.
+
+        :param int duties:
+            The duty values of the frame, one per channel.
+        """
+        for duty in duties:
+            self.duties.append(clamp(int(duty), 0, 65535))
+        self.holds.append(int(seconds * 1000000))
+        self.frames += 1
+
+class TableCache:
+    """
+    Internal class which caches compiled :class:`DutyTable` objects so they
+    can be shared between devices. When full, the least recently used table
+    is discarded.
+
+    :param compiler:
+        A function which is called with the key's values to compile a
+        table that isn't in the cache.
+
+    :param int size:
+        The maximum number of tables to keep. Defaults to 8.
+    """
+    def __init__(self, compiler, size=8):
+        self._compiler = compiler
+        self._size = size
+        self._tables = {}
+        self._order = []
+
+    def get(self, key):
+        """
+        Returns the table for ``key``, compiling it if needed.
+        """
+        table = self._tables.get(key)
+        if table is None:
+            table = self._compiler(*key)
+            if len(self._order) >= self._size:
+                del self._tables[self._order.pop(0)]
+            self._tables[key] = table
+        else:
+            self._order.remove(key)
+        self._order.append(key)
+        return table
+
+class TableChange(ValueChange):
+    """
+    Internal class to play a precompiled :class:`DutyTable` on an output
+    device. Each step only indexes the table and passes the frame to the
+    device's ``_write_frame`` method.
+
+    :param output_device:
+        The device to play the table on.
+
+    :param DutyTable table:
+        The table to play.
+
+    :param int n:
+        The number of times to repeat the table. If None, the table will
+        repeat forever.
+
+    :param bool wait:
+        If True the TableChange object will block (wait) until the table
+        has completed.
+
+    :param Scheduler runner:
+        The scheduler which runs the table in the background. If
+        :data:`None` (the default), the shared :class:`Scheduler` is used.
+    """
+    __slots__ = ("_table", "_index")
+    def __init__(self, output_device, table, n, wait, runner=None):
+        self._table = table
+        super().__init__(output_device, None, n, wait, runner)
+
+    def _restart(self):
+        self._index = 0
+
+    def _step(self):
+        table = self._table
+        i = self._index
+        if i == table.frames:
+            self._n = self._n - 1 if self._n is not None else None
+            if self._n == 0 or table.frames == 0:
+                return None
+            i = 0
+
+        self._output_device._write_frame(table.duties, i * table.channels)
+        self._index = i + 1
+        return table.holds[i]
+
+class Debouncer:
+    """
+    Internal class which confirms the edges of a :class:`DigitalInputDevice`.
+
+    The pin's interrupt handler only records the time of each edge. The
+    shared :class:`Scheduler` then checks the pin once it has been stable
+    for the device's bounce time and, if the state has changed, passes the
+    change on to the device. The debouncer keeps running while the device
+    has timed events pending (e.g. a button being held).
+
+    :param DigitalInputDevice input_device:
+        The device to debounce.
+    """
+    __slots__ = ("_input_device", "_edge_us", "_running", "_token")
+    def __init__(self, input_device):
+        self._input_device = input_device
+        self._edge_us = ticks_us()
+        self._token = 0
+        self._running = False
+
+    def edge(self, t):
+        """
+        Records an edge at time ``t`` (in ``ticks_us``).
+        """
+        self._edge_us = t
+        # (re)start the check, as a pending hold or click check may not be
+        # due for a while
+        scheduler.start(self._input_device, self, self._input_device._bounce_us)
+        self._running = True
+
+    def _step(self):
+        device = self._input_device
+        now = ticks_us()
+
+        # has the pin been stable for the bounce time?
+        stable = ticks_diff(now, self._edge_us)
+        if stable < device._bounce_us:
+            return device._bounce_us - stable
+
+        state = device._pin.value()
+        if state != device._state:
+            device._state = state
+            input_events._record(device._slot, state, self._edge_us)
+            device._state_changed(now)
+
+        return device._next_event(now)
+
+    def _finish(self):
+        self._running = False
+
+class InputEvents:
+    """
+    Internal class which collects the edges of every digital input.
+
+    Interrupt handlers :meth:`push` ``(slot, state, ticks_us)`` events into
+    a preallocated ring buffer, without allocating memory. A single
+    dispatcher, scheduled with ``micropython.schedule`` only when the buffer
+    goes from empty to non-empty, drains the buffer in batches. Edges for
+    the same device in a batch are coalesced into one, as only the latest
+    edge matters to its :class:`Debouncer`. If the buffer is full, events
+    are dropped and counted rather than raising an exception.
+
+    Confirmed (debounced) changes of state are kept in a second ring buffer
+    which can be read with :meth:`events`.
+
+    :param int size:
+        The number of events each ring buffer can hold. Defaults to 32.
+    """
+    def __init__(self, size=32):
+        self._size = size
+        self._devices = []
+
+        # edges pushed by interrupt handlers
+        self._slots = array('B', bytes(size))
+        self._states = array('B', bytes(size))
+        self._times = array('L', [0] * size)
+        self._head = 0
+        self._tail = 0
+
+        # confirmed changes of state, read by events()
+        self._event_slots = array('B', bytes(size))
+        self._event_states = array('B', bytes(size))
+        self._event_times = array('L', [0] * size)
+        self._event_head = 0
+        self._event_tail = 0
+
+        self._latest = array('L', [0] * 8)
+        self._pending = False
+        self._overflows = 0
+        self._missed = 0
+        self._schedule_failures = 0
+        self._dispatch_ref = self._dispatch
+
+    def register(self, device):
+        """
+        Registers a device and returns the slot number to push its events
+        with.
+        """
+        if None in self._devices:
+            slot = self._devices.index(None)
+            self._devices[slot] = device
+        else:
+            slot = len(self._devices)
+            self._devices.append(device)
+            if slot >= len(self._latest):
+                self._latest.append(0)
+        return slot
+
+    def unregister(self, slot):
+        """
+        Releases a slot returned by :meth:`register`.
+        """
+        self._devices[slot] = None
+
+    def push(self, slot, state, t):
+        """
+        Adds an edge to the ring buffer. Safe to call from a hard interrupt
+        handler.
+        """
+        head = self._head
+        next_head = head + 1
+        if next_head == self._size:
+            next_head = 0
+        if next_head == self._tail:
+            self._overflows += 1
+        else:
+            self._slots[head] = slot
+            self._states[head] = state
+            self._times[head] = t
+            self._head = next_head
+
+            if not self._pending:
+                self._pending = True
+                try:
+                    schedule(self._dispatch_ref, None)
+                except Exception:
+                    # the schedule queue is full, the next edge will try again
+                    self._pending = False
+                    self._schedule_failures += 1
+
+        if _instrumented:
+            # t was taken when the interrupt handler started
+            _irq_us.add(ticks_diff(ticks_us(), t))
+
+    def _dispatch(self, arg):
+        self._pending = False
+        if _instrumented and self._tail != self._head:
+            _dispatch_us.add(ticks_diff(ticks_us(), self._times[self._tail]))
+
+        # drain the buffer, keeping only the latest edge for each device
+        seen = 0
+        tail = self._tail
+        while tail != self._head:
+            slot = self._slots[tail]
+            self._latest[slot] = self._times[tail]
+            seen |= 1 << slot
+            tail += 1
+            if tail == self._size:
+                tail = 0
+            self._tail = tail
+
+        slot = 0
+        while seen:
+            if seen & 1:
+                device = self._devices[slot]
+                if device is not None:
+                    device._debouncer.edge(self._latest[slot])
+            seen >>= 1
+            slot += 1
+
+    def _record(self, slot, state, t):
+        # called by the debouncer when a change of state is confirmed
+        head = self._event_head
+        next_head = head + 1
+        if next_head == self._size:
+            next_head = 0
+        if next_head == self._event_tail:
+            self._missed += 1
+            return
+
+        self._event_slots[head] = slot
+        self._event_states[head] = state
+        self._event_times[head] = t
+        self._event_head = next_head
+
+    def events(self):
+        """
+        Returns an iterator of the confirmed changes of state of every
+        digital input since the last call, as ``(pin, value, ticks_us)``
+        tuples. Events are kept until they are read, so this is suitable for
+        polling from a loop instead of using callbacks::
+
+            from picozero import Button, input_events
+
+            button = Button(18)
+
+            while True:
+                for pin, value, t in input_events.events():
+                    print(pin, value, t)
+        """
+        while self._event_tail != self._event_head:
+            tail = self._event_tail
+            device = self._devices[self._event_slots[tail]]
+            if device is not None:
+                yield (
+                    device._pin_num,
+                    device._state_to_value(self._event_states[tail]),
+                    self._event_times[tail])
+            tail += 1
+            self._event_tail = 0 if tail == self._size else tail
+
+    def stats(self, reset=False):
+        """
+        Returns a dictionary with the number of ``overflows`` (edges dropped
+        because the buffer was full), ``missed`` (confirmed events dropped
+        because :meth:`events` wasn't read) and ``schedule_failures``.
+
+        :param bool reset:
+            If :data:`True`, the counters are reset after being read.
+            Defaults to :data:`False`.
+        """
+        stats = {
+            "overflows": self._overflows,
+            "missed": self._missed,
+            "schedule_failures": self._schedule_failures,
+            }
+        if reset:
+            self._overflows = 0
+            self._missed = 0
+            self._schedule_failures = 0
+        return stats
+
+input_events = InputEvents()
+
+class Histogram:
+    """
+    Internal class which counts durations in microseconds into a fixed
+    number of buckets, so it can be updated from an interrupt handler
+    without allocating memory.
+
+    Buckets are spaced logarithmically, with four buckets for each doubling
+    of the duration, so the percentiles it reports are within 25% of the
+    true value.
+    """
+    __slots__ = ("_counts", "count", "max")
+    def __init__(self):
+        self._counts = array('L', [0] * 120)
+        self.count = 0
+        self.max = 0
+
+    def reset(self):
+        """
+        Clears the histogram.
+        """
+        for i in range(len(self._counts)):
+            self._counts[i] = 0
+        self.count = 0
+        self.max = 0
+
+    def add(self, us):
+        """
+        Adds a duration to the histogram.
+        """
+        if us < 0:
+            us = 0
+        if us > self.max:
+            self.max = us
+        self.count += 1
+
+        # us is v << shift, with v between 4 and 7 once us is 8 or more
+        shift = 0
+        while us >= 8:
+            us >>= 1
+            shift += 1
+        bucket = 4 * shift + us
+        if bucket > 119:
+            bucket = 119
+        self._counts[bucket] += 1
+
+    def percentile(self, p):
+        """
+        Returns the duration which ``p`` percent of the durations are less
+        than or equal to, or :data:`None` if the histogram is empty.
+        """
+        if self.count == 0:
+            return None
+        target = max(1, (self.count * p + 99) // 100)
+        seen = 0
+        for bucket in range(len(self._counts)):
+            seen += self._counts[bucket]
+            if seen >= target:
+                if bucket < 8:
+                    return bucket
+                shift = bucket // 4 - 1
+                return min(((bucket % 4 + 5) << shift) - 1, self.max)
+
+    def summary(self):
+        """
+        Returns a dictionary with the ``count``, ``p50``, ``p99`` and
+        ``max`` of the durations.
+        """
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max,
+            }
+
+_instrumented = False
+# id(device) -> (str(device), Histogram), so closed devices aren't kept alive
+_late_us = {}
+_irq_us = Histogram()
+_dispatch_us = Histogram()
+
+def _record_late(device, us):
+    late = _late_us.get(id(device))
+    if late is None:
+        late = _late_us[id(device)] = (str(device), Histogram())
+    late[1].add(us)
+
+def instrument(enabled=True):
+    """
+    Turns the timing instrumentation reported by :func:`stats` on or off.
+
+    While it is turned off, the scheduler's tick and the input interrupt
+    handlers only check a flag.
+
+    :param bool enabled:
+        If :data:`True` (the default), the instrumentation is turned on.
+    """
+    global _instrumented
+    _instrumented = enabled
+
+def stats(reset=False):
+    """
+    Returns a dictionary of timing statistics, with durations in
+    microseconds::
+
+        import picozero
+
+        picozero.instrument()
+        ...
+        print(picozero.stats())
+
+    + ``scheduler`` and ``async_scheduler`` - see :meth:`Scheduler.stats`
+    + ``input_events`` - see :meth:`InputEvents.stats`
+
+    and, while :func:`instrument` is turned on:
+
+    + ``late_us`` - for each device, how late the steps of its sequences
+      ran compared to when they were due
+    + ``irq_us`` - how long the input interrupt handlers took
+    + ``dispatch_us`` - the delay between an input edge and it being
+      dispatched, i.e. the latency of ``micropython.schedule``
+
+    each given as a dictionary of ``count``, ``p50``, ``p99`` and ``max``.
+
+    :param bool reset:
+        If :data:`True`, the statistics are reset after being read.
+        Defaults to :data:`False`.
+    """
+    result = {
+        "scheduler": scheduler.stats(reset),
+        "async_scheduler": async_scheduler.stats(reset),
+        "input_events": input_events.stats(reset),
+        "late_us": {name: late.summary() for name, late in _late_us.values()},
+        "irq_us": _irq_us.summary(),
+        "dispatch_us": _dispatch_us.summary(),
+        }
+    if reset:
+        _late_us.clear()
+        _irq_us.reset()
+        _dispatch_us.reset()
+    return result
+
+class MedianFilter:
+    """
+    Filters a stream of values by returning the median of the last ``size``
+    values, which removes short spikes. The values are held in preallocated
+    arrays, so updating the filter doesn't allocate memory.
+
+    :param int size:
+        The number of values to take the median of. Defaults to 5.
+    """
+    __slots__ = ("_size", "_values", "_sorted", "_index", "_count", "_value")
+    def __init__(self, size=5):
+        self._size = size
+        self._values = array('f', [0] * size)
+        self._sorted = array('f', [0] * size)
+        self.reset()
+
+    def reset(self):
+        """
+        Discards all values.
+        """
+        self._count = 0
+        self._index = 0
+        self._value = None
+
+    @property
+    def value(self):
+        """
+        Returns the current filtered value, or :data:`None` if there are no
+        values yet.
+        """
+        return self._value
+
+    def update(self, value):
+        """
+        Adds a value and returns the new filtered value.
+        """
+        self._values[self._index] = value
+        self._index = (self._index + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+        # insertion sort the values into the second array
+        ordered = self._sorted
+        for i in range(self._count):
+            v = self._values[i]
+            j = i
+            while j > 0 and ordered[j - 1] > v:
+                ordered[j] = ordered[j - 1]
+                j -= 1
+            ordered[j] = v
+
+        self._value = ordered[self._count // 2]
+        return self._value
+
+class EMAFilter:
+    """
+    Filters a stream of values using an exponential moving average, which
+    smooths out noise.
+
+    :param float alpha:
+        The weight given to each new value, between 0 and 1. Smaller values
+        give a smoother, but slower to respond, result. Defaults to 0.5.
+    """
+    __slots__ = ("alpha", "_value")
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        """
+        Discards all values.
+        """
+        self._value = None
+
+    @property
+    def value(self):
+        """
+        Returns the current filtered value, or :data:`None` if there are no
+        values yet.
+        """
+        return self._value
+
+    def update(self, value):
+        """
+        Adds a value and returns the new filtered value.
+        """
+        if self._value is None:
+            self._value = value
+        else:
+            self._value += self.alpha * (value - self._value)
+        return self._value
+
+class RunningAverage:
+    """
+    Filters a stream of values by returning the mean of the last ``size``
+    values. The values are held in a preallocated array, so updating the
+    filter doesn't allocate memory.
+
+    :param int size:
+        The number of values to average. Defaults to 8.
+    """
+    __slots__ = ("_size", "_values", "_index", "_count", "_total", "_value")
+    def __init__(self, size=8):
+        self._size = size
+        self._values = array('f', [0] * size)
+        self.reset()
+
+    def reset(self):
+        """
+        Discards all values.
+        """
+        self._count = 0
+        self._index = 0
+        self._total = 0
+        self._value = None
+
+    @property
+    def value(self):
+        """
+        Returns the current filtered value, or :data:`None` if there are no
+        values yet.
+        """
+        return self._value
+
+    def update(self, value):
+        """
+        Adds a value and returns the new filtered value.
+        """
+        if self._count == self._size:
+            self._total -= self._values[self._index]
+        else:
+            self._count += 1
+        self._values[self._index] = value
+        self._total += value
+        self._index = (self._index + 1) % self._size
+        self._value = self._total / self._count
+        return self._value
+
+class FilterChain:
+    """
+    Passes a stream of values through several filters in turn, e.g. a
+    :class:`MedianFilter` to remove spikes followed by an
+    :class:`EMAFilter` to smooth the result::
+
+        FilterChain(MedianFilter(5), EMAFilter(0.3))
+
+    :param filters:
+        The filters to use, in order.
+    """
+    __slots__ = ("_filters",)
+    def __init__(self, *filters):
+        self._filters = filters
+
+    def reset(self):
+        """
+        Discards all values.
+        """
+        for f in self._filters:
+            f.reset()
+
+    @property
+    def value(self):
+        """
+        Returns the current filtered value, or :data:`None` if there are no
+        values yet.
+        """
+        return self._filters[-1].value
+
+    def update(self, value):
+        """
+        Adds a value and returns the new filtered value.
+        """
+        for f in self._filters:
+            value = f.update(value)
+        return value
+
+def _import_asyncio():
+    try:
+        import asyncio
+    except ImportError:
+        # older versions of micropython only provide uasyncio
+        import uasyncio as asyncio
+    return asyncio
+
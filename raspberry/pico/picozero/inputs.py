@@ -0,0 +1,606 @@
+"""
+Buttons, switches, potentiometers and other input devices.
+"""
+from array import array
+from .core import Pin, ADC, ticks_us, ticks_diff, ticks_add
+from .core import PinMixin, Debouncer, input_events, scheduler
+
+###############################################################################
+# INPUT DEVICES
+###############################################################################
+
+class InputDevice:
+    """
+    Base class for input devices.
+    """
+    __slots__ = ("_active_state", "_inactive_state")
+    def __init__(self, active_state=None):
+        self._active_state = active_state
+
+    @property
+    def active_state(self):
+        """
+        Sets or returns the active state of the device. If :data:`None` (the default),
+        the device will return the value that the pin is set to. If
+        :data:`True`, the device will return :data:`True` if the pin is
+        HIGH. If :data:`False`, the device will return :data:`False` if the
+        pin is LOW.
+        """
+        return self._active_state
+
+    @active_state.setter
+    def active_state(self, value):
+        self._active_state = True if value else False
+        self._inactive_state = False if value else True
+        
+    @property
+    def value(self):
+        """
+        Returns the current value of the device. This is either :data:`True` 
+        or :data:`False` depending on the value of :attr:`active_state`.
+        """
+        return self._read()
+
+class DigitalInputDevice(InputDevice, PinMixin):
+    """
+    Represents a generic input device with digital functionality e.g. buttons 
+    that can be either active or inactive.
+
+    :param int pin:
+        The pin that the device is connected to.
+
+    :param bool pull_up:
+        If :data:`True`, the device will be pulled up to HIGH. If
+        :data:`False` (the default), the device will be pulled down to LOW.
+
+    :param bool active_state:
+        If :data:`True` (the default), the device will return :data:`True`
+        if the pin is HIGH. If :data:`False`, the device will return
+        :data:`False` if the pin is LOW.
+
+    :param float bounce_time:
+        The bounce time for the device. If set, the device will ignore
+        any button presses that happen within the bounce time after a
+        button release. This is useful to prevent accidental button
+        presses from registering as multiple presses. The default is 
+        :data:`None`.
+    """
+    __slots__ = (
+        "_pin_num", "_pin", "_state", "_bounce_time", "_bounce_us",
+        "_debouncer", "_slot", "_when_activated", "_when_deactivated",
+        )
+    def __init__(self, pin, pull_up=False, active_state=None, bounce_time=None):
+        super().__init__(active_state)
+        self._pin_num = pin
+        self._pin = Pin(
+            pin,
+            mode=Pin.IN,
+            pull=Pin.PULL_UP if pull_up else Pin.PULL_DOWN)
+        self.bounce_time = bounce_time
+        
+        if active_state is None:
+            self._active_state = False if pull_up else True
+        else:
+            self._active_state = active_state
+        
+        self._state = self._pin.value()
+        
+        self._when_activated = None
+        self._when_deactivated = None
+
+        self._debouncer = Debouncer(self)
+        self._slot = input_events.register(self)
+        
+        # setup interupt, the handler doesn't allocate so it can be hard
+        self._pin.irq(self._pin_change, Pin.IRQ_RISING | Pin.IRQ_FALLING, hard=True)
+        
+    def _state_to_value(self, state):
+        return int(bool(state) == self._active_state)
+    
+    def _read(self):
+        return self._state_to_value(self._state)
+
+    def _pin_change(self, p):
+        # only timestamp the edge, the debouncer confirms it later from the
+        # scheduler so the interrupt returns straight away
+        input_events.push(self._slot, p.value(), ticks_us())
+
+    def _state_changed(self, t):
+        # called by the debouncer when a change of state has been confirmed
+        if self.value:
+            callback_to_run = self._when_activated
+        else:
+            callback_to_run = self._when_deactivated
+
+        if callback_to_run is not None:
+            callback_to_run()
+
+    def _next_event(self, t):
+        # returns the number of microseconds until the device next needs
+        # to be checked, or None if it has nothing pending
+        return None
+
+    @property
+    def bounce_time(self):
+        """
+        Sets or returns the bounce time for the device in seconds. A change
+        of state is only registered once the pin has been stable for this
+        long. If :data:`None`, changes are registered at the next scheduler
+        tick.
+        """
+        return self._bounce_time
+
+    @bounce_time.setter
+    def bounce_time(self, value):
+        self._bounce_time = value
+        self._bounce_us = 0 if value is None else int(value * 1000000)
+
+    @property
+    def is_active(self):
+        """
+        Returns :data:`True` if the device is active.
+        """
+        return bool(self.value)
+
+    @property
+    def is_inactive(self):
+        """
+        Returns :data:`True` if the device is inactive.
+        """
+        return not bool(self.value)
+    
+    @property
+    def when_activated(self):
+        """
+        Returns a :samp:`callback` that will be called when the device is activated.
+        """
+        return self._when_activated
+    
+    @when_activated.setter
+    def when_activated(self, value):
+        self._when_activated = value
+        
+    @property
+    def when_deactivated(self):
+        """
+        Returns a :samp:`callback` that will be called when the device is deactivated.
+        """
+        return self._when_deactivated
+    
+    @when_deactivated.setter
+    def when_deactivated(self, value):
+        self._when_deactivated = value
+    
+    def close(self):
+        """
+        Closes the device and releases any resources. Once closed, the device
+        can no longer be used.
+        """
+        self._pin.irq(handler=None)
+        scheduler.cancel(self)
+        input_events.unregister(self._slot)
+        self._pin = None
+
+class Switch(DigitalInputDevice):
+    """
+    Represents a toggle switch, which is either open or closed.
+
+    :param int pin:
+        The pin that the device is connected to.
+
+    :param bool pull_up:
+        If :data:`True` (the default), the device will be pulled up to
+        HIGH. If :data:`False`, the device will be pulled down to LOW.
+
+    :param float bounce_time:
+        The bounce time for the device. If set, the device will ignore
+        any button presses that happen within the bounce time after a
+        button release. This is useful to prevent accidental button
+        presses from registering as multiple presses. Defaults to 0.02 
+        seconds.
+
+    :param float hold_time:
+        The length of time in seconds the device must be active for before
+        :attr:`when_held` is called. Defaults to 1.
+
+    :param bool hold_repeat:
+        If :data:`True`, :attr:`when_held` will be called again every
+        ``hold_time`` seconds for as long as the device stays active.
+        Defaults to :data:`False`.
+
+    :param float multi_click_time:
+        The maximum length of time in seconds between the end of one click
+        and the start of the next for them to count as a multi-click.
+        Defaults to 0.3.
+    """
+    __slots__ = (
+        "_hold_us", "_multi_click_us", "hold_repeat", "_held", "_hold_due",
+        "_clicks", "_click_count", "_click_due", "_when_held",
+        "_when_multi_clicked",
+        )
+    def __init__(self, pin, pull_up=True, bounce_time=0.02, hold_time=1, hold_repeat=False, multi_click_time=0.3): 
+        self.hold_time = hold_time
+        self.hold_repeat = hold_repeat
+        self.multi_click_time = multi_click_time
+        self._when_held = None
+        self._when_multi_clicked = None
+        self._held = False
+        self._hold_due = None
+        self._clicks = 0
+        self._click_count = 0
+        self._click_due = None
+        super().__init__(pin=pin, pull_up=pull_up, bounce_time=bounce_time)
+
+    def _state_changed(self, t):
+        if self.value:
+            if self._click_due is None:
+                # the start of a new set of clicks
+                self._clicks = 0
+            self._click_due = None
+            self._hold_due = ticks_add(t, self._hold_us)
+        else:
+            if self._held:
+                self._held = False
+            else:
+                self._clicks += 1
+                self._click_due = ticks_add(t, self._multi_click_us)
+            self._hold_due = None
+
+        super()._state_changed(t)
+
+    def _next_event(self, t):
+        # the due times are relative to ticks_us, so compare them using
+        # ticks_diff to cope with the counter wrapping around
+        if self._hold_due is not None:
+            wait = ticks_diff(self._hold_due, t)
+            if wait <= 0:
+                self._held = True
+                self._clicks = 0
+                self._hold_due = ticks_add(t, self._hold_us) if self.hold_repeat else None
+                if self._when_held is not None:
+                    self._when_held()
+                return self._next_event(t)
+            return wait
+
+        if self._click_due is not None:
+            wait = ticks_diff(self._click_due, t)
+            if wait <= 0:
+                self._click_due = None
+                self._click_count = self._clicks
+                if self._clicks > 1 and self._when_multi_clicked is not None:
+                    self._when_multi_clicked()
+                return None
+            return wait
+
+        return None
+
+    @property
+    def hold_time(self):
+        """
+        Sets or returns the length of time in seconds the device must be
+        active for before :attr:`when_held` is called.
+        """
+        return self._hold_us / 1000000
+
+    @hold_time.setter
+    def hold_time(self, value):
+        self._hold_us = int(value * 1000000)
+
+    @property
+    def multi_click_time(self):
+        """
+        Sets or returns the maximum length of time in seconds between two
+        clicks for them to count as a multi-click.
+        """
+        return self._multi_click_us / 1000000
+
+    @multi_click_time.setter
+    def multi_click_time(self, value):
+        self._multi_click_us = int(value * 1000000)
+
+    @property
+    def is_held(self):
+        """
+        Returns :data:`True` if the device has been active for longer than
+        :attr:`hold_time`.
+        """
+        return self._held
+
+    @property
+    def click_count(self):
+        """
+        Returns the number of clicks in the last completed set of clicks,
+        e.g. 2 after a double click.
+        """
+        return self._click_count
+
+    @property
+    def when_held(self):
+        """
+        Returns a :samp:`callback` that will be called when the device has
+        been active for :attr:`hold_time` seconds.
+        """
+        return self._when_held
+
+    @when_held.setter
+    def when_held(self, value):
+        self._when_held = value
+
+    @property
+    def when_multi_clicked(self):
+        """
+        Returns a :samp:`callback` that will be called after the device has
+        been clicked more than once in quick succession. :attr:`click_count`
+        returns the number of clicks.
+        """
+        return self._when_multi_clicked
+
+    @when_multi_clicked.setter
+    def when_multi_clicked(self, value):
+        self._when_multi_clicked = value
+
+Switch.is_closed = Switch.is_active
+Switch.is_open = Switch.is_inactive
+Switch.when_closed = Switch.when_activated
+Switch.when_opened = Switch.when_deactivated
+
+class Button(Switch):
+    """
+    Represents a push button, which can be either pressed or released.
+
+    :param int pin:
+        The pin that the device is connected to.
+
+    :param bool pull_up:
+        If :data:`True` (the default), the device will be pulled up to
+        HIGH. If :data:`False`, the device will be pulled down to LOW.
+
+    :param float bounce_time:
+        The bounce time for the device. If set, the device will ignore
+        any button presses that happen within the bounce time after a
+        button release. This is useful to prevent accidental button
+        presses from registering as multiple presses. Defaults to 0.02 
+        seconds.
+
+    :param float hold_time:
+        The length of time in seconds the button must be pressed for before
+        :attr:`when_held` is called. Defaults to 1.
+
+    :param bool hold_repeat:
+        If :data:`True`, :attr:`when_held` will be called again every
+        ``hold_time`` seconds for as long as the button is held. Defaults
+        to :data:`False`.
+
+    :param float multi_click_time:
+        The maximum length of time in seconds between releasing the button
+        and pressing it again for the presses to count as a multi-click.
+        Defaults to 0.3.
+    """
+    __slots__ = ()
+    pass
+
+Button.is_pressed = Button.is_active
+Button.is_released = Button.is_inactive
+Button.when_pressed = Button.when_activated
+Button.when_released = Button.when_deactivated 
+
+class AnalogInputDevice(InputDevice, PinMixin):
+    """
+    Represents a generic input device with analogue functionality, e.g. 
+    a potentiometer.
+
+    :param int pin:
+        The pin that the device is connected to.
+        
+    :param active_state:
+        The active state of the device. If :data:`True` (the default),
+        the :class:`AnalogInputDevice` will assume that the device is
+        active when the pin is high and above the threshold. If 
+        ``active_state`` is ``False``, the device will be active when 
+        the pin is low and below the threshold. 
+
+    :param float threshold:
+        The threshold that the device must be above or below to be
+        considered active. The default is 0.5.
+
+    :param int oversample:
+        The number of conversions averaged into each reading, which
+        reduces noise at the cost of a slower read. Defaults to 1.
+
+    :param filter:
+        A filter that readings are passed through, e.g. an
+        :class:`EMAFilter` or :class:`RunningAverage`. This can be any
+        object with an ``update(value)`` method returning the filtered
+        value. If :data:`None` (the default), readings aren't filtered.
+    """
+    __slots__ = (
+        "_pin_num", "_adc", "_filter", "_oversample", "_threshold",
+        "_sample_state", "_period_us", "_running", "_token",
+        )
+    def __init__(self, pin, active_state=True, threshold=0.5, oversample=1, filter=None):
+        self._pin_num = pin
+        super().__init__(active_state)
+        self._adc = ADC(pin)
+        self._threshold = float(threshold)
+        self._oversample = oversample
+        self._filter = filter
+        self._sample_state = None
+        self._period_us = 0
+        self._token = 0
+        self._running = False
+        
+    def _state_to_value(self, state):
+        return (state if self.active_state else 65535 - state) / 65535
+
+    def _value_to_state(self, value):
+        return int(65535 * (value if self.active_state else 1 - value))
+
+    def _read_state(self):
+        # a single conversion, or the mean of several when oversampling
+        if self._oversample == 1:
+            return self._adc.read_u16()
+
+        total = 0
+        for _ in range(self._oversample):
+            total += self._adc.read_u16()
+        return total // self._oversample
+
+    def _sample(self):
+        state = self._read_state()
+        if self._filter is not None:
+            state = self._filter.update(state)
+        return state
+    
+    def _read(self):
+        if self._running:
+            # the background sampler has the latest reading
+            return self._state_to_value(self._sample_state)
+        return self._state_to_value(self._sample())
+
+    def read_burst(self, n, into=None, rate=None):
+        """
+        Takes ``n`` readings in quick succession and returns them as raw
+        values between 0 and 65535. Each reading is oversampled, but not
+        filtered.
+
+        :param int n:
+            The number of readings to take.
+
+        :param into:
+            The buffer to store the readings in, e.g. an ``array('H')`` of
+            at least ``n`` items. Reusing a buffer avoids allocating memory.
+            If :data:`None` (the default), a new ``array('H')`` is returned.
+
+        :param float rate:
+            The number of readings per second. If :data:`None` (the
+            default), the readings are taken as quickly as possible.
+        """
+        if into is None:
+            into = array('H', bytes(2 * n))
+
+        read = self._read_state
+        if rate is None:
+            for i in range(n):
+                into[i] = read()
+        else:
+            interval = int(1000000 / rate)
+            due = ticks_us()
+            for i in range(n):
+                while ticks_diff(due, ticks_us()) > 0:
+                    pass
+                into[i] = read()
+                due = ticks_add(due, interval)
+        return into
+
+    def start_sampling(self, rate=100):
+        """
+        Starts taking readings in the background using the shared
+        :class:`Scheduler`. While sampling, :attr:`value` returns the latest
+        (filtered) reading straight away.
+
+        :param float rate:
+            The number of readings per second. Defaults to 100.
+        """
+        self._period_us = int(1000000 / rate)
+        if not self._running:
+            scheduler.start(self, self)
+            self._running = True
+
+    def stop_sampling(self):
+        """
+        Stops taking readings in the background.
+        """
+        scheduler.cancel(self)
+        self._running = False
+
+    @property
+    def is_sampling(self):
+        """
+        Returns :data:`True` if readings are being taken in the background.
+        """
+        return self._running
+
+    def _step(self):
+        self._sample_state = self._sample()
+        return self._period_us
+
+    def _finish(self):
+        self._running = False
+
+    @property
+    def filter(self):
+        """
+        Sets or returns the filter that readings are passed through.
+        """
+        return self._filter
+
+    @filter.setter
+    def filter(self, value):
+        self._filter = value
+        
+    @property
+    def threshold(self):
+        """
+        The threshold that the device must be above or below to be
+        considered active. The default is 0.5.
+        """
+        return self._threshold
+
+    @threshold.setter
+    def threshold(self, value):
+        self._threshold = float(value)
+
+    @property
+    def is_active(self):
+        """
+        Returns :data:`True` if the device is active.
+        """
+        return self.value > self.threshold
+
+    @property
+    def voltage(self):
+        """
+        Returns the voltage of the analogue device.
+        """
+        return self.value * 3.3
+
+    def close(self):
+        self.stop_sampling()
+        self._adc = None
+
+class Potentiometer(AnalogInputDevice):
+    """
+    Represents a potentiometer, which outputs a variable voltage
+    between 0 and 3.3V.
+
+    Alias for :class:`Pot`.
+
+    :param int pin:
+        The pin that the device is connected to.
+        
+    :param active_state:
+        The active state of the device. If :data:`True` (the default),
+        the :class:`AnalogInputDevice` will assume that the device is
+        active when the pin is high and above the threshold. If 
+        ``active_state`` is ``False``, the device will be active when 
+        the pin is low and below the threshold. 
+
+    :param float threshold:
+        The threshold that the device must be above or below to be
+        considered active. The default is 0.5.
+
+    :param int oversample:
+        The number of conversions averaged into each reading. Defaults
+        to 1.
+
+    :param filter:
+        A filter that readings are passed through, e.g. an
+        :class:`EMAFilter`. If :data:`None` (the default), readings aren't
+        filtered.
+
+    """
+    __slots__ = ()
+    pass
+
+Pot = Potentiometer
+
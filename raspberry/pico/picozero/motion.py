@@ -0,0 +1,743 @@
+"""
+Motors, robots and servos.
+"""
+from array import array
+from .core import PinsMixin, DutyTable, TableCache, TableChange
+from .core import clamp, ease_linear, ease_in_out, easing_function
+from .outputs import DigitalOutputDevice, PWMOutputDevice
+
+MOTION_PROFILES = {
+    "trapezoid": ease_linear,
+    "s_curve": ease_in_out,
+    }
+
+class MotionChange(TableChange):
+    """
+    Internal class to play a compiled motion table. Unlike
+    :class:`TableChange`, the device is left at the speed of the last frame
+    when the table finishes, rather than being turned off.
+    """
+    __slots__ = ()
+    def _finish(self):
+        self._running = False
+
+class MotionMixin:
+    """
+    Mixin for devices driven at signed speeds between -1 and 1, one per
+    motor, which ramps between speeds rather than jumping to them.
+
+    A ramp is compiled into a :class:`DutyTable` with a (forward, backward)
+    pair of duties per motor, so every motor is updated in the same step.
+    The class using the mixin provides ``_speeds`` and ``_write_speeds`` to
+    read and write its speeds, and ``_write_frame`` to write a frame.
+    """
+    __slots__ = ("_ramp_time", "_profile", "_motion")
+    @property
+    def ramp_time(self):
+        """
+        Sets or returns the time in seconds taken to ramp between stopped
+        and full speed. If 0, the speed changes immediately.
+        """
+        return self._ramp_time
+
+    @ramp_time.setter
+    def ramp_time(self, value):
+        self._ramp_time = value
+
+    @property
+    def profile(self):
+        """
+        Sets or returns the shape of the ramp, one of the
+        :data:`MOTION_PROFILES`: ``"trapezoid"`` accelerates at a constant
+        rate, ``"s_curve"`` eases in and out of the acceleration. Any
+        easing accepted by :func:`easing_function` can also be used.
+        """
+        return self._profile
+
+    @profile.setter
+    def profile(self, value):
+        self._profile = value
+
+    def _move(self, speeds, t, wait):
+        self._stop_motion()
+        if t is None and self._ramp_time == 0:
+            self._write_speeds(speeds)
+        else:
+            starts = tuple(round(s, 3) for s in self._speeds())
+            table = MotionMixin._motion_tables.get(
+                (starts, tuple(speeds), t, self._ramp_time, self._profile, 50))
+            self._motion = MotionChange(self, table, 1, wait)
+
+    def _stop_motion(self):
+        if self._motion is not None:
+            self._motion.stop()
+            self._motion = None
+
+    @staticmethod
+    def _compile_motion(starts, targets, t, ramp_time, profile, fps):
+        # every motor is ramped over the same frames, so they all reach
+        # their speed at the same time
+        table = DutyTable(2 * len(targets))
+        ramp = MOTION_PROFILES[profile] if profile in MOTION_PROFILES else easing_function(profile)
+
+        def frame(seconds, speeds):
+            duties = []
+            for s in speeds:
+                duties += (65535 * s, 0) if s > 0 else (0, -65535 * s)
+            table.append(seconds, *duties)
+
+        def ramp_to(starts, targets):
+            steps = int(fps * ramp_time * max(abs(e - s) for s, e in zip(starts, targets)))
+            for i in range(steps):
+                k = ramp(i / steps)
+                frame(1 / fps, [s + (e - s) * k for s, e in zip(starts, targets)])
+
+        ramp_to(starts, targets)
+        if t is None:
+            frame(0, targets)
+        else:
+            stops = (0, ) * len(targets)
+            frame(t, targets)
+            ramp_to(targets, stops)
+            frame(0, stops)
+
+        return table
+
+MotionMixin._motion_tables = TableCache(MotionMixin._compile_motion)
+
+class Motor(MotionMixin, PinsMixin):
+    """
+    Represents a motor connected to a motor controller that has a two-pin
+    input. One pin drives the motor "forward", the other drives the motor
+    "backward".
+
+    Speed changes can be ramped, to avoid current spikes when starting,
+    stopping or reversing the motor::
+
+        from picozero import Motor
+
+        motor = Motor(14, 15, ramp_time=0.5)
+        motor.forward(t=2)
+
+    :type forward: int
+    :param forward:
+        The GP pin that controls the "forward" motion of the motor. 
+    
+    :type backward: int
+    :param backward:
+        The GP pin that controls the "backward" motion of the motor. 
+    
+    :param bool pwm:
+        If :data:`True` (the default), PWM pins are used to drive the motor. 
+        When using PWM pins, values between 0 and 1 can be used to set the 
+        speed.
+
+    :param float ramp_time:
+        The time in seconds taken to ramp between stopped and full speed. If
+        0 (the default), the speed changes immediately.
+
+    :param profile:
+        The shape of the ramp, ``"trapezoid"`` (the default) or
+        ``"s_curve"``, see :attr:`profile`.
+    """
+    __slots__ = ("_pin_nums", "_forward", "_backward")
+    def __init__(self, forward, backward, pwm=True, ramp_time=0, profile="trapezoid"):
+        self._pin_nums = (forward, backward)
+        self._forward = PWMOutputDevice(forward) if pwm else DigitalOutputDevice(forward)
+        self._backward = PWMOutputDevice(backward) if pwm else DigitalOutputDevice(backward)
+        self._motion = None
+        self.ramp_time = ramp_time
+        self.profile = profile
+        
+    def on(self, speed=1, t=None, wait=False):
+        """
+        Turns the motor on and makes it turn.
+
+        :param float speed:
+            The speed as a value between -1 and 1: 1 turns the motor at
+            full speed in one direction, -1 turns the motor at full speed in
+            the opposite direction. Defaults to 1.
+
+        :param float t:
+            The time in seconds that the motor should run for at `speed`,
+            not including the time spent ramping. If None is specified, the
+            motor will stay on. The default is None.
+
+        :param bool wait:
+           If True, the method will block until the time `t` has expired. 
+           If False, the method will return and the motor will turn on in
+           the background. Defaults to False. Only effective if `t` is not
+           None or the motor is ramping.
+        """
+        self._move((speed, ), t, wait)
+
+    def off(self):
+        """
+        Stops the motor turning, ramping down to a stop if
+        :attr:`ramp_time` is set.
+        """
+        self._move((0, ), None, False)
+
+    def _speeds(self):
+        return (self.value, )
+
+    def _write_speeds(self, speeds):
+        speed = speeds[0]
+        if speed > 0:
+            self._backward.off()
+            self._forward.on(speed)
+            
+        elif speed < 0:
+            self._forward.off()
+            self._backward.on(-speed)
+        
+        else:
+            self._backward.off()
+            self._forward.off()
+
+    def _write_frame(self, duties, i):
+        # turn off the pin going to 0 first, so both are never on together
+        if duties[i]:
+            self._backward._write_frame(duties, i + 1)
+            self._forward._write_frame(duties, i)
+        else:
+            self._forward._write_frame(duties, i)
+            self._backward._write_frame(duties, i + 1)
+
+    @property
+    def value(self):
+        """
+        Sets or returns the motor speed as a value between -1 and 1: -1 is full
+        speed "backward", 1 is full speed "forward", 0 is stopped.
+        """
+        return self._forward.value + (-self._backward.value)
+
+    @value.setter
+    def value(self, value):
+        if value != 0:
+            self.on(value)
+        else:
+            self.stop()
+
+    def forward(self, speed=1, t=None, wait=False):
+        """
+        Makes the motor turn "forward".
+
+        :param float speed:
+            The speed as a value between 0 and 1: 1 is full speed, 0 is stop. Defaults to 1.
+
+        :param float t:
+            The time in seconds that the motor should turn for. If None is 
+            specified, the motor will stay on. The default is None.
+
+        :param bool wait:
+           If True, the method will block until the time `t` has expired. 
+           If False, the method will return and the motor will turn on in
+           the background. Defaults to False. Only effective if `t` is not
+           None or the motor is ramping.
+        """
+        self.on(speed, t, wait)
+
+    def backward(self, speed=1, t=None, wait=False):
+        """
+        Makes the motor turn "backward".
+
+        :param float speed:
+            The speed as a value between 0 and 1: 1 is full speed, 0 is stop. Defaults to 1.
+
+        :param float t:
+            The time in seconds that the motor should turn for. If None is 
+            specified, the motor will stay on. The default is None.
+
+        :param bool wait:
+           If True, the method will block until the time `t` has expired. 
+           If False, the method will return and the motor will turn on in
+           the background. Defaults to False. Only effective if `t` is not
+           None or the motor is ramping.
+        """
+        self.on(-speed, t, wait)
+
+    def close(self):
+        """
+        Closes the device and releases any resources. Once closed, the device
+        can no longer be used.
+        """
+        self._stop_motion()
+        self._forward.close()
+        self._backward.close()
+
+Motor.start = Motor.on
+Motor.stop = Motor.off
+
+class Robot(MotionMixin):
+    """
+    Represents a generic dual-motor robot / rover / buggy.
+
+    Alias for :class:`Rover`.
+
+    This class is constructed with two tuples representing the forward and
+    backward pins of the left and right controllers. For example,
+    if the left motor's controller is connected to pins 12 and 13, while the
+    right motor's controller is connected to pins 14 and 15, then the following
+    example will drive the robot forward::
+
+        from picozero import Robot
+
+        robot = Robot(left=(12, 13), right=(14, 15))
+        robot.forward()
+
+    Both motors are always updated together, so when ramping they reach
+    their speeds at the same time and the robot doesn't drift off course.
+
+    :param tuple left:
+        A tuple of two pins representing the forward and backward inputs of the 
+        left motor's controller.
+
+    :param tuple right:
+        A tuple of two pins representing the forward and backward inputs of the 
+        right motor's controller.
+
+    :param bool pwm:
+        If :data:`True` (the default), pwm pins will be used, allowing variable 
+        speed control. 
+
+    :param float ramp_time:
+        The time in seconds taken to ramp between stopped and full speed. If
+        0 (the default), the speed changes immediately.
+
+    :param profile:
+        The shape of the ramp, ``"trapezoid"`` (the default) or
+        ``"s_curve"``, see :attr:`profile`.
+    """
+    __slots__ = ("_left", "_right")
+    def __init__(self, left, right, pwm=True, ramp_time=0, profile="trapezoid"):
+        self._left = Motor(left[0], left[1], pwm)
+        self._right = Motor(right[0], right[1], pwm)
+        self._motion = None
+        self.ramp_time = ramp_time
+        self.profile = profile
+
+    @property
+    def left_motor(self):
+        """
+        Returns the left :class:`Motor`.
+        """
+        return self._left
+
+    @property
+    def right_motor(self):
+        """
+        Returns the right :class:`Motor`.
+        """
+        return self._right
+
+    @property
+    def value(self):
+        """
+        Represents the motion of the robot as a tuple of (left_motor_speed,
+        right_motor_speed) with ``(-1, -1)`` representing full speed backwards,
+        ``(1, 1)`` representing full speed forwards, and ``(0, 0)``
+        representing stopped.
+        """
+        return (self._left.value, self._right.value)
+
+    @value.setter
+    def value(self, value):
+        self._move(value, None, False)
+
+    def _speeds(self):
+        return self.value
+
+    def _write_speeds(self, speeds):
+        self._left._write_speeds(speeds[0:1])
+        self._right._write_speeds(speeds[1:2])
+
+    def _write_frame(self, duties, i):
+        self._left._write_frame(duties, i)
+        self._right._write_frame(duties, i + 2)
+
+    def _stop_motion(self):
+        super()._stop_motion()
+        self._left._stop_motion()
+        self._right._stop_motion()
+        
+    def forward(self, speed=1, t=None, wait=False):
+        """
+        Makes the robot move "forward".
+
+        :param float speed:
+            The speed as a value between 0 and 1: 1 is full speed, 0 is stop. Defaults to 1.
+
+        :param float t:
+            The time in seconds that the robot should move for. If None is 
+            specified, the robot will continue to move until stopped. The default 
+            is None.
+
+        :param bool wait:
+           If True, the method will block until the time `t` has expired. 
+           If False, the method will return and the motor will turn on in
+           the background. Defaults to False. Only effective if `t` is not
+           None or the robot is ramping.
+        """
+        self._move((speed, speed), t, wait)
+        
+    def backward(self, speed=1, t=None, wait=False):
+        """
+        Makes the robot move "backward".
+
+        :param float speed:
+            The speed as a value between 0 and 1: 1 is full speed, 0 is stop. Defaults to 1.
+
+        :param float t:
+            The time in seconds that the robot should move for. If None is 
+            specified, the robot will continue to move until stopped. The default 
+            is None.
+
+        :param bool wait:
+           If True, the method will block until the time `t` has expired. 
+           If False, the method will return and the motor will turn on in
+           the background. Defaults to False. Only effective if `t` is not
+           None or the robot is ramping.
+        """
+        self._move((-speed, -speed), t, wait)
+        
+    def left(self, speed=1, t=None, wait=False):
+        """
+        Makes the robot turn "left" by turning the left motor backward and the 
+        right motor forward.
+
+        :param float speed:
+            The speed as a value between 0 and 1: 1 is full speed, 0 is stop. Defaults to 1.
+
+        :param float t:
+            The time in seconds that the robot should turn for. If None is 
+            specified, the robot will continue to turn until stopped. The default 
+            is None.
+
+        :param bool wait:
+           If True, the method will block until the time `t` has expired. 
+           If False, the method will return and the motor will turn on in
+           the background. Defaults to False. Only effective if `t` is not
+           None or the robot is ramping.
+        """
+        self._move((-speed, speed), t, wait)
+    
+    def right(self, speed=1, t=None, wait=False):
+        """
+        Makes the robot turn "right" by turning the left motor forward and the 
+        right motor backward.
+
+        :param float speed:
+            The speed as a value between 0 and 1: 1 is full speed, 0 is stop. Defaults to 1.
+
+        :param float t:
+            The time in seconds that the robot should turn for. If None is 
+            specified, the robot will continue to turn until stopped. The default 
+            is None.
+
+        :param bool wait:
+           If True, the method will block until the time `t` has expired. 
+           If False, the method will return and the motor will turn on in
+           the background. Defaults to False. Only effective if `t` is not
+           None or the robot is ramping.
+        """
+        self._move((speed, -speed), t, wait)
+        
+    def stop(self):
+        """
+        Stops the robot, ramping down to a stop if :attr:`ramp_time` is set.
+        """
+        self._move((0, 0), None, False)
+
+    def close(self):
+        """
+        Closes the device and releases any resources. Once closed, the device
+        can no longer be used.
+        """
+        self._stop_motion()
+        self._left.close()
+        self._right.close()
+    
+Rover = Robot
+
+class Servo(PWMOutputDevice):
+    """
+    Represents a PWM-controlled servo motor.
+
+    Setting the `value` to 0 will move the servo to its minimum position,
+    1 will move the servo to its maximum position. Setting the `value` to
+    :data:`None` will turn the servo "off" (i.e. no signal is sent).
+
+    The position can also be set as an :attr:`angle`, and :meth:`move_to`
+    moves the servo smoothly to an angle in the background::
+
+        from picozero import Servo
+
+        servo = Servo(15)
+        servo.move_to(90, duration=2, easing="in_out")
+
+    :type pin: int
+    :param pin:
+        The pin the servo motor is connected to. 
+
+    :param bool initial_value:
+        If :data:`0`, the servo will be set to its minimum position.  If
+        :data:`1`, the servo will set to its maximum position. If :data:`None`
+        (the default), the position of the servo will not change.
+
+    :param float min_pulse_width:
+        The pulse width corresponding to the servo's minimum position. This
+        defaults to 1ms.
+
+    :param float max_pulse_width:
+        The pulse width corresponding to the servo's maximum position. This
+        defaults to 2ms.
+
+    :param float frame_width:
+        The length of time between servo control pulses measured in seconds.
+        This defaults to 20ms which is a common value for servos.
+
+    :param int duty_factor:
+        The duty factor of the PWM signal. This is a value between 0 and 65535.
+        Defaults to 65535.    
+
+    :param int min_angle:
+        The angle in degrees of the servo's minimum position. Defaults to 0.
+
+    :param int max_angle:
+        The angle in degrees of the servo's maximum position. Defaults to
+        180. It may be less than *min_angle*, e.g. for a servo mounted the
+        other way round, but not equal to it.
+    """
+    __slots__ = (
+        "_min_duty", "_max_duty", "_min_angle", "_max_angle", "_angles",
+        )
+    def __init__(self, pin, initial_value=None, min_pulse_width=1/1000, max_pulse_width=2/1000, frame_width=20/1000, duty_factor=65535, min_angle=0, max_angle=180):
+        self._min_duty = int((min_pulse_width / frame_width) * duty_factor)
+        self._max_duty = int((max_pulse_width / frame_width) * duty_factor)
+        span = round(abs(max_angle - min_angle))
+        if span == 0:
+            raise ValueError("min_angle and max_angle must be at least 1 degree apart")
+        self._min_angle = min_angle
+        self._max_angle = max_angle
+        self._angles = Servo._angle_tables.get((self._min_duty, self._max_duty, span))
+        
+        super().__init__(pin, freq=int(1 / frame_width), duty_factor=duty_factor, initial_value=initial_value)
+        
+    def _state_to_value(self, state):
+        return None if state == 0 else clamp((state - self._min_duty) / (self._max_duty - self._min_duty), 0, 1)
+        
+    def _value_to_state(self, value):
+        return 0 if value is None else int(self._min_duty + ((self._max_duty - self._min_duty) * value))
+
+    def _duty_to_state(self, duty):
+        return self._min_duty + (self._max_duty - self._min_duty) * duty // 65535
+
+    @staticmethod
+    def _compile_angles(min_duty, max_duty, span):
+        # the duty of every whole degree between the min and max angles
+        return array('H', [min_duty + (max_duty - min_duty) * a // span for a in range(span + 1)])
+
+    def _angle_to_state(self, angle):
+        # the table runs from min_angle, so mirror the index of a servo whose
+        # max_angle is less than its min_angle
+        angles = self._angles
+        offset = angle - self._min_angle
+        if self._max_angle < self._min_angle:
+            offset = -offset
+        return angles[clamp(int(offset + 0.5), 0, len(angles) - 1)]
+
+    @property
+    def angle(self):
+        """
+        Sets or returns the angle of the servo in degrees, between
+        :attr:`min_angle` and :attr:`max_angle`. :data:`None` means the
+        servo is "off".
+        """
+        value = self.value
+        if value is None:
+            return None
+        return self._min_angle + (self._max_angle - self._min_angle) * value
+
+    @angle.setter
+    def angle(self, angle):
+        self._stop_change()
+        self._pwm.duty_u16(0 if angle is None else self._angle_to_state(angle))
+
+    @property
+    def min_angle(self):
+        """
+        Returns the angle of the servo's minimum position.
+        """
+        return self._min_angle
+
+    @property
+    def max_angle(self):
+        """
+        Returns the angle of the servo's maximum position.
+        """
+        return self._max_angle
+
+    def move_to(self, angle, duration=1, easing=None, wait=False, fps=50):
+        """
+        Moves the servo smoothly from its current angle to ``angle``.
+
+        :param float angle:
+            The angle in degrees to move to.
+
+        :param float duration:
+            The time in seconds the move takes. Defaults to 1.
+
+        :param easing:
+            The easing curve of the move, see :func:`easing_function`.
+            Defaults to linear.
+
+        :param bool wait:
+           If True, the method will block until the servo has reached
+           ``angle``. If False (the default), the method will return and the
+           servo will move in the background.
+
+        :param int fps:
+           The number of times per second the position is updated. Defaults
+           to 50, a pulse every 20ms.
+        """
+        ServoGroup(self).move_to((angle, ), duration, easing, wait, fps)
+    
+    def min(self):
+        """
+        Set the servo to its minimum position.
+        """
+        self.value = 0
+    
+    def mid(self):
+        """
+        Set the servo to its mid-point position.
+        """
+        self.value = 0.5
+        
+    def max(self):
+        """
+        Set the servo to its maximum position.
+        """
+        self.value = 1
+
+    def off(self):
+        """
+        Turn the servo "off" by setting the value to `None`.
+        """
+        self.value = None
+
+Servo._angle_tables = TableCache(Servo._compile_angles)
+
+class ServoGroup:
+    """
+    Represents a group of servos, e.g. the joints of an arm, which are moved
+    together so that they all reach their angles at the same time::
+
+        from picozero import Servo, ServoGroup
+
+        arm = ServoGroup(Servo(15), Servo(16), Servo(17))
+        arm.move_to((90, 45, 0), duration=2)
+
+    Each move is precompiled into a table of pulse widths, one per servo per
+    frame, which is played in the background, so no calculations are done
+    while the servos are moving.
+
+    :param Servo servos:
+        The servos in the group.
+    """
+    __slots__ = ("_servos", "_motion")
+    def __init__(self, *servos):
+        self._servos = servos
+        self._motion = None
+
+    @property
+    def servos(self):
+        """
+        Returns a tuple of the servos in the group.
+        """
+        return self._servos
+
+    @property
+    def angle(self):
+        """
+        Sets or returns the angles of the servos as a tuple.
+        """
+        return tuple(servo.angle for servo in self._servos)
+
+    @angle.setter
+    def angle(self, angles):
+        for servo, angle in zip(self._servos, angles):
+            servo.angle = angle
+
+    def move_to(self, angles, duration=1, easing=None, wait=False, fps=50):
+        """
+        Moves the servos smoothly from their current angles to ``angles``.
+        A servo which is "off" moves straight to its angle.
+
+        :param tuple angles:
+            The angles in degrees to move to, one per servo.
+
+        :param float duration:
+            The time in seconds the move takes. Defaults to 1.
+
+        :param easing:
+            The easing curve of the move, see :func:`easing_function`.
+            Defaults to linear.
+
+        :param bool wait:
+           If True, the method will block until the servos have reached their
+           angles. If False (the default), the method will return and the
+           servos will move in the background.
+
+        :param int fps:
+           The number of times per second the positions are updated.
+           Defaults to 50, a pulse every 20ms.
+        """
+        ends = tuple(servo._angle_to_state(angle) for servo, angle in zip(self._servos, angles))
+        starts = []
+        for servo, end in zip(self._servos, ends):
+            servo._stop_change()
+            state = servo._pwm.duty_u16()
+            starts.append(state if state else end)
+
+        table = ServoGroup._move_tables.get(
+            (tuple(starts), ends, duration, easing_function(easing), fps))
+        self._motion = MotionChange(self, table, 1, wait)
+        # changing a servo on its own stops the move
+        for servo in self._servos:
+            servo._value_changer = self._motion
+
+    @staticmethod
+    def _compile_move(starts, ends, duration, easing, fps):
+        table = DutyTable(len(ends))
+        steps = int(fps * duration)
+        for i in range(steps):
+            t = easing(i / steps)
+            table.append(1 / fps, *(s + (e - s) * t for s, e in zip(starts, ends)))
+        table.append(0, *ends)
+        return table
+
+    def _write_frame(self, duties, i):
+        for servo in self._servos:
+            servo._pwm.duty_u16(duties[i])
+            i += 1
+
+    def off(self):
+        """
+        Turns all of the servos "off".
+        """
+        for servo in self._servos:
+            servo.off()
+
+    def close(self):
+        """
+        Closes all of the servos. Once closed, the group can no longer be
+        used.
+        """
+        for servo in self._servos:
+            servo.close()
+        self._servos = None
+
+ServoGroup._move_tables = TableCache(ServoGroup._compile_move)
+
@@ -0,0 +1,1492 @@
+"""
+LEDs, buzzers and other output devices.
+"""
+from array import array
+from .core import Pin, PWM, disable_irq, enable_irq, mem32, const
+from .core import PWMChannelAlreadyInUse, PinMixin, PinsMixin
+from .core import ValueChange, DutyTable, TableCache, TableChange, async_scheduler, clamp, easing_function
+from .core import _import_asyncio
+
+###############################################################################
+# OUTPUT DEVICES
+###############################################################################
+
+class OutputDevice:
+    """
+    Base class for output devices. 
+    """   
+    __slots__ = ("_active_state", "_inactive_state", "_value_changer")
+    def __init__(self, active_high=True, initial_value=False):
+        self.active_high = active_high
+        if initial_value is not None:
+            self._write(initial_value)
+        self._value_changer = None
+    
+    @property
+    def active_high(self):
+        """
+        Sets or returns the active_high property. If :data:`True`, the 
+        :meth:`on` method will set the Pin to HIGH. If :data:`False`, 
+        the :meth:`on` method will set the Pin to LOW (the :meth:`off` method 
+        always does the opposite).
+        """
+        return self._active_state
+
+    @active_high.setter
+    def active_high(self, value):
+        self._active_state = True if value else False
+        self._inactive_state = False if value else True
+        
+    @property
+    def value(self):
+        """
+        Sets or returns a value representing the state of the device: 1 is on, 0 is off.
+        """
+        return self._read()
+
+    @value.setter
+    def value(self, value):
+        self._stop_change()
+        self._write(value)
+        
+    def on(self, value=1, t=None, wait=False):
+        """
+        Turns the device on.
+
+        :param float value:
+            The value to set when turning on. Defaults to 1.
+
+        :param float t:
+            The time in seconds that the device should be on. If None is 
+            specified, the device will stay on. The default is None.
+
+        :param bool wait:
+           If True, the method will block until the time `t` has expired. 
+           If False, the method will return and the device will turn on in
+           the background. Defaults to False. Only effective if `t` is not
+           None.
+        """
+        if t is None:
+            self.value = value
+        else:
+            self._start_change(lambda : iter([(value, t), ]), 1, wait)
+
+    def off(self):
+        """
+        Turns the device off.
+        """
+        self.value = 0
+            
+    @property
+    def is_active(self):
+        """
+        Returns :data:`True` if the device is on.
+        """
+        return bool(self.value)
+
+    def toggle(self):
+        """
+        If the device is off, turn it on. If it is on, turn it off.
+        """
+        if self.is_active:
+            self.off()
+        else:
+            self.on()
+            
+    def blink(self, on_time=1, off_time=None, n=None, wait=False):
+        """
+        Makes the device turn on and off repeatedly.
+        
+        :param float on_time:
+            The length of time in seconds that the device will be on. Defaults to 1.
+
+        :param float off_time:
+            The length of time in seconds that the device will be off. If `None`, 
+            it will be the same as ``on_time``. Defaults to `None`.
+
+        :param int n:
+            The number of times to repeat the blink operation. If None is 
+            specified, the device will continue blinking forever. The default
+            is None.
+
+        :param bool wait:
+           If True, the method will block until the device stops turning on and off. 
+           If False, the method will return and the device will turn on and off in
+           the background. Defaults to False.        
+        """
+        off_time = on_time if off_time is None else off_time
+        
+        self.off()
+
+        # is there anything to change?
+        if on_time > 0 or off_time > 0:
+            self._start_change(lambda : iter([(1,on_time), (0,off_time)]), n, wait)
+
+    async def ablink(self, on_time=1, off_time=None, n=1):
+        """
+        Makes the device turn on and off repeatedly, returning an awaitable
+        which completes once the device has stopped. The device is driven
+        from the asyncio event loop, rather than a timer, so it can be used
+        alongside other asyncio tasks.
+
+        Cancelling the awaiting task stops the device.
+
+        :param float on_time:
+            The length of time in seconds that the device will be on. Defaults to 1.
+
+        :param float off_time:
+            The length of time in seconds that the device will be off. If `None`, 
+            it will be the same as ``on_time``. Defaults to `None`.
+
+        :param int n:
+            The number of times to repeat the blink operation. If None is 
+            specified, the device will continue blinking until the awaiting
+            task is cancelled. Defaults to 1.
+        """
+        off_time = on_time if off_time is None else off_time
+
+        self.off()
+
+        if on_time > 0 or off_time > 0:
+            await self._await_change(ValueChange(
+                self, lambda : iter([(1,on_time), (0,off_time)]), n, False, async_scheduler))
+            
+    def _start_change(self, generator, n, wait):
+        self._value_changer = ValueChange(self, generator, n, wait)
+
+    def _start_table(self, table, n, wait):
+        self._value_changer = TableChange(self, table, n, wait)
+
+    async def _play_table(self, table, n):
+        await self._await_change(TableChange(self, table, n, False, async_scheduler))
+
+    async def _await_change(self, change):
+        self._value_changer = change
+        try:
+            await async_scheduler.wait(change)
+        except _import_asyncio().CancelledError:
+            # cancelling the change leaves the device as it was, so turn
+            # it off, unless another change has been started since
+            if self._value_changer is change:
+                self.off()
+            raise
+    
+    def _stop_change(self):
+        if self._value_changer is not None:
+            self._value_changer.stop()
+            self._value_changer = None
+
+    def close(self):
+        """
+        Turns the device off.
+        """
+        self.value = 0
+
+class DigitalOutputDevice(OutputDevice, PinMixin):
+    """
+    Represents a device driven by a digital pin.
+
+    :param int pin:
+        The pin that the device is connected to.
+
+    :param bool active_high:
+        If :data:`True` (the default), the :meth:`on` method will set the Pin
+        to HIGH. If :data:`False`, the :meth:`on` method will set the Pin to
+        LOW (the :meth:`off` method always does the opposite).
+
+    :param bool initial_value:
+        If :data:`False` (the default), the LED will be off initially. If
+        :data:`True`, the LED will be switched on initially.
+    """
+    __slots__ = ("_pin_num", "_pin")
+    def __init__(self, pin, active_high=True, initial_value=False):
+        self._pin_num = pin
+        self._pin = Pin(pin, Pin.OUT)
+        super().__init__(active_high, initial_value)
+        
+    def _value_to_state(self, value):
+        return int(self._active_state if value else self._inactive_state)
+    
+    def _state_to_value(self, state):
+        return int(bool(state) == self._active_state)
+    
+    def _read(self):
+        return self._state_to_value(self._pin.value())
+
+    def _write(self, value):
+        self._pin.value(self._value_to_state(value))
+
+    def _write_frame(self, duties, i):
+        self._pin.value(self._value_to_state(duties[i] >= 32768))
+                
+    def close(self):
+        """
+        Closes the device and turns the device off. Once closed, the device
+        can no longer be used.
+        """
+        super().close()
+        self._pin = None
+
+class DigitalLED(DigitalOutputDevice):
+    """
+    Represents a simple LED, which can be switched on and off.
+
+    :param int pin:
+        The pin that the device is connected to.
+
+    :param bool active_high:
+        If :data:`True` (the default), the :meth:`on` method will set the Pin
+        to HIGH. If :data:`False`, the :meth:`on` method will set the Pin to
+        LOW (the :meth:`off` method always does the opposite).
+
+    :param bool initial_value:
+        If :data:`False` (the default), the LED will be off initially. If
+        :data:`True`, the LED will be switched on initially.
+    """
+    __slots__ = ()
+    pass
+
+DigitalLED.is_lit = DigitalLED.is_active
+
+class Buzzer(DigitalOutputDevice):
+    """
+    Represents an active or passive buzzer, which can be turned on or off.
+
+    :param int pin:
+        The pin that the device is connected to.
+
+    :param bool active_high:
+        If :data:`True` (the default), the :meth:`on` method will set the Pin
+        to HIGH. If :data:`False`, the :meth:`on` method will set the Pin to
+        LOW (the :meth:`off` method always does the opposite).
+
+    :param bool initial_value:
+        If :data:`False` (the default), the Buzzer will be off initially. If
+        :data:`True`, the Buzzer will be switched on initially.
+    """
+    __slots__ = ()
+    pass
+
+Buzzer.beep = Buzzer.blink
+Buzzer.abeep = Buzzer.ablink
+
+class PWMOutputDevice(OutputDevice, PinMixin):
+    """
+    Represents a device driven by a PWM pin.
+
+    :param int pin:
+        The pin that the device is connected to.
+
+    :param int freq:
+        The frequency of the PWM signal in hertz. Defaults to 100.
+
+    :param int duty_factor:
+        The duty factor of the PWM signal. This is a value between 0 and 65535.
+        Defaults to 65535.
+
+    :param bool active_high:
+        If :data:`True` (the default), the :meth:`on` method will set the Pin
+        to HIGH. If :data:`False`, the :meth:`on` method will set the Pin to
+        LOW (the :meth:`off` method always does the opposite).
+
+    :param bool initial_value:
+        If :data:`False` (the default), the LED will be off initially. If
+        :data:`True`, the LED will be switched on initially.
+    """
+    __slots__ = ("_pin_num", "_duty_factor", "_duty_scale", "_pwm")
+    
+    # the PWM channel of each pin, as slice * 2 + (0 for A, 1 for B)
+    PIN_TO_PWM_CHANNEL = bytes(range(16)) * 2
+    # the device using each channel, or None
+    _channels_used = [None] * 16
+    # the frequency of each slice, which is shared by its two channels, or 0
+    # if it changes (e.g. a Speaker playing a tune)
+    _slice_freqs = [0] * 8
+
+    def __init__(self, pin, freq=100, duty_factor=65535, active_high=True, initial_value=False):
+        self._check_pwm_channel(pin, freq)
+        self._pin_num = pin
+        self._duty_factor = duty_factor
+        self._duty_scale = duty_factor >> 1
+        self._pwm = PWM(Pin(pin))
+        self._pwm.freq(freq)
+        super().__init__(active_high, initial_value)
+        
+    def _check_pwm_channel(self, pin_num, freq):
+        channel = PWMOutputDevice.PIN_TO_PWM_CHANNEL[pin_num]
+        if PWMOutputDevice._channels_used[channel] is not None:
+            raise PWMChannelAlreadyInUse(
+                "PWM channel {}{} is already in use by {}. Use a different pin".format(
+                    channel >> 1,
+                    "AB"[channel & 1],
+                    str(PWMOutputDevice._channels_used[channel])
+                    )
+                )
+        self._check_slice_freq(channel, freq)
+        PWMOutputDevice._channels_used[channel] = self
+
+    def _check_slice_freq(self, channel, freq):
+        # the other channel of the slice can share it if it runs at the same
+        # frequency, a freq of None claims the whole slice
+        other = PWMOutputDevice._channels_used[channel ^ 1]
+        if other is not None and other is not self:
+            if freq is None or PWMOutputDevice._slice_freqs[channel >> 1] != freq:
+                raise PWMChannelAlreadyInUse(
+                    "PWM slice {} is already in use by {} at a different frequency. Use a pin on a different slice or the same frequency".format(
+                        channel >> 1,
+                        str(other)
+                        )
+                    )
+        PWMOutputDevice._slice_freqs[channel >> 1] = 0 if freq is None else freq
+
+    def _state_to_value(self, state):
+        return (state if self.active_high else self._duty_factor - state) / self._duty_factor
+
+    def _value_to_state(self, value):
+        value = clamp(value, 0, 1)
+        return int(self._duty_factor * (value if self.active_high else 1 - value))
+    
+    def _read(self):
+        return self._state_to_value(self._pwm.duty_u16())
+    
+    def _write(self, value):
+        self._pwm.duty_u16(self._value_to_state(value))
+
+    def _duty_to_state(self, duty):
+        # integer only scaling of a 0 - 65535 duty to the duty factor, kept
+        # within micropython's small int range to avoid heap allocations
+        if self._duty_factor != 65535:
+            duty = ((duty >> 1) * self._duty_scale) >> 14
+        return duty if self.active_high else self._duty_factor - duty
+
+    def _write_frame(self, duties, i):
+        self._pwm.duty_u16(self._duty_to_state(duties[i]))
+        
+    @property
+    def is_active(self):
+        """
+        Returns :data:`True` if the device is on.
+        """
+        return self.value != 0
+
+    @property
+    def freq(self):
+        """
+        Returns the current frequency of the device.
+        """
+        return self._pwm.freq()
+    
+    @freq.setter
+    def freq(self, freq):
+        """
+        Sets the frequency of the device. If the other channel of its PWM
+        slice is in use, they must have the same frequency.
+        """
+        self._check_slice_freq(
+            PWMOutputDevice.PIN_TO_PWM_CHANNEL[self._pin_num],
+            freq
+            )
+        self._pwm.freq(freq)
+
+    def blink(self, on_time=1, off_time=None, n=None, wait=False, fade_in_time=0, fade_out_time=None, fps=25):
+        """
+        Makes the device turn on and off repeatedly.
+        
+        :param float on_time:
+            The length of time in seconds the device will be on. Defaults to 1.
+
+        :param float off_time:
+            The length of time in seconds the device will be off. If `None`, 
+            it will be the same as ``on_time``. Defaults to `None`.
+
+        :param int n:
+            The number of times to repeat the blink operation. If `None`, the 
+            device will continue blinking forever. The default is `None`.
+
+        :param bool wait:
+           If True, the method will block until the LED stops blinking. If False,
+           the method will return and the LED will blink in the background.
+           Defaults to False.
+
+        :param float fade_in_time:
+            The length of time in seconds to spend fading in. Defaults to 0.
+
+        :param float fade_out_time:
+            The length of time in seconds to spend fading out. If `None`,
+            it will be the same as ``fade_in_time``. Defaults to `None`.
+
+        :param int fps:
+           The frames per second that will be used to calculate the number of
+           steps between off/on states when fading. Defaults to 25.
+        """
+        self.off()
+
+        table = self._blink_table(on_time, off_time, fade_in_time, fade_out_time, fps)
+        if table is not None:
+            self._start_table(table, n, wait)
+
+    async def ablink(self, on_time=1, off_time=None, n=1, fade_in_time=0, fade_out_time=None, fps=25):
+        """
+        Makes the device turn on and off repeatedly, returning an awaitable
+        which completes once the device has stopped. The device is driven
+        from the asyncio event loop, rather than a timer, so it can be used
+        alongside other asyncio tasks.
+
+        Cancelling the awaiting task stops the device.
+
+        :param float on_time:
+            The length of time in seconds the device will be on. Defaults to 1.
+
+        :param float off_time:
+            The length of time in seconds the device will be off. If `None`, 
+            it will be the same as ``on_time``. Defaults to `None`.
+
+        :param int n:
+            The number of times to repeat the blink operation. If `None`, the 
+            device will continue blinking until the awaiting task is
+            cancelled. Defaults to 1.
+
+        :param float fade_in_time:
+            The length of time in seconds to spend fading in. Defaults to 0.
+
+        :param float fade_out_time:
+            The length of time in seconds to spend fading out. If `None`,
+            it will be the same as ``fade_in_time``. Defaults to `None`.
+
+        :param int fps:
+           The frames per second that will be used to calculate the number of
+           steps between off/on states when fading. Defaults to 25.
+        """
+        self.off()
+
+        table = self._blink_table(on_time, off_time, fade_in_time, fade_out_time, fps)
+        if table is not None:
+            await self._play_table(table, n)
+
+    def _blink_table(self, on_time, off_time, fade_in_time, fade_out_time, fps):
+        off_time = on_time if off_time is None else off_time
+        fade_out_time = fade_in_time if fade_out_time is None else fade_out_time
+        
+        # is there anything to change?
+        if on_time > 0 or off_time > 0 or fade_in_time > 0 or fade_out_time > 0:
+            return PWMOutputDevice._blink_tables.get(
+                (fade_in_time, fade_out_time, on_time, off_time, fps))
+
+    @staticmethod
+    def _compile_blink(fade_in_time, fade_out_time, on_time, off_time, fps):
+        table = DutyTable()
+        
+        if fade_in_time > 0:
+            for i in range(int(fps * fade_in_time)):
+                table.append(1 / fps, 65535 * i / (fps * fade_in_time))
+        
+        if on_time > 0:
+            table.append(on_time, 65535)
+
+        if fade_out_time > 0:
+            for i in range(int(fps * fade_out_time)):
+                table.append(1 / fps, 65535 - 65535 * i / (fps * fade_out_time))
+        
+        if off_time > 0:
+            table.append(off_time, 0)
+
+        return table
+
+    def pulse(self, fade_in_time=1, fade_out_time=None, n=None, wait=False, fps=25):
+        """
+        Makes the device pulse on and off repeatedly.
+        
+        :param float fade_in_time:
+            The length of time in seconds that the device will take to turn on.
+            Defaults to 1.
+
+        :param float fade_out_time:
+           The length of time in seconds that the device will take to turn off.
+           Defaults to 1.
+           
+        :param int fps:
+           The frames per second that will be used to calculate the number of
+           steps between off/on states. Defaults to 25.
+           
+        :param int n:
+           The number of times to pulse the LED. If None, the LED will pulse
+           forever. Defaults to None.
+    
+        :param bool wait:
+           If True, the method will block until the LED stops pulsing. If False,
+           the method will return and the LED will pulse in the background.
+           Defaults to False.
+        """
+        self.blink(on_time=0, off_time=0, fade_in_time=fade_in_time, fade_out_time=fade_out_time, n=n, wait=wait, fps=fps)
+
+    async def apulse(self, fade_in_time=1, fade_out_time=None, n=1, fps=25):
+        """
+        Makes the device pulse on and off repeatedly, returning an awaitable
+        which completes once the device has stopped. See :meth:`ablink`.
+
+        :param float fade_in_time:
+            The length of time in seconds that the device will take to turn on.
+            Defaults to 1.
+
+        :param float fade_out_time:
+           The length of time in seconds that the device will take to turn off.
+           Defaults to 1.
+           
+        :param int fps:
+           The frames per second that will be used to calculate the number of
+           steps between off/on states. Defaults to 25.
+           
+        :param int n:
+           The number of times to pulse the LED. If None, the LED will pulse
+           until the awaiting task is cancelled. Defaults to 1.
+        """
+        await self.ablink(on_time=0, off_time=0, fade_in_time=fade_in_time, fade_out_time=fade_out_time, n=n, fps=fps)
+
+    def close(self):
+        """
+        Closes the device and turns the device off. Once closed, the device
+        can no longer be used.
+        """
+        super().close()
+        channel = PWMOutputDevice.PIN_TO_PWM_CHANNEL[self._pin_num]
+        PWMOutputDevice._channels_used[channel] = None
+        if PWMOutputDevice._channels_used[channel ^ 1] is None:
+            # the slice is free again
+            PWMOutputDevice._slice_freqs[channel >> 1] = 0
+        self._pwm.deinit()
+        self._pwm = None
+
+PWMOutputDevice._blink_tables = TableCache(PWMOutputDevice._compile_blink)
+    
+def brightness_linear(x): return x
+
+def brightness_gamma(x): return x ** 2.2
+
+def brightness_cie1931(x):
+    # the CIE 1931 lightness, x is L* / 100
+    if x <= 0.08:
+        return x / 9.033
+    return ((x + 0.16) / 1.16) ** 3
+
+def brightness_exponential(x):
+    # each step of x multiplies the brightness by the same amount
+    return (65536 ** x - 1) / 65535
+
+BRIGHTNESS_CURVES = {
+    "linear": brightness_linear,
+    "gamma": brightness_gamma,
+    "cie1931": brightness_cie1931,
+    "exponential": brightness_exponential,
+    }
+
+def brightness_curve(curve):
+    """
+    Returns the brightness function for ``curve``, which can be the name of
+    one of the :data:`BRIGHTNESS_CURVES` (``"linear"``, ``"gamma"``,
+    ``"cie1931"`` or ``"exponential"``) or a function which maps a
+    brightness between 0 and 1 to a duty cycle between 0 and 1.
+    """
+    if curve is None:
+        return brightness_linear
+    if callable(curve):
+        return curve
+    return BRIGHTNESS_CURVES[curve]
+
+class PWMLED(PWMOutputDevice):
+    """
+    Represents an LED driven by a PWM pin; the brightness of the LED can be changed.
+
+    :param int pin:
+        The pin that the device is connected to.
+
+    :param int freq:
+        The frequency of the PWM signal in hertz. Defaults to 100.
+
+    :param int duty_factor:
+        The duty factor of the PWM signal. This is a value between 0 and 65535.
+        Defaults to 65535.
+
+    :param bool active_high:
+        If :data:`True` (the default), the :meth:`on` method will set the Pin
+        to HIGH. If :data:`False`, the :meth:`on` method will set the Pin to
+        LOW (the :meth:`off` method always does the opposite).
+
+    :param bool initial_value:
+        If :data:`False` (the default), the LED will be off initially. If
+        :data:`True`, the LED will be switched on initially.
+
+    :param curve:
+        How the brightness is turned into a duty cycle, see :attr:`curve`.
+        Defaults to :data:`None` (linear).
+    """
+    __slots__ = ("_curve", "_lut")
+    def __init__(self, pin, freq=100, duty_factor=65535, active_high=True, initial_value=False, curve=None):
+        self.curve = curve
+        super().__init__(pin, freq, duty_factor, active_high, initial_value)
+
+    @property
+    def curve(self):
+        """
+        Sets or returns the brightness curve of the LED: :data:`None` or
+        ``"linear"`` for a duty cycle equal to the brightness, or
+        ``"gamma"``, ``"cie1931"``, ``"exponential"`` or a function (see
+        :func:`brightness_curve`) for a brightness which looks even to the
+        eye. It applies to values written after it is set.
+
+        A curve is computed once into a table of 1024 duty cycles, shared
+        by every LED using it, so writing a value or a frame of a fade,
+        blink or pulse only costs an index into the table.
+        """
+        return self._curve
+
+    @curve.setter
+    def curve(self, curve):
+        self._curve = curve
+        if curve is None or curve == "linear":
+            self._lut = None
+        else:
+            self._lut = PWMLED._curve_tables.get((brightness_curve(curve),))
+
+    @staticmethod
+    def _compile_curve(curve):
+        return array('H', [
+            int(clamp(curve(i / 1023), 0, 1) * 65535 + 0.5)
+            for i in range(1024)
+            ])
+
+    def _value_to_state(self, value):
+        lut = self._lut
+        if lut is None:
+            return super()._value_to_state(value)
+        return self._duty_to_state(lut[int(clamp(value, 0, 1) * 1023 + 0.5)])
+
+    def _state_to_value(self, state):
+        value = super()._state_to_value(state)
+        lut = self._lut
+        if lut is None:
+            return value
+        # the lowest brightness with the duty cycle, the curve only rises
+        duty = value * 65535
+        low = 0
+        high = len(lut) - 1
+        while low < high:
+            mid = (low + high) // 2
+            if lut[mid] < duty:
+                low = mid + 1
+            else:
+                high = mid
+        return low / (len(lut) - 1)
+
+    def _write_frame(self, duties, i):
+        lut = self._lut
+        if lut is None:
+            self._pwm.duty_u16(self._duty_to_state(duties[i]))
+        else:
+            self._pwm.duty_u16(self._duty_to_state(lut[duties[i] >> 6]))
+
+PWMLED._curve_tables = TableCache(PWMLED._compile_curve)
+PWMLED.brightness = PWMLED.value
+
+def LED(pin, pwm=True, active_high=True, initial_value=False):
+    """
+    Returns an instance of :class:`DigitalLED` or :class:`PWMLED` depending on
+    the value of the `pwm` parameter. 
+
+    ::
+
+        from picozero import LED
+
+        my_pwm_led = LED(1)
+
+        my_digital_led = LED(2, pwm=False)
+
+    :param int pin:
+        The pin that the device is connected to.
+
+    :param int pin:
+        If `pwm` is :data:`True` (the default), a :class:`PWMLED` will be
+        returned. If `pwm` is :data:`False`, a :class:`DigitalLED` will be
+        returned. A :class:`PWMLED` can control the brightness of the LED but
+        uses 1 PWM channel.
+
+    :param bool active_high:
+        If :data:`True` (the default), the :meth:`on` method will set the Pin
+        to HIGH. If :data:`False`, the :meth:`on` method will set the Pin to
+        LOW (the :meth:`off` method always does the opposite).
+
+    :param bool initial_value:
+        If :data:`False` (the default), the device will be off initially. If
+        :data:`True`, the device will be switched on initially.
+    """
+    if pwm:
+        return PWMLED(
+            pin=pin,
+            active_high=active_high,
+            initial_value=initial_value)
+    else:
+        return DigitalLED(
+            pin=pin,
+            active_high=active_high,
+            initial_value=initial_value)
+
+def _create_pico_led():
+    # called by picozero the first time pico_led is used
+    try:
+        return LED("LED", pwm=False)
+    except TypeError:
+        # older version of micropython before "LED" was supported
+        return LED(25, pwm=False)
+
+class RGBLED(OutputDevice, PinsMixin):
+    """
+    Extends :class:`OutputDevice` and represents a full colour LED component (composed
+    of red, green, and blue LEDs).
+    Connect the common cathode (longest leg) to a ground pin; connect each of
+    the other legs (representing the red, green, and blue anodes) to any GP
+    pins. You should use three limiting resistors (one per anode).
+    The following code will make the LED yellow::
+
+        from picozero import RGBLED
+        rgb = RGBLED(1, 2, 3)
+        rgb.color = (1, 1, 0)
+
+    0–255 colours are also supported::
+
+        rgb.color = (255, 255, 0)
+
+    :type red: int
+    :param red:
+        The GP pin that controls the red component of the RGB LED. 
+    :type green: int
+    :param green:
+        The GP pin that controls the green component of the RGB LED.
+    :type blue: int
+    :param blue:
+        The GP pin that controls the blue component of the RGB LED.
+    :param bool active_high:
+        Set to :data:`True` (the default) for common cathode RGB LEDs. If you
+        are using a common anode RGB LED, set this to :data:`False`.
+    :type initial_value: ~colorzero.Color or tuple
+    :param initial_value:
+        The initial color for the RGB LED. Defaults to black ``(0, 0, 0)``.
+    :param bool pwm:
+        If :data:`True` (the default), construct :class:`PWMLED` instances for
+        each component of the RGBLED. If :data:`False`, construct 
+        :class:`DigitalLED` instances.
+    :param curve:
+        The brightness curve of each component, see :attr:`PWMLED.curve`.
+        Only used if *pwm* is :data:`True`. Defaults to :data:`None` (linear).
+    
+    """
+    __slots__ = ("_pin_nums", "_leds", "_last")
+    def __init__(self, red=None, green=None, blue=None, active_high=True,
+                 initial_value=(0, 0, 0), pwm=True, curve=None):
+        self._pin_nums = (red, green, blue)
+        self._leds = ()
+        self._last = initial_value
+        if pwm:
+            self._leds = tuple(
+                PWMLED(pin, active_high=active_high, curve=curve)
+                for pin in (red, green, blue))
+        else:
+            self._leds = tuple(
+                DigitalLED(pin, active_high=active_high)
+                for pin in (red, green, blue))
+        super().__init__(active_high, initial_value)
+        
+    def _write(self, value):
+        if type(value) is not tuple:
+            value = (value, ) * 3       
+        for led, v in zip(self._leds, value):
+            led.value = v
+
+    def _write_frame(self, duties, i):
+        # write all 3 channels of a keyframe straight to the leds
+        r, g, b = self._leds
+        r._write_frame(duties, i)
+        g._write_frame(duties, i + 1)
+        b._write_frame(duties, i + 2)
+        
+    @property
+    def value(self):
+        """
+        Represents the colour of the LED as an RGB 3-tuple of ``(red, green,
+        blue)`` where each value is between 0 and 1 if *pwm* was :data:`True`
+        when the class was constructed (but only takes values of 0 or 1 otherwise).
+        For example, red would be ``(1, 0, 0)`` and yellow would be ``(1, 1,
+        0)``, whereas orange would be ``(1, 0.5, 0)``.
+        """
+        return tuple(led.value for led in self._leds)
+
+    @value.setter
+    def value(self, value):
+        self._stop_change()
+        self._write(value)
+
+    @property
+    def is_active(self):
+        """
+        Returns :data:`True` if the LED is currently active (not black) and
+        :data:`False` otherwise.
+        """
+        return self.value != (0, 0, 0)
+
+    is_lit = is_active
+
+    def _to_255(self, value):
+        return round(value * 255)
+    
+    def _from_255(self, value):
+        return 0 if value == 0 else value / 255
+    
+    @property
+    def color(self):
+        """
+        Represents the colour of the LED as an RGB 3-tuple of ``(red, green,
+        blue)`` where each value is between 0 and 255 if *pwm* was :data:`True`
+        when the class was constructed (but only takes values of 0 or 255 otherwise).
+        For example, red would be ``(255, 0, 0)`` and yellow would be ``(255, 255,
+        0)``, whereas orange would be ``(255, 127, 0)``.
+        """
+        return tuple(self._to_255(v) for v in self.value)
+
+    @color.setter
+    def color(self, value):
+        self.value = tuple(self._from_255(v) for v in value)
+
+    @property
+    def red(self):
+        """
+        Represents the red component of the LED as a value between 0 and 255 if *pwm* was :data:`True`
+        when the class was constructed (but only takes values of 0 or 255 otherwise).
+        """
+        return self._to_255(self.value[0])
+
+    @red.setter
+    def red(self, value):
+        r, g, b = self.value
+        self.value = self._from_255(value), g, b
+
+    @property
+    def green(self):
+        """
+        Represents the green component of the LED as a value between 0 and 255 if *pwm* was :data:`True`
+        when the class was constructed (but only takes values of 0 or 255 otherwise).
+        """
+        return self._to_255(self.value[1])
+
+    @green.setter
+    def green(self, value):
+        r, g, b = self.value
+        self.value = r, self._from_255(value), b
+
+    @property
+    def blue(self):
+        """
+        Represents the blue component of the LED as a value between 0 and 255 if *pwm* was :data:`True`
+        when the class was constructed (but only takes values of 0 or 255 otherwise).
+        """
+        return self._to_255(self.value[2])
+
+    @blue.setter
+    def blue(self, value):
+        r, g, b = self.value
+        self.value = r, g, self._from_255(value)
+
+    def on(self):
+        """
+        Turns the LED on. This is equivalent to setting the LED color to white, e.g.
+        ``(1, 1, 1)``.
+        """
+        self.value = (1, 1, 1)
+
+    def invert(self):
+        """
+        Inverts the state of the device. If the device is currently off
+        (:attr:`value` is ``(0, 0, 0)``), this changes it to "fully" on
+        (:attr:`value` is ``(1, 1, 1)``). If the device has a specific colour,
+        this method inverts the colour.
+        """
+        r, g, b = self.value
+        self.value = (1 - r, 1 - g, 1 - b)
+        
+    def toggle(self):
+        """
+        Toggles the state of the device. If the device has a specific colour, then that colour is saved and the device is turned off. 
+        If the device is off, it will be changed to the last colour it had when it was on or, if none, to fully on (:attr:`value` is ``(1, 1, 1)``).
+        """
+        if self.value == (0, 0, 0):
+            self.value = self._last or (1, 1, 1)
+        else:
+            self._last = self.value 
+            self.value = (0, 0, 0)
+            
+    def blink(self, on_times=1, fade_times=0, colors=((1, 0, 0), (0, 1, 0), (0, 0, 1)), n=None, wait=False, fps=25, easing=None):
+        """
+        Makes the device blink between colours repeatedly.
+
+        :param float on_times:
+            Single value or tuple of numbers of seconds to stay on each colour. Defaults to 1 second. 
+        :param float fade_times:
+            Single value or tuple of times to fade between each colour. Must be 0 if
+            *pwm* was :data:`False` when the class was constructed.
+        :type colors: tuple
+            Tuple of colours to blink between, use ``(0, 0, 0)`` for off.
+        :param colors:
+            The colours to blink between. Defaults to red, green, blue.
+        :type n: int or None
+        :param n:
+            Number of times to blink; :data:`None` (the default) means forever.
+        :param bool wait:
+            If :data:`False` (the default), use a Timer to manage blinking,
+            continue blinking, and return immediately. If :data:`False`, only
+            return when the blinking is finished (warning: the default value of
+            *n* will result in this method never returning).
+        :param int fps:
+            The frames per second used when fading. Defaults to 25.
+        :param easing:
+            The easing curve used when fading, see :func:`easing_function`.
+            Defaults to linear.
+        """    
+        self.off()
+        self._start_table(self._keyframes(on_times, fade_times, colors, fps, easing), n, wait)
+
+    async def ablink(self, on_times=1, fade_times=0, colors=((1, 0, 0), (0, 1, 0), (0, 0, 1)), n=1, fps=25, easing=None):
+        """
+        Makes the device blink between colours repeatedly, returning an
+        awaitable which completes once the device has stopped. The device
+        is driven from the asyncio event loop, rather than a timer, so it
+        can be used alongside other asyncio tasks. Cancelling the awaiting
+        task stops the device.
+
+        The parameters are the same as :meth:`blink`, except that *n*
+        defaults to 1; :data:`None` means until the awaiting task is
+        cancelled.
+        """
+        self.off()
+        await self._play_table(self._keyframes(on_times, fade_times, colors, fps, easing), n)
+
+    def _keyframes(self, on_times, fade_times, colors, fps, easing):
+        # tuples, so lists can be given and used to key the cache
+        colors = tuple(tuple(color) for color in colors)
+        if isinstance(on_times, (list, tuple)):
+            on_times = tuple(on_times)
+        else:
+            on_times = (on_times, ) * len(colors)
+        if isinstance(fade_times, (list, tuple)):
+            fade_times = tuple(fade_times)
+        else:
+            fade_times = (fade_times, ) * len(colors)
+        # If any value is above zero then treat all as 0-255 values
+        if any(v > 1 for v in sum(colors, ())):
+            colors = tuple(tuple(self._from_255(v) for v in t) for t in colors)
+
+        return RGBLED._keyframe_tables.get(
+            (on_times, fade_times, colors, fps, easing_function(easing)))
+
+    @staticmethod
+    def _compile_keyframes(on_times, fade_times, colors, fps, easing):
+        # precompute every frame as 3 integer duties, fading linearly
+        # between the duties of each colour and the next
+        table = DutyTable(3)
+        keyframes = tuple(tuple(int(65535 * v) for v in color) for color in colors)
+
+        for c in range(len(keyframes)):
+            start = keyframes[c]
+            end = keyframes[(c + 1) % len(keyframes)]
+
+            if on_times[c] > 0:
+                table.append(on_times[c], *start)
+
+            if fade_times[c] > 0:
+                steps = fps * fade_times[c]
+                for i in range(int(steps)):
+                    t = easing(i / steps)
+                    table.append(1 / fps, *(s + (e - s) * t for s, e in zip(start, end)))
+
+        return table
+            
+    def pulse(self, fade_times=1, colors=((0, 0, 0), (1, 0, 0), (0, 0, 0), (0, 1, 0), (0, 0, 0), (0, 0, 1)), n=None, wait=False, fps=25, easing=None):
+        """
+        Makes the device fade between colours repeatedly.
+
+        :param float fade_times:
+            Single value or tuple of numbers of seconds to spend fading. Defaults to 1.
+        :param float fade_out_time:
+            Number of seconds to spend fading out. Defaults to 1.
+        :type colors: tuple
+        :param on_color:
+            Tuple of colours to pulse between in order. Defaults to red, off, green, off, blue, off. 
+        :type off_color: ~colorzero.Color or tuple
+        :type n: int or None
+        :param n:
+            Number of times to pulse; :data:`None` (the default) means forever.
+        :param easing:
+            The easing curve used when fading, see :func:`easing_function`.
+            Defaults to linear.
+        """
+        on_times = 0
+        self.blink(on_times, fade_times, colors, n, wait, fps, easing)
+
+    async def apulse(self, fade_times=1, colors=((0, 0, 0), (1, 0, 0), (0, 0, 0), (0, 1, 0), (0, 0, 0), (0, 0, 1)), n=1, fps=25, easing=None):
+        """
+        Makes the device fade between colours repeatedly, returning an
+        awaitable which completes once the device has stopped. See
+        :meth:`ablink`.
+        """
+        await self.ablink(0, fade_times, colors, n, fps, easing)
+        
+    def cycle(self, fade_times=1, colors=((1, 0, 0), (0, 1, 0), (0, 0, 1)), n=None, wait=False, fps=25, easing=None):
+        """
+        Makes the device fade in and out repeatedly.
+
+        :param float fade_times:
+            Single value or tuple of numbers of seconds to spend fading between colours. Defaults to 1.
+        :param float fade_times:
+            Number of seconds to spend fading out. Defaults to 1.
+        :type colors: tuple
+        :param on_color:
+            Tuple of colours to cycle between. Defaults to red, green, blue. 
+        :type n: int or None
+        :param n:
+            Number of times to cycle; :data:`None` (the default) means forever.
+        :param easing:
+            The easing curve used when fading, see :func:`easing_function`.
+            Defaults to linear.
+        """
+        on_times = 0
+        self.blink(on_times, fade_times, colors, n, wait, fps, easing)
+
+    async def acycle(self, fade_times=1, colors=((1, 0, 0), (0, 1, 0), (0, 0, 1)), n=1, fps=25, easing=None):
+        """
+        Makes the device fade in and out repeatedly, returning an awaitable
+        which completes once the device has stopped. See :meth:`ablink`.
+        """
+        await self.ablink(0, fade_times, colors, n, fps, easing)
+
+    def close(self):
+        super().close()
+        for led in self._leds:
+            led.close()
+        self._leds = None
+    
+RGBLED._keyframe_tables = TableCache(RGBLED._compile_keyframes)
+RGBLED.colour = RGBLED.color
+
+class PWMGroup:
+    """
+    Represents a group of PWM devices, e.g. the LEDs of a scene, whose
+    values are written together, with interrupts disabled, so that they all
+    change at once::
+
+        from picozero import PWMLED, PWMGroup
+
+        scene = PWMGroup(PWMLED(13), PWMLED(12), PWMLED(11))
+        scene.value = (1, 0.5, 0)
+
+    Values which are used again and again can be turned into duty cycles
+    once with :meth:`duties`, and written with :meth:`write`, which only
+    copies them to the PWM channels::
+
+        sunset = scene.duties((1, 0.2, 0))
+        night = scene.duties((0, 0, 0.1))
+        scene.write(sunset)
+
+    :param PWMOutputDevice devices:
+        The devices in the group.
+    """
+    __slots__ = ("_devices", "_pwms")
+    def __init__(self, *devices):
+        self._devices = devices
+        self._pwms = tuple(device._pwm for device in devices)
+
+    @property
+    def devices(self):
+        """
+        Returns a tuple of the devices in the group.
+        """
+        return self._devices
+
+    @property
+    def value(self):
+        """
+        Sets or returns the values of the devices as a tuple.
+        """
+        return tuple(device.value for device in self._devices)
+
+    @value.setter
+    def value(self, values):
+        for device in self._devices:
+            device._stop_change()
+        self.write(self.duties(values))
+
+    def duties(self, values):
+        """
+        Returns the duty cycles which set the devices to ``values``, to be
+        written by :meth:`write`.
+
+        :param values:
+            A value between 0 and 1 for each device.
+        """
+        return array('H', [
+            device._value_to_state(value)
+            for device, value in zip(self._devices, values)
+            ])
+
+    def write(self, duties):
+        """
+        Writes the duty cycles returned by :meth:`duties` to the devices, all
+        at once. Anything the devices are doing in the background (e.g.
+        blinking) isn't stopped.
+
+        :param duties:
+            The duty cycles.
+        """
+        pwms = self._pwms
+        state = disable_irq()
+        for i in range(len(pwms)):
+            pwms[i].duty_u16(duties[i])
+        enable_irq(state)
+
+    def off(self):
+        """
+        Turns all of the devices off.
+        """
+        self.value = (0,) * len(self._devices)
+
+    def close(self):
+        """
+        Closes all of the devices. Once closed, the group can no longer be
+        used.
+        """
+        for device in self._devices:
+            device.close()
+        self._devices = None
+        self._pwms = None
+
+
+# the SIO registers which read and flip the outputs of every GPIO at once
+_GPIO_OUT = const(0xd0000010)
+_GPIO_OUT_XOR = const(0xd000001c)
+
+class LEDBoard(OutputDevice, PinsMixin):
+    """
+    Represents a collection of LEDs whose states are set together as the
+    bits of an integer, the first LED being bit 0::
+
+        from picozero import LEDBoard
+
+        leds = LEDBoard(12, 13, 14, 15)
+        leds.value = 0b0101
+
+    Every LED is changed by a single write to the GPIO registers, so they
+    all change at the same moment, however many there are.
+
+    :param int pins:
+        The pins that the LEDs are connected to.
+
+    :param bool active_high:
+        If :data:`True` (the default), the :meth:`on` method will set the
+        Pins to HIGH. If :data:`False`, the :meth:`on` method will set the
+        Pins to LOW (the :meth:`off` method always does the opposite).
+
+    :param int initial_value:
+        The LEDs which are lit initially. Defaults to 0 (all off).
+    """
+    __slots__ = ("_pin_nums", "_pins", "_gpio_mask", "_luts")
+    def __init__(self, *pins, active_high=True, initial_value=0):
+        self._pin_nums = pins
+        self._pins = tuple(Pin(pin, Pin.OUT) for pin in pins)
+        self._gpio_mask = 0
+        # the GPIO bits of each of the 16 values of every 4 LEDs
+        self._luts = array('L', [0] * (16 * ((len(pins) + 3) // 4)))
+        for i, pin in enumerate(pins):
+            self._gpio_mask |= 1 << pin
+            for n in range(16):
+                if n >> (i & 3) & 1:
+                    self._luts[(i >> 2) * 16 + n] |= 1 << pin
+        super().__init__(active_high, initial_value)
+
+    def __len__(self):
+        return len(self._pin_nums)
+
+    def _write_bits(self, bits):
+        gpio = 0
+        luts = self._luts
+        i = 0
+        while bits and i < len(luts):
+            gpio |= luts[i + (bits & 15)]
+            bits >>= 4
+            i += 16
+        if not self._active_state:
+            gpio ^= self._gpio_mask
+        # flip the pins which are changing
+        mem32[_GPIO_OUT_XOR] = (mem32[_GPIO_OUT] ^ gpio) & self._gpio_mask
+
+    def _read_bits(self):
+        gpio = mem32[_GPIO_OUT]
+        if not self._active_state:
+            gpio ^= self._gpio_mask
+        bits = 0
+        for i, pin in enumerate(self._pin_nums):
+            if gpio >> pin & 1:
+                bits |= 1 << i
+        return bits
+
+    def _read(self):
+        return self._read_bits()
+
+    def _write(self, value):
+        self._write_bits(value)
+
+    def _write_frame(self, duties, i):
+        # a frame of a compiled pattern is the GPIO levels, 16 bits at a time
+        mem32[_GPIO_OUT_XOR] = (
+            mem32[_GPIO_OUT] ^ (duties[i] | duties[i + 1] << 16)
+            ) & self._gpio_mask
+
+    @property
+    def value(self):
+        """
+        Sets or returns the LEDs which are lit as an integer, where bit 0 is
+        the first LED, e.g. ``0b0101`` lights the first and third LEDs.
+        """
+        return self._read()
+
+    @value.setter
+    def value(self, value):
+        self._stop_change()
+        self._write(value)
+
+    def on(self, value=None, t=None, wait=False):
+        """
+        Turns the LEDs on.
+
+        :param int value:
+            The LEDs to light. If :data:`None` (the default), all of the
+            LEDs are lit.
+
+        :param float t:
+            The time in seconds that the LEDs should be on. If None is
+            specified, the LEDs will stay on. The default is None.
+
+        :param bool wait:
+           If True, the method will block until the time `t` has expired.
+           If False, the method will return and the LEDs will turn on in
+           the background. Defaults to False. Only effective if `t` is not
+           None.
+        """
+        if value is None:
+            value = (1 << len(self._pin_nums)) - 1
+        super().on(value, t, wait)
+
+    def toggle(self):
+        """
+        Turns the LEDs which are off on, and those which are on off.
+        """
+        self._stop_change()
+        self._write_bits(self._read_bits() ^ ((1 << len(self._pin_nums)) - 1))
+
+    def _patterns(self, patterns, interval):
+        return LEDBoard._pattern_tables.get((
+            self._pin_nums,
+            self._active_state,
+            tuple(
+                pattern if type(pattern) is tuple else (pattern, interval)
+                for pattern in patterns
+                ),
+            ))
+
+    @staticmethod
+    def _compile_patterns(pin_nums, active_high, patterns):
+        mask = 0
+        for pin in pin_nums:
+            mask |= 1 << pin
+        table = DutyTable(2)
+        for bits, seconds in patterns:
+            gpio = 0
+            for i, pin in enumerate(pin_nums):
+                if bits >> i & 1:
+                    gpio |= 1 << pin
+            if not active_high:
+                gpio ^= mask
+            table.append(seconds, gpio & 0xffff, gpio >> 16)
+        return table
+
+    def play(self, patterns, interval=1, n=1, wait=False):
+        """
+        Lights the LEDs in a sequence of patterns. The sequence is compiled
+        once, so changing from one pattern to the next is a single write.
+
+        :param patterns:
+            The patterns to show. Each is an integer of the LEDs to light,
+            as for :attr:`value`, or a tuple of the integer and the time in
+            seconds to show it for.
+
+        :param float interval:
+            The time in seconds to show each pattern which is given without
+            a time. Defaults to 1.
+
+        :param int n:
+            The number of times to repeat the sequence. If None, it will
+            repeat forever. Defaults to 1.
+
+        :param bool wait:
+           If True, the method will block until the sequence has finished.
+           If False (the default), the method will return and the sequence
+           will play in the background.
+        """
+        self._stop_change()
+        self._start_table(self._patterns(patterns, interval), n, wait)
+
+    async def aplay(self, patterns, interval=1, n=1):
+        """
+        Lights the LEDs in a sequence of patterns, returning an awaitable
+        which completes once the sequence has finished. The sequence is
+        played from the asyncio event loop, rather than a timer.
+
+        Cancelling the awaiting task stops the sequence.
+
+        :param patterns:
+            The patterns to show, as for :meth:`play`.
+
+        :param float interval:
+            The time in seconds to show each pattern which is given without
+            a time. Defaults to 1.
+
+        :param int n:
+            The number of times to repeat the sequence. If None, it will
+            repeat until the awaiting task is cancelled. Defaults to 1.
+        """
+        self._stop_change()
+        await self._play_table(self._patterns(patterns, interval), n)
+
+    def blink(self, on_time=1, off_time=None, n=None, wait=False):
+        """
+        Makes all of the LEDs turn on and off repeatedly.
+
+        :param float on_time:
+            The length of time in seconds that the LEDs will be on. Defaults to 1.
+
+        :param float off_time:
+            The length of time in seconds that the LEDs will be off. If `None`,
+            it will be the same as ``on_time``. Defaults to `None`.
+
+        :param int n:
+            The number of times to repeat the blink operation. If None is
+            specified, the LEDs will continue blinking forever. The default
+            is None.
+
+        :param bool wait:
+           If True, the method will block until the LEDs stop turning on and off.
+           If False, the method will return and the LEDs will turn on and off in
+           the background. Defaults to False.
+        """
+        off_time = on_time if off_time is None else off_time
+        self.play([((1 << len(self._pin_nums)) - 1, on_time), (0, off_time)], n=n, wait=wait)
+
+    async def ablink(self, on_time=1, off_time=None, n=1):
+        """
+        Makes all of the LEDs turn on and off repeatedly, returning an
+        awaitable which completes once the LEDs have stopped.
+
+        :param float on_time:
+            The length of time in seconds that the LEDs will be on. Defaults to 1.
+
+        :param float off_time:
+            The length of time in seconds that the LEDs will be off. If `None`,
+            it will be the same as ``on_time``. Defaults to `None`.
+
+        :param int n:
+            The number of times to repeat the blink operation. If None is
+            specified, the LEDs will continue blinking until the awaiting
+            task is cancelled. Defaults to 1.
+        """
+        off_time = on_time if off_time is None else off_time
+        await self.aplay([((1 << len(self._pin_nums)) - 1, on_time), (0, off_time)], n=n)
+
+    def close(self):
+        """
+        Turns the LEDs off. Once closed, the LEDs can no longer be used.
+        """
+        super().close()
+        self._pins = None
+
+LEDBoard._pattern_tables = TableCache(LEDBoard._compile_patterns)
+
+class LEDBarGraph(LEDBoard):
+    """
+    Represents a row of LEDs used as a bar graph, whose :attr:`value` is
+    the fraction of the LEDs which are lit::
+
+        from picozero import LEDBarGraph, Pot
+
+        graph = LEDBarGraph(8, 9, 10, 11, 12, 13, 14, 15)
+        pot = Pot(26)
+
+        while True:
+            graph.value = pot.value
+
+    :param int pins:
+        The pins that the LEDs are connected to, from the bottom of the
+        graph to the top.
+
+    :param bool active_high:
+        If :data:`True` (the default), the :meth:`on` method will set the
+        Pins to HIGH. If :data:`False`, the :meth:`on` method will set the
+        Pins to LOW (the :meth:`off` method always does the opposite).
+
+    :param float initial_value:
+        The initial value of the graph. Defaults to 0.
+    """
+    __slots__ = ()
+
+    def _read(self):
+        bits = self._read_bits()
+        count = len(self._pin_nums)
+        lit = 0
+        for i in range(count):
+            lit += bits >> i & 1
+        # lit from the top if the bottom LED is off
+        return (-lit if bits and not bits & 1 else lit) / count
+
+    def _write(self, value):
+        count = len(self._pin_nums)
+        value = clamp(value, -1, 1)
+        lit = int(abs(value) * count + 0.5)
+        bits = (1 << lit) - 1
+        if value < 0:
+            bits <<= count - lit
+        self._write_bits(bits)
+
+    @property
+    def value(self):
+        """
+        Sets or returns the value of the graph, between -1 and 1. A value of
+        0.5 lights the bottom half of the LEDs, and -0.5 the top half.
+        """
+        return self._read()
+
+    @value.setter
+    def value(self, value):
+        self._stop_change()
+        self._write(value)
+
+    def on(self, value=1, t=None, wait=False):
+        """
+        Turns the graph on.
+
+        :param float value:
+            The value of the graph. Defaults to 1 (all of the LEDs).
+
+        :param float t:
+            The time in seconds that the graph should be on. If None is
+            specified, the graph will stay on. The default is None.
+
+        :param bool wait:
+           If True, the method will block until the time `t` has expired.
+           If False, the method will return and the graph will turn on in
+           the background. Defaults to False. Only effective if `t` is not
+           None.
+        """
+        super().on(value, t, wait)
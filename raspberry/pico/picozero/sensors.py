@@ -0,0 +1,366 @@
+"""
+Temperature and distance sensors.
+"""
+from array import array
+from .core import Pin, ticks_ms, ticks_us, ticks_diff, sleep, sleep_us
+from .core import PinsMixin, scheduler, MedianFilter, EMAFilter, FilterChain, _import_asyncio
+from .inputs import AnalogInputDevice
+
+def pico_temp_conversion(voltage):
+    # Formula for calculating temp from voltage for the onboard temperature sensor
+    return 27 - (voltage - 0.706)/0.001721
+
+class TemperatureSensor(AnalogInputDevice):
+    """
+    Represents a TemperatureSensor, which outputs a variable voltage. The voltage 
+    can be converted to a temperature using a `conversion` function passed as a 
+    parameter.
+
+    Alias for :class:`Thermistor` and :class:`TempSensor`.
+
+    :param int pin:
+        The pin that the device is connected to.
+        
+    :param active_state:
+        The active state of the device. If :data:`True` (the default),
+        the :class:`AnalogInputDevice` will assume that the device is
+        active when the pin is high and above the threshold. If 
+        ``active_state`` is ``False``, the device will be active when 
+        the pin is low and below the threshold. 
+
+    :param float threshold:
+        The threshold that the device must be above or below to be
+        considered active. The default is 0.5.
+
+    :param float conversion:
+        A function that takes a voltage and returns a temperature. 
+
+        e.g. The internal temperature sensor has a voltage range of 0.706V to 0.716V 
+        and would use the follow conversion function::
+        
+            def temp_conversion(voltage):
+                return 27 - (voltage - 0.706)/0.001721
+
+            temp_sensor = TemperatureSensor(pin, conversion=temp_conversion)
+
+        If :data:`None` (the default), the ``temp`` property will return :data:`None`.
+
+    :param float max_age:
+        The length of time in seconds a temperature is reused for before a
+        new reading is taken, so that many readers cost one conversion. If
+        0 (the default), every read of ``temp`` takes a new reading.
+
+    :param filter:
+        A filter that readings are passed through, e.g. an
+        :class:`EMAFilter` or :class:`MedianFilter`. If :data:`None` (the
+        default), readings aren't filtered.
+
+    :param int history_size:
+        The number of temperatures kept in :attr:`history`. Defaults to 0.
+
+    :param int oversample:
+        The number of conversions averaged into each reading. Defaults
+        to 1.
+
+    Calling :meth:`start_sampling` takes readings in the background from
+    the shared :class:`Scheduler`, after which ``temp`` always returns the
+    latest reading without a conversion.
+    """
+    __slots__ = (
+        "_conversion", "_temp", "_temp_time", "_max_age_ms", "_history",
+        "_history_index", "_history_count",
+        )
+    def __init__(self, pin, active_state=True, threshold=0.5, conversion=None, max_age=0, filter=None, history_size=0, oversample=1):
+         self._conversion = conversion
+         self.max_age = max_age
+         self._temp = None
+         self._temp_time = 0
+         self._history = array('f', [0] * history_size)
+         self._history_index = 0
+         self._history_count = 0
+         super().__init__(pin, active_state, threshold, oversample, filter)
+
+    def _update_temp(self, state):
+        # convert a reading and add it to the history
+        self._temp = self._conversion(self._state_to_value(state) * 3.3)
+        self._temp_time = ticks_ms()
+
+        size = len(self._history)
+        if size:
+            self._history[self._history_index] = self._temp
+            self._history_index = (self._history_index + 1) % size
+            if self._history_count < size:
+                self._history_count += 1
+
+    def _step(self):
+        period = super()._step()
+        if self._conversion is not None:
+            self._update_temp(self._sample_state)
+        return period
+        
+    @property
+    def temp(self):
+        """
+        Returns the temperature of the device. If the conversion function is not
+        set, this will return :data:`None`.
+        """
+        if self._conversion is not None:
+            if not self._running and (
+                self._temp is None or
+                ticks_diff(ticks_ms(), self._temp_time) >= self._max_age_ms):
+                self._update_temp(self._sample())
+            return self._temp
+        else:
+            return None
+
+    @property
+    def max_age(self):
+        """
+        Sets or returns the length of time in seconds a temperature is
+        reused for before a new reading is taken.
+        """
+        return self._max_age_ms / 1000
+
+    @max_age.setter
+    def max_age(self, value):
+        self._max_age_ms = int(value * 1000)
+
+    @property
+    def history(self):
+        """
+        Returns a list of the most recent temperatures, oldest first.
+        """
+        size = len(self._history)
+        start = (self._history_index - self._history_count) % size if size else 0
+        return [self._history[(start + i) % size] for i in range(self._history_count)]
+
+    @property
+    def conversion(self):
+        """
+        Sets or returns the conversion function for the device.
+        """
+        return self._conversion
+
+    @conversion.setter
+    def conversion(self, value):
+        self._conversion = value
+        self._temp = None
+       
+def _create_pico_temp_sensor():
+    # called by picozero the first time pico_temp_sensor is used
+    return TemperatureSensor(4, True, 0.5, pico_temp_conversion, max_age=1, history_size=16)
+
+TempSensor = TemperatureSensor
+Thermistor = TemperatureSensor
+
+class DistanceSensor(PinsMixin):
+    """
+    Represents a HC-SR04 ultrasonic distance sensor.
+
+    By default each read of :attr:`distance` triggers a measurement and
+    waits for the echo. If ``continuous`` is :data:`True`, measurements are
+    taken in the background by the shared :class:`Scheduler` and the echo
+    is timed by a pin interrupt, so :attr:`distance` returns the latest
+    filtered measurement straight away::
+
+        from picozero import DistanceSensor
+
+        ds = DistanceSensor(echo=2, trigger=3, continuous=True)
+        print(ds.distance)
+
+    :param int echo:
+        The pin that the ECHO pin is connected to.
+
+    :param int trigger:
+        The pin that the TRIG pin is connected to. 
+
+    :param float max_distance:
+        The :attr:`value` attribute reports a normalized value between 0 (too
+        close to measure) and 1 (maximum distance). This parameter specifies
+        the maximum distance expected in meters. This defaults to 1.
+
+    :param bool continuous:
+        If :data:`True`, measurements are taken continuously in the
+        background. Defaults to :data:`False`.
+
+    :param float rate:
+        The number of measurements per second when measuring continuously.
+        The HC-SR04 needs at least 60ms between measurements, so this should
+        be 15 or lower. Defaults to 10.
+
+    :param filter:
+        The filter that continuous measurements are passed through. This can
+        be any object with an ``update(value)`` method returning the
+        filtered value, e.g. a :class:`MedianFilter`. Defaults to a 5 value
+        :class:`MedianFilter` followed by an :class:`EMAFilter`.
+    """
+    __slots__ = (
+        "_pin_nums", "_trigger", "_echo", "_max_distance", "_filter",
+        "_distance", "_readings", "_misses", "_period_us", "_pulse_us",
+        "_pinged", "_echo_on", "_running", "_token",
+        )
+    def __init__(self, echo, trigger, max_distance=1, continuous=False, rate=10, filter=None):
+        self._pin_nums = (echo, trigger)
+        self._max_distance = max_distance
+        self._echo = Pin(echo, mode=Pin.IN, pull=Pin.PULL_DOWN)
+        self._trigger = Pin(trigger, mode=Pin.OUT, value=0)
+
+        self._filter = FilterChain(MedianFilter(5), EMAFilter(0.5)) if filter is None else filter
+        self._period_us = int(1000000 / rate)
+        self._distance = None
+        self._readings = 0
+        self._misses = 0
+        self._echo_on = 0
+        self._pulse_us = -1
+        self._pinged = False
+        self._token = 0
+        self._running = False
+
+        if continuous:
+            self.start()
+
+    def start(self):
+        """
+        Starts measuring continuously in the background.
+        """
+        if not self._running:
+            self._filter.reset()
+            self._distance = None
+            self._pinged = False
+            self._echo.irq(self._echo_change, Pin.IRQ_RISING | Pin.IRQ_FALLING, hard=True)
+            scheduler.start(self, self)
+            self._running = True
+
+    def stop(self):
+        """
+        Stops measuring continuously.
+        """
+        scheduler.cancel(self)
+        self._finish()
+
+    def _echo_change(self, p):
+        # time the echo pulse, without allocating so it can be a hard irq
+        if p.value():
+            self._echo_on = ticks_us()
+        else:
+            self._pulse_us = ticks_diff(ticks_us(), self._echo_on)
+
+    def _step(self):
+        if self._pinged:
+            if self._pulse_us >= 0:
+                self._misses = 0
+                distance = min((self._pulse_us * 0.000343) / 2, self._max_distance)
+                self._distance = self._filter.update(distance)
+            else:
+                # the echo wasn't received before the next measurement,
+                # report out of range if this keeps happening
+                self._misses += 1
+                if self._misses >= 3:
+                    self._distance = None
+                    self._filter.reset()
+            self._readings += 1
+
+        self._pulse_us = -1
+        self._trigger.on()
+        sleep_us(10)
+        self._trigger.off()
+        self._pinged = True
+
+        return self._period_us
+
+    def _finish(self):
+        self._running = False
+        self._echo.irq(handler=None)
+
+    def _read(self):
+        echo_on = None
+        echo_off = None
+        timed_out = False
+        
+        self._trigger.off()
+        sleep(0.000005)
+        self._trigger.on()
+        sleep(0.00001)
+        self._trigger.off()
+
+        # If an echo isn't measured in 100 milliseconds, it should
+        # be considered out of range. The maximum length of the
+        # echo is 38 milliseconds but it's not known how long the
+        # transmission takes after the trigger
+        stop = ticks_ms() + 100
+        while echo_off is None and not timed_out:
+            if self._echo.value() == 1 and echo_on is None:
+                echo_on = ticks_us()
+            if echo_on is not None and self._echo.value() == 0:
+                echo_off = ticks_us()
+            if ticks_ms() > stop:
+                timed_out = True
+            
+        if echo_off is None or timed_out:
+            return None
+        else:
+            distance = ((echo_off - echo_on) * 0.000343) / 2
+            distance = min(distance, self._max_distance)
+            return distance
+    
+    @property
+    def value(self):
+        """
+        Returns a value between 0, indicating the reflector is either touching 
+        the sensor or is sufficiently near that the sensor can’t tell the 
+        difference, and 1, indicating the reflector is at or beyond the 
+        specified max_distance. A return value of None indicates that the
+        echo was not received before the timeout.
+        """
+        distance = self.distance
+        return distance / self._max_distance if distance is not None else None
+    
+    @property
+    def distance(self):
+        """
+        Returns the current distance measured by the sensor in meters. Note 
+        that this property will have a value between 0 and max_distance.
+
+        When measuring continuously, this is the latest filtered
+        measurement and returns immediately.
+        """
+        if self._running:
+            return self._distance
+        return self._read()
+
+    @property
+    def max_distance(self):
+        """
+        Returns the maximum distance that the sensor will measure in metres.
+        """
+        return self._max_distance
+
+    @property
+    def is_measuring(self):
+        """
+        Returns :data:`True` if the sensor is measuring continuously.
+        """
+        return self._running
+
+    async def next_reading(self):
+        """
+        Waits, without blocking other ``uasyncio`` tasks, until the next
+        continuous measurement has been taken and returns the filtered
+        distance::
+
+            distance = await ds.next_reading()
+        """
+        asyncio = _import_asyncio()
+        readings = self._readings
+        while self._readings == readings and self._running:
+            await asyncio.sleep(self._period_us / 2000000)
+        return self._distance
+
+    def close(self):
+        """
+        Closes the device and releases any resources. Once closed, the device
+        can no longer be used.
+        """
+        self.stop()
+        self._echo = None
+        self._trigger = None
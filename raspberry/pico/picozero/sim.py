@@ -0,0 +1,402 @@
+"""
+Simulated hardware for running picozero on a computer, e.g. to test it or
+measure its timing without a board.
+
+picozero uses this module automatically when ``machine`` can't be imported.
+It provides the parts of ``machine``, ``micropython`` and ``time`` that
+picozero uses, driven by a virtual clock: time only moves on when the
+program sleeps or calls :func:`advance`, and timers fire exactly when they
+are due, so sequences run much faster than real time and always with the
+same timing. Every change of a pin level, PWM duty or frequency is recorded
+in :data:`trace`::
+
+    from picozero import LED, sim
+
+    led = LED(2, pwm=False)
+    led.blink(0.5, n=2)
+    sim.advance(2)
+    # the (time_us, level) of every change of pin 2, half a second apart
+    print(sim.transitions(2))
+
+Inputs are driven with :func:`set_pin` and :func:`set_adc`.
+"""
+from time import monotonic
+
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALFPERIOD = TICKS_PERIOD >> 1
+
+#: The virtual time, in microseconds, that reading a clock takes. Busy
+#: loops which poll ticks_us or ticks_ms see time pass because of it.
+read_cost_us = 1
+
+#: If :data:`True`, the virtual clock also follows the real clock, which is
+#: needed by code which waits with ``asyncio`` rather than sleeping.
+realtime = False
+
+#: Every change of a pin level, PWM duty or PWM frequency, as a list of
+#: ``(time_us, pin, kind, value)`` tuples where kind is ``"pin"``,
+#: ``"duty"`` or ``"freq"``.
+trace = []
+
+#: If :data:`False`, changes aren't added to :data:`trace`.
+tracing = True
+
+_now = 0
+_real_start = monotonic()
+_real_offset = 0
+_levels = {}
+_irqs = {}
+_adcs = {4: 14020}
+_timers = []
+_scheduled = []
+_schedule_size = 8
+_irq_enabled = True
+_irq_pending = []
+
+###############################################################################
+# CLOCK
+###############################################################################
+
+def now():
+    """
+    Returns the virtual time in microseconds since the simulation started.
+    Unlike :func:`ticks_us` it never wraps around.
+    """
+    global _now
+    if realtime:
+        real = int((monotonic() - _real_start) * 1000000) + _real_offset
+        if real > _now:
+            _now = real
+    return _now
+
+def _read():
+    global _now
+    _now = now() + read_cost_us
+    return _now
+
+def ticks_us():
+    return _read() & TICKS_MAX
+
+def ticks_ms():
+    return (_read() // 1000) & TICKS_MAX
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + TICKS_HALFPERIOD) & TICKS_MAX) - TICKS_HALFPERIOD
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+def advance(seconds):
+    """
+    Moves the virtual clock on by ``seconds``, firing every timer and
+    scheduled callback which falls due on the way, in order.
+    """
+    global _now, _real_offset
+    target = now() + int(seconds * 1000000)
+    while True:
+        run_scheduled()
+        due = [timer for timer in _timers if timer._due <= target]
+        if not due:
+            break
+        timer = min(due, key=lambda timer: timer._due)
+        if timer._due > _now:
+            _now = timer._due
+        timer._fire()
+    if target > _now:
+        if realtime:
+            _real_offset += target - _now
+        _now = target
+    run_scheduled()
+
+def sleep(seconds):
+    advance(seconds)
+
+def sleep_ms(ms):
+    advance(ms / 1000)
+
+def sleep_us(us):
+    advance(us / 1000000)
+
+###############################################################################
+# TRACE
+###############################################################################
+
+def _record(pin, kind, value):
+    if tracing:
+        trace.append((_now, pin, kind, value))
+
+def transitions(pin, kind=None):
+    """
+    Returns the recorded changes of a pin as a list of ``(time_us, value)``
+    tuples.
+
+    :param int pin:
+        The pin number.
+
+    :param str kind:
+        ``"pin"``, ``"duty"`` or ``"freq"``. If :data:`None` (the default),
+        pin levels and PWM duties are both returned.
+    """
+    return [
+        (t, value) for t, p, k, value in trace
+        if p == pin and (k == kind if kind else k != "freq")]
+
+def clear_trace():
+    """
+    Empties :data:`trace`.
+    """
+    del trace[:]
+
+###############################################################################
+# MICROPYTHON
+###############################################################################
+
+def schedule(func, arg):
+    if len(_scheduled) >= _schedule_size:
+        raise RuntimeError("schedule queue full")
+    _scheduled.append((func, arg))
+
+def run_scheduled():
+    """
+    Runs the callbacks queued by ``micropython.schedule``.
+    """
+    while _scheduled:
+        func, arg = _scheduled.pop(0)
+        func(arg)
+
+def const(value):
+    return value
+
+###############################################################################
+# MACHINE
+###############################################################################
+
+def disable_irq():
+    global _irq_enabled
+    state = _irq_enabled
+    _irq_enabled = False
+    return state
+
+def enable_irq(state=True):
+    global _irq_enabled
+    _irq_enabled = state
+    while _irq_enabled and _irq_pending:
+        _irq_pending.pop(0)()
+
+def freq():
+    return 125000000
+
+def _set_level(pin, level):
+    level = 1 if level else 0
+    old = _levels.get(pin)
+    _levels[pin] = level
+    if old is None or old == level:
+        return
+
+    _record(pin, "pin", level)
+    irq = _irqs.get(pin)
+    if irq is not None:
+        handler, trigger, pin_obj = irq
+        if trigger & (Pin.IRQ_RISING if level else Pin.IRQ_FALLING):
+            if _irq_enabled:
+                handler(pin_obj)
+            else:
+                _irq_pending.append(lambda: handler(pin_obj))
+
+def set_pin(pin, level):
+    """
+    Drives an input pin from outside, as a button or sensor would, firing
+    its interrupt handler and any callbacks it schedules.
+
+    :param int pin:
+        The pin number.
+
+    :param int level:
+        1 for high, 0 for low.
+    """
+    _set_level(pin, level)
+    run_scheduled()
+
+def set_adc(pin, value):
+    """
+    Sets what an analog input reads.
+
+    :param int pin:
+        The pin number, or 4 for the internal temperature sensor.
+
+    :param value:
+        The reading between 0 and 65535, or a function which returns the
+        reading each time it is called.
+    """
+    _adcs[pin] = value
+
+# the hardware objects have slots, so that their size is fixed (like the C
+# objects on a board) and they don't add noise to memory measurements
+
+class Pin:
+    __slots__ = ("_id", )
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    ALT = 3
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self._id = id
+        if id not in _levels:
+            # an input floats to its pull, or low
+            _levels[id] = 1 if pull == Pin.PULL_UP else 0
+        if value is not None:
+            _set_level(id, value)
+
+    def __repr__(self):
+        return "Pin({})".format(self._id)
+
+    def value(self, value=None):
+        if value is None:
+            return _levels[self._id]
+        _set_level(self._id, value)
+
+    __call__ = value
+
+    def on(self):
+        _set_level(self._id, 1)
+
+    def off(self):
+        _set_level(self._id, 0)
+
+    high = on
+    low = off
+
+    def toggle(self):
+        _set_level(self._id, not _levels[self._id])
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        if handler is None:
+            _irqs.pop(self._id, None)
+        else:
+            _irqs[self._id] = (handler, trigger, self)
+
+class PWM:
+    __slots__ = ("_id", "_freq", "_duty")
+
+    def __init__(self, dest, freq=None, duty_u16=None):
+        self._id = dest._id
+        self._freq = 0
+        self._duty = 0
+        if freq is not None:
+            self.freq(freq)
+        if duty_u16 is not None:
+            self.duty_u16(duty_u16)
+
+    def freq(self, value=None):
+        if value is None:
+            return self._freq
+        value = int(value)
+        if value != self._freq:
+            self._freq = value
+            _record(self._id, "freq", value)
+
+    def duty_u16(self, value=None):
+        if value is None:
+            return self._duty
+        value = int(value)
+        if value != self._duty:
+            self._duty = value
+            _record(self._id, "duty", value)
+
+    def deinit(self):
+        self.duty_u16(0)
+
+class ADC:
+    __slots__ = ("_id", )
+    CORE_TEMP = 4
+
+    def __init__(self, pin):
+        self._id = pin._id if isinstance(pin, Pin) else pin
+
+    def read_u16(self):
+        value = _adcs.get(self._id, 0)
+        if callable(value):
+            value = value()
+        return max(0, min(int(value), 65535))
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, mode=PERIODIC, period=-1, freq=-1, tick_hz=1000, callback=None):
+        self._due = 0
+        if callback is not None:
+            self.init(mode=mode, period=period, freq=freq, tick_hz=tick_hz, callback=callback)
+
+    def init(self, mode=PERIODIC, period=-1, freq=-1, tick_hz=1000, callback=None):
+        # period is in units of 1 / tick_hz seconds, milliseconds by default
+        if freq > 0:
+            self._period = int(1000000 / freq)
+        else:
+            self._period = int(period * 1000000 / tick_hz)
+        self._mode = mode
+        self._callback = callback
+        self._due = now() + self._period
+        if self not in _timers:
+            _timers.append(self)
+
+    def deinit(self):
+        if self in _timers:
+            _timers.remove(self)
+
+    def _fire(self):
+        if self._mode == Timer.PERIODIC:
+            self._due += max(self._period, 1)
+        else:
+            self.deinit()
+        if self._callback is not None:
+            self._callback(self)
+
+class _Mem32:
+    # the SIO registers which read and write every GPIO at once, other
+    # addresses are plain memory
+    GPIO_IN = 0xd0000004
+    GPIO_OUT = 0xd0000010
+    GPIO_OUT_SET = 0xd0000014
+    GPIO_OUT_CLR = 0xd0000018
+    GPIO_OUT_XOR = 0xd000001c
+
+    def __init__(self):
+        self._words = {}
+
+    def _gpio(self):
+        bits = 0
+        for pin, level in _levels.items():
+            if level and isinstance(pin, int) and 0 <= pin < 30:
+                bits |= 1 << pin
+        return bits
+
+    def _write_gpio(self, bits):
+        for pin in range(30):
+            if pin in _levels:
+                _set_level(pin, bits >> pin & 1)
+
+    def __getitem__(self, addr):
+        if addr in (self.GPIO_IN, self.GPIO_OUT):
+            return self._gpio()
+        return self._words.get(addr, 0)
+
+    def __setitem__(self, addr, value):
+        if addr == self.GPIO_OUT:
+            self._write_gpio(value)
+        elif addr == self.GPIO_OUT_SET:
+            self._write_gpio(self._gpio() | value)
+        elif addr == self.GPIO_OUT_CLR:
+            self._write_gpio(self._gpio() & ~value)
+        elif addr == self.GPIO_OUT_XOR:
+            self._write_gpio(self._gpio() ^ value)
+        else:
+            self._words[addr] = value & 0xffffffff
+
+mem32 = _Mem32()
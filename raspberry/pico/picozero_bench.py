@@ -0,0 +1,336 @@
+"""
+Benchmarks for picozero, printed as a single line of JSON so that the
+results of different releases can be compared.
+
++ ``capacity`` - for a growing number of simultaneous PWMLED.pulse,
+  RGBLED.cycle and Speaker.play sequences (and, to find the scheduler's own
+  limit, sequences on devices with no pins), how late their steps run and
+  how long the scheduler's ticks take. ``capacity_limit`` is the largest
+  number whose p99 lateness stayed within ``MAX_LATE_US``.
++ ``edge_latency_us`` - the time from a button's pin changing to its
+  ``when_pressed`` callback running.
++ ``alloc_per_frame`` - the bytes allocated for each frame of animation.
++ ``device_bytes`` - the memory used by one of each kind of device.
+
+Run it on a Pico with nothing connected to GP0 - GP15 and GP22 (the pins are
+driven, and the button edges are made by switching GP22's pull resistor)::
+
+    import picozero_bench
+    picozero_bench.main()
+
+or on a computer, with simulated hardware::
+
+    python3 picozero_bench.py > results.json
+
+On a computer the clock is virtual: every step runs on time and every edge
+takes the same time to dispatch, so ``capacity_limit`` and
+``edge_latency_us`` are ``null``, and the lateness and tick times in
+``capacity`` only show the scheduler's behaviour. The fields which can be
+compared between releases on a computer are ``frames`` and
+``cpu_us_per_frame`` (the host time spent per frame) in ``capacity``,
+``alloc_per_frame`` and ``device_bytes``.
+"""
+import gc
+import json
+import sys
+
+import picozero
+from picozero import DigitalLED, PWMLED, RGBLED, Speaker, Button, Servo
+from picozero import OutputDevice, PWMOutputDevice
+
+try:
+    from machine import Pin
+    SIMULATED = False
+except ImportError:
+    SIMULATED = True
+
+if SIMULATED:
+    import tracemalloc
+    from picozero import sim
+    from time import perf_counter
+    from picozero.sim import ticks_us, ticks_diff, sleep
+else:
+    from time import ticks_us, ticks_diff, sleep
+
+#: The p99 lateness, in microseconds, beyond which timing has degraded.
+MAX_LATE_US = 10000
+
+#: How long each level of the capacity benchmark runs for, in seconds.
+DURATION = 2
+
+BUTTON_PIN = 22
+
+class _NullDevice(OutputDevice):
+    # an output device with no pin, so the scheduler can be loaded beyond
+    # the number of PWM channels
+    def __init__(self):
+        super().__init__(initial_value=None)
+
+    def _read(self):
+        return 0
+
+    def _write(self, value):
+        pass
+
+    def _write_frame(self, duties, i):
+        pass
+
+def _free_pwm_pins(whole_slices=False):
+    # one pin for each PWM channel which isn't already in use, or for each
+    # slice which isn't, for devices which change their frequency
+    used = PWMOutputDevice._channels_used
+    pins = []
+    for pin in range(16):
+        channel = PWMOutputDevice.PIN_TO_PWM_CHANNEL[pin]
+        if whole_slices and (channel & 1 or used[channel ^ 1] is not None):
+            continue
+        if used[channel] is None:
+            pins.append(pin)
+    return pins
+
+def _start_pulses(n):
+    pins = _free_pwm_pins()
+    if n > len(pins):
+        return None
+    devices = [PWMLED(pin) for pin in pins[:n]]
+    for device in devices:
+        device.pulse(n=None)
+    return devices
+
+def _start_cycles(n):
+    pins = _free_pwm_pins()
+    if 3 * n > len(pins):
+        return None
+    devices = [RGBLED(*pins[3 * i:3 * i + 3]) for i in range(n)]
+    for device in devices:
+        device.cycle(n=None)
+    return devices
+
+def _start_tunes(n):
+    pins = _free_pwm_pins(whole_slices=True)
+    if n > len(pins):
+        return None
+    devices = [Speaker(pin) for pin in pins[:n]]
+    for device in devices:
+        device.play([("c4", 0.1), ("e4", 0.1), ("g4", 0.1), (None, 0.1)], n=None, wait=False)
+    return devices
+
+def _start_nulls(n):
+    table = PWMOutputDevice._blink_tables.get((1, 1, 0, 0, 25))
+    devices = [_NullDevice() for i in range(n)]
+    for device in devices:
+        device._start_table(table, None, False)
+    return devices
+
+SERIES = {
+    "pulse": (_start_pulses, (1, 2, 4, 8, 16)),
+    "cycle": (_start_cycles, (1, 2, 4, 5)),
+    "play": (_start_tunes, (1, 2, 4, 8)),
+    "null": (_start_nulls, (1, 4, 16, 64, 128)),
+    }
+
+def _frames(stats):
+    return sum(late["count"] for late in stats["late_us"].values())
+
+def _late(stats):
+    # the worst device's percentiles
+    p99 = 0
+    worst = 0
+    for late in stats["late_us"].values():
+        if late["count"]:
+            p99 = max(p99, late["p99"])
+            worst = max(worst, late["max"])
+    return p99, worst
+
+def _close(devices):
+    for device in devices:
+        device.close()
+
+def capacity(duration=DURATION):
+    """
+    Runs each series of simultaneous sequences and returns a dictionary of
+    the results of each level, and of the capacity limit of each series.
+    """
+    results = {}
+    limits = {}
+    for name, (start, counts) in SERIES.items():
+        results[name] = []
+        limits[name] = None
+        for n in counts:
+            devices = start(n)
+            if devices is None:
+                # not enough pins
+                break
+
+            picozero.stats(reset=True)
+            wall = perf_counter() if SIMULATED else 0
+            sleep(duration)
+            stats = picozero.stats(reset=True)
+            frames = _frames(stats)
+            p99, worst = _late(stats)
+
+            level = {
+                "n": n,
+                "frames": frames,
+                "late_p99_us": p99,
+                "late_max_us": worst,
+                "tick_max_us": stats["scheduler"]["max_tick_us"],
+                }
+            if SIMULATED:
+                level["cpu_us_per_frame"] = (perf_counter() - wall) * 1000000 / max(frames, 1)
+            results[name].append(level)
+            _close(devices)
+
+            if p99 > MAX_LATE_US:
+                break
+            limits[name] = n
+    return results, limits
+
+def _drive(button, level):
+    if SIMULATED:
+        sim.set_pin(BUTTON_PIN, level)
+    else:
+        # make the edge by switching the pull resistor of the unconnected pin
+        button._pin.init(mode=Pin.IN, pull=Pin.PULL_UP if level else Pin.PULL_DOWN)
+
+def edge_latency(presses=50):
+    """
+    Returns the count, p50, p99 and max of the time in microseconds from a
+    button's pin changing to its ``when_pressed`` callback running.
+    """
+    histogram = picozero.Histogram()
+    button = Button(BUTTON_PIN, bounce_time=None)
+    pressed = []
+    button.when_pressed = lambda: pressed.append(ticks_us())
+
+    for i in range(presses):
+        del pressed[:]
+        t = ticks_us()
+        _drive(button, 0)
+        sleep(0.02)
+        if pressed:
+            histogram.add(ticks_diff(pressed[0], t))
+        _drive(button, 1)
+        sleep(0.02)
+
+    button.close()
+    return histogram.summary()
+
+def alloc_per_frame(duration=DURATION):
+    """
+    Returns the average number of bytes allocated for each frame while
+    pulsing every free PWM pin. On a computer, where objects are freed as
+    soon as they are no longer used, this is the bytes kept for each frame.
+    """
+    devices = _start_pulses(len(_free_pwm_pins()))
+    # the first run creates the instrumentation's histograms, which are
+    # kept (not reset) so they aren't created again while measuring
+    sleep(0.1)
+    frames = _frames(picozero.stats())
+    _start_measuring()
+    gc.collect()
+    gc.disable()
+    before = _memory()
+    sleep(duration)
+    allocated = _memory() - before
+    gc.enable()
+    _stop_measuring()
+    frames = _frames(picozero.stats(reset=True)) - frames
+    _close(devices)
+    return allocated / max(frames, 1)
+
+DEVICES = {
+    "DigitalLED": lambda pins: DigitalLED(pins[0]),
+    "PWMLED": lambda pins: PWMLED(pins[0]),
+    "RGBLED": lambda pins: RGBLED(*pins[:3]),
+    "Speaker": lambda pins: Speaker(_free_pwm_pins(whole_slices=True)[0]),
+    "Servo": lambda pins: Servo(pins[0]),
+    "Button": lambda pins: Button(BUTTON_PIN),
+    }
+
+def _memory():
+    # the bytes allocated so far (MicroPython, where nothing is freed while
+    # the garbage collector is disabled) or in use (tracemalloc)
+    if hasattr(gc, "mem_alloc"):
+        return gc.mem_alloc()
+    return tracemalloc.get_traced_memory()[0]
+
+def _start_measuring():
+    if SIMULATED:
+        # the simulator's pin trace would be measured as it grows
+        sim.tracing = False
+        tracemalloc.start()
+
+def _stop_measuring():
+    if SIMULATED:
+        tracemalloc.stop()
+        sim.tracing = True
+
+def warm_up(creates, repeat=2):
+    """
+    Creates and closes an object with each of the functions in *creates*,
+    so that the state shared between objects (the scheduler, the caches,
+    class tables and the containers which list the devices) has been
+    created, and has grown, before anything is measured with
+    :func:`object_bytes`. Without this, a measurement depends on which
+    objects were made before it.
+    """
+    for _ in range(repeat):
+        for create in creates:
+            create().close()
+
+def object_bytes(create, repeat=3):
+    """
+    Returns the bytes used by the object *create* returns, which must have
+    a ``close`` method. Call :func:`warm_up` first, then the smallest of
+    *repeat* measurements is used. The heap must be traced (tracemalloc)
+    on a computer.
+    """
+    sizes = []
+    for _ in range(repeat):
+        gc.collect()
+        before = _memory()
+        device = create()
+        gc.collect()
+        sizes.append(_memory() - before)
+        device.close()
+        del device
+    return min(sizes)
+
+def device_bytes():
+    """
+    Returns a dictionary of the bytes used by one of each kind of device,
+    including its pins and PWM objects.
+    """
+    creates = {name: (lambda create=create: create(_free_pwm_pins())) for name, create in DEVICES.items()}
+    warm_up(creates.values())
+    _start_measuring()
+    results = {}
+    for name, create in creates.items():
+        results[name] = object_bytes(create)
+    _stop_measuring()
+    return results
+
+def main():
+    picozero.instrument()
+    results, limits = capacity()
+    result = {
+        "implementation": sys.implementation.name,
+        "version": ".".join(str(v) for v in sys.implementation.version),
+        "platform": sys.platform,
+        "simulated": SIMULATED,
+        "max_late_us": MAX_LATE_US,
+        "capacity": results,
+        # lateness is constant on the virtual clock, so these only mean
+        # something on a board
+        "capacity_limit": None if SIMULATED else limits,
+        "edge_latency_us": None if SIMULATED else edge_latency(),
+        "alloc_per_frame": alloc_per_frame(),
+        "device_bytes": device_bytes(),
+        }
+    picozero.instrument(False)
+    print(json.dumps(result))
+    return result
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measures the time and memory taken to import picozero, printed as a single
+line of JSON.
+
+Each case is run after removing picozero from ``sys.modules``, so it is
+imported from scratch. To compare with another build of picozero (e.g. the
+single file version, or .mpy files), copy it to the board under another
+name and pass that name to :func:`main`::
+
+    import picozero_import_bench
+    picozero_import_bench.main()
+    picozero_import_bench.main("picozero_single")
+
+For the most accurate results, soft reset the board before each run.
+"""
+import gc
+import json
+import sys
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    # on a computer, memory isn't measured
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(ticks1, ticks2):
+        return ticks1 - ticks2
+
+CASES = (
+    ("import", "import {}"),
+    ("LED", "from {} import LED"),
+    ("pico_led", "from {} import pico_led"),
+    ("Button", "from {} import Button"),
+    ("Speaker", "from {} import Speaker"),
+    ("Robot", "from {} import Robot"),
+    ("pico_temp_sensor", "from {} import pico_temp_sensor"),
+    ("everything", "from {} import LED, RGBLED, Speaker, Robot, Servo, Button, Pot, DistanceSensor, pico_led, pico_temp_sensor"),
+    )
+
+def _unload(module):
+    for name in list(sys.modules):
+        if name == module or name.startswith(module + "."):
+            del sys.modules[name]
+
+def measure(statement, module="picozero"):
+    """
+    Returns the time in microseconds and the bytes of heap (or :data:`None`
+    if it can't be measured) taken to run an import statement from scratch.
+    """
+    _unload(module)
+    gc.collect()
+    free = gc.mem_free() if hasattr(gc, "mem_free") else None
+    start = ticks_us()
+    exec(statement.format(module), {})
+    duration = ticks_diff(ticks_us(), start)
+    gc.collect()
+    used = free - gc.mem_free() if free is not None else None
+    return {"us": duration, "bytes": used}
+
+def main(module="picozero"):
+    result = {
+        "module": module,
+        "implementation": sys.implementation.name,
+        "platform": sys.platform,
+        "cases": {name: measure(statement, module) for name, statement in CASES},
+        }
+    print(json.dumps(result))
+    return result
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the tests import picozero and the OTA library from the source tree, with
+# the simulated hardware in picozero.sim
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, os.path.join(HERE, "..", "ota", "lib"))
@@ -0,0 +1,64 @@
+"""
+The memory used by one of each kind of device, built on picozero.sim.
+
+The heap is measured with picozero_bench.object_bytes, which uses tracemalloc
+on a computer. Every device is built and closed first (picozero_bench.warm_up),
+so that the scheduler, caches and class tables shared by all devices exist
+before anything is measured, and a case gives the same figure whether it is
+run alone or after the others. Each device is then built several times and
+the smallest figure is used.
+
+Only CPython is measured. MicroPython ignores __slots__, so these bounds
+guard the size of the objects on a computer, not the heap used on a board;
+there the saving comes from the compact class tables (NOTES,
+PIN_TO_PWM_CHANNEL), which aren't measured here.
+"""
+import tracemalloc
+
+import pytest
+
+import picozero
+from picozero import sim
+from picozero_bench import object_bytes, warm_up
+
+#: Upper bounds in bytes, about 1.25 times the size measured on CPython 3.11
+#: and below the size each device would have without __slots__ (Thermistor
+#: saves less than a quarter, so its bound is tighter).
+DEVICES = {
+    "DigitalLED": (lambda: picozero.DigitalLED(2), 144),
+    "PWMLED": (lambda: picozero.PWMLED(2), 240),
+    "RGBLED": (lambda: picozero.RGBLED(2, 3, 4), 984),
+    "Buzzer": (lambda: picozero.Buzzer(2), 144),
+    "PWMBuzzer": (lambda: picozero.PWMBuzzer(2), 224),
+    "Speaker": (lambda: picozero.Speaker(2), 320),
+    "Motor": (lambda: picozero.Motor(2, 3), 608),
+    "Robot": (lambda: picozero.Robot((2, 3), (4, 5)), 1312),
+    "Servo": (lambda: picozero.Servo(2), 272),
+    "Button": (lambda: picozero.Button(2), 664),
+    "Pot": (lambda: picozero.Pot(26), 200),
+    "LEDBoard": (lambda: picozero.LEDBoard(2, 3, 4, 5), 752),
+    "LEDBarGraph": (lambda: picozero.LEDBarGraph(2, 3, 4, 5), 752),
+    "DistanceSensor": (lambda: picozero.DistanceSensor(2, 3), 920),
+    "TemperatureSensor": (lambda: picozero.TemperatureSensor(4), 368),
+    "Thermistor": (lambda: picozero.Thermistor(27), 352),
+    }
+
+@pytest.fixture(scope="module")
+def shared():
+    warm_up([create for create, limit in DEVICES.values()])
+
+@pytest.fixture
+def heap(shared):
+    # the simulator's pin trace would be measured as it grows
+    tracing = sim.tracing
+    sim.tracing = False
+    tracemalloc.start()
+    yield
+    tracemalloc.stop()
+    sim.tracing = tracing
+
+@pytest.mark.parametrize("name", sorted(DEVICES))
+def test_device_bytes(heap, name):
+    create, limit = DEVICES[name]
+    size = object_bytes(create)
+    assert 0 < size <= limit, "{} uses {} bytes (limit {})".format(name, size, limit)